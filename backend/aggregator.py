@@ -0,0 +1,318 @@
+"""
+⚡ Motor assíncrono de agregação
+================================
+Executa todas as buscas (fonte, empresa) em paralelo sobre um único
+``httpx.AsyncClient``, respeitando um limite global de concorrência,
+limites por fonte e um prazo total para a requisição.
+
+O parsing (BeautifulSoup) é CPU puro e roda num pool de threads limitado,
+para que o event loop nunca fique bloqueado enquanto um feed é processado.
+"""
+
+import asyncio
+import logging
+import os
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import aclosing, asynccontextmanager
+from dataclasses import dataclass
+from functools import partial
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, Hashable, List, Optional, Tuple
+
+import httpx
+
+from http_client import new_client
+
+from metrics import ITEMS, JOB_ERRORS, JOB_SECONDS, JOBS_CANCELLED
+from rate_limit import bind_job
+
+NewsList = List[Dict[str, str]]
+
+logger = logging.getLogger(__name__)
+
+# 🔹 Limites configuráveis via variáveis de ambiente
+MAX_CONCURRENCY = int(os.getenv("NEWS_MAX_CONCURRENCY", "20"))
+DEFAULT_SOURCE_LIMIT = int(os.getenv("NEWS_SOURCE_CONCURRENCY", "5"))
+DEADLINE_SECONDS = float(os.getenv("NEWS_DEADLINE_SECONDS", "20"))
+PARSE_WORKERS = int(os.getenv("NEWS_PARSE_WORKERS", "4"))
+MAX_INFLIGHT_SCRAPES = int(os.getenv("NEWS_MAX_INFLIGHT", "4"))
+MAX_QUEUED_SCRAPES = int(os.getenv("NEWS_MAX_QUEUED", "16"))
+
+
+def env_seconds_map(name: str, defaults: Dict[str, float]) -> Dict[str, float]:
+    """Lê um mapa fonte → segundos no formato "google=120,g1=300" (sobrepõe ``defaults``)"""
+    values = dict(defaults)
+    raw = os.getenv(name, "")
+    for pair in raw.split(","):
+        if "=" not in pair:
+            continue
+        source, seconds = pair.split("=", 1)
+        try:
+            values[source.strip()] = float(seconds)
+        except ValueError:
+            logger.warning("⚠️ Valor inválido em %s: %s", name, pair)
+    return values
+
+
+_parse_executor = ThreadPoolExecutor(max_workers=PARSE_WORKERS, thread_name_prefix="news-parse")
+
+
+async def run_blocking(func: Callable[..., Any], *args) -> Any:
+    """Executa uma função bloqueante (parsing) fora do event loop"""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_parse_executor, partial(func, *args))
+
+
+class Overloaded(Exception):
+    """Fila de buscas cheia: o cliente deve tentar novamente mais tarde"""
+
+
+class AdmissionGate:
+    """
+    Limita quantas buscas completas rodam ao mesmo tempo.
+
+    Até ``max_inflight`` buscas executam juntas e até ``max_queued`` esperam
+    por uma vaga; além disso a entrada é recusada com ``Overloaded`` em vez de
+    acumular trabalho que estouraria o prazo de qualquer forma.
+    """
+
+    def __init__(self, max_inflight: int = MAX_INFLIGHT_SCRAPES, max_queued: int = MAX_QUEUED_SCRAPES):
+        self.max_inflight = max_inflight
+        self.max_queued = max_queued
+        self._sem = asyncio.Semaphore(max_inflight)
+        self._inflight = 0
+        self._queued = 0
+
+    @property
+    def inflight(self) -> int:
+        return self._inflight
+
+    @property
+    def queued(self) -> int:
+        return self._queued
+
+    @property
+    def full(self) -> bool:
+        """Uma nova entrada seria recusada agora"""
+        return self._sem.locked() and self._queued >= self.max_queued
+
+    async def __aenter__(self):
+        if self.full:
+            raise Overloaded(f"{self._queued} buscas já aguardando")
+        self._queued += 1
+        try:
+            await self._sem.acquire()
+        finally:
+            self._queued -= 1
+        self._inflight += 1
+        return self
+
+    async def __aexit__(self, *exc):
+        self._inflight -= 1
+        self._sem.release()
+        return False
+
+
+class SingleFlight:
+    """
+    Junta chamadas idênticas simultâneas (single-flight).
+
+    Enquanto uma chamada com a mesma chave está em andamento, as demais não
+    disparam outra: esperam pelo mesmo resultado (ou pela mesma exceção).
+    Um chamador cancelado não cancela a chamada compartilhada.
+    """
+
+    def __init__(self):
+        self._inflight: Dict[Hashable, asyncio.Task] = {}
+        self.calls = 0    # chamadas realmente executadas
+        self.shared = 0   # chamadas que aproveitaram uma já em andamento
+
+    @property
+    def inflight(self) -> int:
+        return len(self._inflight)
+
+    def _finished(self, key: Hashable, task: asyncio.Task) -> None:
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+        if not task.cancelled():
+            task.exception()  # evita o aviso de exceção nunca lida quando ninguém mais espera
+
+    async def do(self, key: Hashable, func: Callable[[], Awaitable[Any]]) -> Any:
+        task = self._inflight.get(key)
+        if task is None:
+            self.calls += 1
+            task = self._inflight[key] = asyncio.create_task(func())
+            task.add_done_callback(partial(self._finished, key))
+        else:
+            self.shared += 1
+        return await asyncio.shield(task)
+
+
+@dataclass
+class FetchJob:
+    """Uma busca independente: uma fonte para uma empresa"""
+    source: str
+    company: str
+    run: Callable[[httpx.AsyncClient], Awaitable[NewsList]]
+    limit: Optional[int] = None  # buscas simultâneas da fonte (padrão: DEFAULT_SOURCE_LIMIT)
+
+
+class JobSlot:
+    """
+    Vaga de um job: uma do limite da fonte e uma do limite global. Pode ser
+    devolvida durante uma espera (``released``) e retomada depois dela.
+    """
+
+    def __init__(self, source_sem: asyncio.Semaphore, global_sem: asyncio.Semaphore):
+        self.source_sem = source_sem
+        self.global_sem = global_sem
+        self.held = False
+
+    async def acquire(self) -> None:
+        # Primeiro o limite da fonte, para não ocupar vagas globais à toa
+        await self.source_sem.acquire()
+        try:
+            await self.global_sem.acquire()
+        except BaseException:
+            self.source_sem.release()
+            raise
+        self.held = True
+
+    def release(self) -> None:
+        if self.held:
+            self.held = False
+            self.global_sem.release()
+            self.source_sem.release()
+
+    @asynccontextmanager
+    async def released(self) -> AsyncIterator[None]:
+        self.release()
+        try:
+            yield
+        finally:
+            await self.acquire()
+
+
+# Cliente do processo (criado no lifespan do FastAPI); sem ele cada execução cria o seu
+_shared_client: Optional[httpx.AsyncClient] = None
+
+
+def set_shared_client(client: Optional[httpx.AsyncClient]) -> None:
+    """Define (ou remove, com None) o cliente usado quando ``iter_jobs`` não recebe um"""
+    global _shared_client
+    _shared_client = client
+
+
+def shared_client() -> Optional[httpx.AsyncClient]:
+    return _shared_client
+
+
+async def iter_jobs(
+    jobs: List[FetchJob],
+    client: Optional[httpx.AsyncClient] = None,
+    max_concurrency: Optional[int] = None,
+    source_limits: Optional[Dict[str, int]] = None,
+    deadline: Optional[float] = None,
+) -> AsyncIterator[Tuple[FetchJob, NewsList]]:
+    """
+    Executa as buscas concorrentemente e emite ``(job, notícias)`` assim que
+    cada uma termina.
+
+    Buscas que não terminam dentro do prazo são canceladas; uma fonte lenta
+    nunca segura a resposta inteira.
+    """
+    max_concurrency = max_concurrency or MAX_CONCURRENCY
+    limits = source_limits or {}
+    deadline = DEADLINE_SECONDS if deadline is None else deadline
+
+    if not jobs:
+        return
+
+    if client is None:
+        client = _shared_client
+    own_client = client is None
+    if own_client:
+        client = new_client(max_concurrency)
+
+    global_sem = asyncio.Semaphore(max_concurrency)
+    source_sems: Dict[str, asyncio.Semaphore] = {}
+    ends_at_monotonic = time.monotonic() + deadline
+
+    async def _guarded(job: FetchJob) -> NewsList:
+        sem = source_sems.get(job.source)
+        if sem is None:
+            sem = source_sems[job.source] = asyncio.Semaphore(
+                limits.get(job.source, job.limit or DEFAULT_SOURCE_LIMIT)
+            )
+        slot = JobSlot(sem, global_sem)
+        # Cada job roda na sua tarefa: a espera pelo limite do host devolve a vaga
+        # e não passa do prazo da coleta
+        bind_job(ends_at_monotonic, slot.released)
+        await slot.acquire()
+        try:
+            start = time.perf_counter()
+            try:
+                items = await job.run(client)
+            except Exception as e:
+                JOB_ERRORS.inc(source=job.source)
+                logger.warning("⚠️ Erro inesperado em %s para %s: %s", job.source, job.company, e,
+                               extra={"source": job.source, "company": job.company})
+                return []
+            JOB_SECONDS.observe(time.perf_counter() - start, source=job.source)
+            ITEMS.inc(len(items), source=job.source)
+            return items
+        finally:
+            slot.release()
+
+    tasks = {asyncio.create_task(_guarded(job)): index for index, job in enumerate(jobs)}
+    loop = asyncio.get_running_loop()
+    ends_at = loop.time() + deadline
+    pending = set(tasks)
+    try:
+        while pending:
+            remaining = ends_at - loop.time()
+            if remaining <= 0:
+                break
+            done, pending = await asyncio.wait(
+                pending, timeout=remaining, return_when=asyncio.FIRST_COMPLETED
+            )
+            for task in sorted(done, key=tasks.get):
+                yield jobs[tasks[task]], task.result()
+        if pending:
+            late = Counter(jobs[tasks[task]].source for task in pending)
+            for source, count in late.items():
+                JOBS_CANCELLED.inc(count, source=source)
+            logger.warning("⏱️ Prazo de %.0fs esgotado: %d buscas canceladas", deadline, len(pending),
+                           extra={"sources": dict(late)})
+    finally:
+        # Cancela o que sobrou (prazo esgotado ou a própria requisição cancelada)
+        leftovers = [task for task in tasks if not task.done()]
+        for task in leftovers:
+            task.cancel()
+        if leftovers:
+            await asyncio.gather(*leftovers, return_exceptions=True)
+        if own_client:
+            await client.aclose()
+
+
+async def run_jobs_grouped(jobs: List[FetchJob], **kwargs) -> List[NewsList]:
+    """Executa as buscas concorrentemente e devolve uma lista por job, na ordem dos jobs"""
+    by_job: Dict[int, NewsList] = {}
+    async with aclosing(iter_jobs(jobs, **kwargs)) as finished:
+        async for job, items in finished:
+            by_job[id(job)] = items
+    return [by_job.get(id(job), []) for job in jobs]
+
+
+async def run_jobs(jobs: List[FetchJob], **kwargs) -> NewsList:
+    """Executa as buscas concorrentemente e devolve os resultados na ordem dos jobs"""
+    results: NewsList = []
+    for items in await run_jobs_grouped(jobs, **kwargs):
+        results.extend(items)
+    return results
+
+
+def run_jobs_sync(jobs: List[FetchJob], **kwargs) -> NewsList:
+    """Versão síncrona de ``run_jobs`` para scripts (sem event loop ativo)"""
+    return asyncio.run(run_jobs(jobs, **kwargs))
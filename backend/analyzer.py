@@ -1,7 +1,15 @@
+import bisect
+import hashlib
+import os
 import re
+import unicodedata
+from collections import OrderedDict
 from dataclasses import dataclass
+from typing import Dict, Iterable, List, Mapping, Optional, Sequence, Tuple
 from pydantic import HttpUrl
 
+from aggregator import run_blocking
+
 EVENT_AQUISICAO = "Aquisição"
 EVENT_CERTIFICACAO = "Certificação"
 EVENT_LANCAMENTO = "Lançamento de Produto"
@@ -21,12 +29,83 @@ class Analysis:
     fonte: HttpUrl
 
 
+_COMBINING_MARKS = re.compile(r"[\u0300-\u036f]")
+# Separador entre textos no modo em lote: não é ``\s`` nem letra, então nenhuma
+# palavra-chave (nem as de várias palavras, unidas por ``\s+``) passa de um texto para o outro
+_BATCH_SEPARATOR = "\x00"
+
+
+def _fold(text: str) -> str:
+    """Minúsculas e sem acentos ("Aquisição" → "aquisicao")"""
+    if text.isascii():
+        return text.lower()
+    return _COMBINING_MARKS.sub("", unicodedata.normalize("NFKD", text)).casefold()
+
+
+class KeywordClassifier:
+    """
+    Todas as palavras-chave compiladas numa única regex, sem diferenciar
+    maiúsculas nem acentos e respeitando limites de palavra ("ISO" não casa
+    com "isolamento"; plural aceito). Em caso de mais de um evento, vale a
+    ordem de ``keywords``, como na heurística original.
+    """
+
+    def __init__(self, keywords: Mapping[str, Sequence[str]], default: str = EVENT_OUTRO):
+        self.events = list(keywords)
+        self.default = default
+        groups = []
+        initials = set()
+        for index, kws in enumerate(keywords.values()):
+            # Palavras-chave mais longas primeiro ("lançamento" antes de "lança")
+            alternatives = sorted({_fold(kw) for kw in kws}, key=len, reverse=True)
+            initials.update(kw[0] for kw in alternatives)
+            body = "|".join(r"\s+".join(map(re.escape, kw.split())) for kw in alternatives)
+            groups.append(f"(?P<e{index}>{body})")
+        # O lookahead pela letra inicial evita testar a alternância em toda posição
+        first = "[" + "".join(sorted(re.escape(c) for c in initials)) + "]"
+        self.pattern = re.compile(r"\b(?=" + first + r")(?:" + "|".join(groups) + r")s?\b")
+
+    def _best(self, matches) -> int:
+        best = len(self.events)
+        for m in matches:
+            best = min(best, int(m.lastgroup[1:]))
+            if best == 0:
+                break
+        return best
+
+    def classify(self, title: str, description: str = "") -> str:
+        best = self._best(self.pattern.finditer(_fold(f"{title} {description}")))
+        return self.events[best] if best < len(self.events) else self.default
+
+    def classify_many(self, items: Iterable[Mapping[str, str]]) -> List[str]:
+        """
+        Classifica uma lista inteira de notícias (``title``/``description``)
+        varrendo um único texto concatenado.
+        """
+        texts = [_fold(f"{item.get('title') or ''} {item.get('description') or ''}") for item in items]
+        starts = []
+        offset = 0
+        for text in texts:
+            starts.append(offset)
+            offset += len(text) + len(_BATCH_SEPARATOR)
+
+        best = [len(self.events)] * len(texts)
+        for m in self.pattern.finditer(_BATCH_SEPARATOR.join(texts)):
+            index = bisect.bisect_right(starts, m.start()) - 1
+            best[index] = min(best[index], int(m.lastgroup[1:]))
+        return [self.events[b] if b < len(self.events) else self.default for b in best]
+
+
+_classifier = KeywordClassifier(KEYWORDS)
+
+
 def _heuristic_event(title: str, description: str) -> str:
-    text = f"{title} {description}".lower()
-    for event, kws in KEYWORDS.items():
-        if any(kw in text for kw in kws):
-            return event
-    return EVENT_OUTRO
+    return _classifier.classify(title, description)
+
+
+def classify_many(items: Iterable[Mapping[str, str]]) -> List[str]:
+    """Evento de cada notícia, na mesma ordem (uma varredura para a lista toda)"""
+    return _classifier.classify_many(items)
 
 
 def _truncate(text: str, limit: int = 200) -> str:
@@ -41,6 +120,98 @@ def analyze_text(title: str, description: str, company: str, url: HttpUrl) -> An
     return Analysis(company, evento, resumo, url)
 
 
+# ==============================================================
+# 🏷️ CLASSIFICAÇÃO EM LOTE (com memo por conteúdo)
+# ==============================================================
+
+ANALYSIS_MEMO_SIZE = int(os.getenv("ANALYSIS_MEMO_SIZE", "20000"))
+
+# hash(título + descrição) → (evento, resumo); a mesma notícia volta a cada coleta
+_memo: "OrderedDict[str, Tuple[str, str]]" = OrderedDict()
+
+
+def content_hash(title: str, description: str) -> str:
+    return hashlib.sha1(f"{title}\n{description}".encode("utf-8")).hexdigest()
+
+
+def _resumo(item: Mapping[str, str]) -> str:
+    return _truncate(f"{item.get('title') or ''}. {item.get('description') or ''}")
+
+
+def heuristic_analysis(items: Sequence[Mapping[str, str]]) -> List[Tuple[str, str]]:
+    """(evento, resumo) pela heurística de palavras-chave, para a lista toda"""
+    return [(evento, _resumo(item)) for item, evento in zip(items, classify_many(items))]
+
+
+class HeuristicBackend:
+    """
+    Classificador padrão (palavras-chave). Um backend é qualquer objeto com
+    ``async analyze(items) -> [(evento, resumo) | None]`` e ``async aclose()``;
+    ``None`` significa "sem resposta" e a notícia cai na heurística sem ir
+    para o memo.
+    """
+
+    name = "heuristic"
+
+    async def analyze(self, items: Sequence[Mapping[str, str]]) -> List[Optional[Tuple[str, str]]]:
+        return await run_blocking(heuristic_analysis, items)
+
+    async def aclose(self) -> None:
+        pass
+
+    def snapshot(self) -> Dict[str, object]:
+        return {"backend": self.name}
+
+
+_backend = HeuristicBackend()
+
+
+def get_classifier_backend():
+    return _backend
+
+
+def set_classifier_backend(backend) -> None:
+    """Troca o classificador usado pelo ``analyze_many`` (ex.: LLM)"""
+    global _backend
+    _backend = backend
+    _memo.clear()
+
+
+async def analyze_many(items: Sequence[Dict[str, str]]) -> List[Dict[str, str]]:
+    """
+    Preenche ``evento`` e ``resumo`` em cada notícia (altera e devolve os
+    próprios dicts). Só as notícias ainda não vistas vão para o backend,
+    todas numa única chamada.
+    """
+    keys = [content_hash(it.get("title") or "", it.get("description") or "") for it in items]
+
+    found: Dict[str, Tuple[str, str]] = {}
+    pending: Dict[str, Mapping[str, str]] = {}
+    for key, item in zip(keys, items):
+        if key in _memo:
+            _memo.move_to_end(key)
+            found[key] = _memo[key]
+        else:
+            pending.setdefault(key, item)
+
+    if pending:
+        answers = await _backend.analyze(list(pending.values()))
+        unanswered = [item for item, answer in zip(pending.values(), answers) if answer is None]
+        fallback = iter(await run_blocking(heuristic_analysis, unanswered) if unanswered else [])
+        for (key, item), answer in zip(pending.items(), answers):
+            if answer is None:
+                found[key] = next(fallback)  # sem memo: o backend tenta de novo na próxima
+            else:
+                found[key] = _memo[key] = answer
+        while len(_memo) > ANALYSIS_MEMO_SIZE:
+            _memo.popitem(last=False)
+
+    for key, item in zip(keys, items):
+        item["evento"], item["resumo"] = found[key]
+    return list(items)
+
+
+
 
 
 
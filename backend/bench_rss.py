@@ -0,0 +1,141 @@
+# -*- coding: utf-8 -*-
+"""
+⏱️ Micro-benchmark do parsing do Google News
+============================================
+Compara o parser antigo (BeautifulSoup para o feed + 3 parses da descrição
+por item) com o extrator em streaming de ``rss_parser``. Antes de medir,
+confere que os dois produzem exatamente os mesmos dicts.
+
+    python bench_rss.py
+    python bench_rss.py --items 100 --repeat 200
+"""
+
+import argparse
+import contextlib
+import io
+import timeit
+from datetime import datetime
+
+from bs4 import BeautifulSoup
+
+from data_source import _parse_google_news
+
+
+def legacy_parse_google_news(content: bytes, company: str):
+    """Implementação anterior, mantida aqui apenas como linha de base"""
+    results = []
+    soup = BeautifulSoup(content, "xml")
+    items = soup.find_all("item")
+
+    for it in items[:10]:
+        title = (it.title.text or "").strip() if it.title else ""
+        link_google = (it.link.text or "").strip() if it.link else ""
+        raw_description = (it.description.text or "").strip() if it.description else ""
+
+        try:
+            desc_soup = BeautifulSoup(raw_description, "html.parser")
+            description = desc_soup.get_text(" ", strip=True)
+        except Exception:
+            description = raw_description
+
+        a_tag = BeautifulSoup(raw_description, "html.parser").find("a", href=True)
+        article_url = a_tag["href"].strip() if a_tag else link_google
+        if not title or not article_url:
+            continue
+
+        source_name = ""
+        try:
+            font_tag = BeautifulSoup(raw_description, "html.parser").find("font")
+            if font_tag:
+                source_name = font_tag.get_text(strip=True)
+        except Exception:
+            pass
+
+        published_at = None
+        pub_date_tag = it.find("pubDate") or it.find("dc:date") or it.find("updated")
+        if pub_date_tag and pub_date_tag.text:
+            date_text = pub_date_tag.text.strip()
+            for fmt in ("%a, %d %b %Y %H:%M:%S %Z", "%Y-%m-%dT%H:%M:%S%z", "%Y-%m-%dT%H:%M:%SZ"):
+                try:
+                    dt = datetime.strptime(date_text, fmt)
+                    published_at = dt.strftime("%d/%m/%Y %H:%M")
+                    break
+                except Exception:
+                    continue
+            if not published_at:
+                published_at = date_text
+
+        print(f"🕒 {company} → {title[:50]}... → {published_at or 'sem data'}")
+
+        results.append({
+            "company": company,
+            "title": title,
+            "description": description,
+            "url": article_url,
+            "fonte": source_name or "Google News",
+            "fonte_type": "google",
+            "published_at": published_at,
+        })
+
+    return results
+
+
+def google_feed(items: int) -> bytes:
+    """Feed no formato do Google News RSS (descrição com <a> e <font>)"""
+    entries = []
+    for i in range(items):
+        entries.append(f"""
+    <item>
+      <title>Nubank anuncia novo produto de crédito {i} - Valor Econômico</title>
+      <link>https://news.google.com/rss/articles/CBMi{i:04d}?oc=5</link>
+      <guid isPermaLink="false">CBMi{i:04d}</guid>
+      <pubDate>Wed, 16 Oct 2025 13:{i % 60:02d}:00 GMT</pubDate>
+      <description>&lt;a href="https://valor.globo.com/financas/noticia/{i}.ghtml" target="_blank"&gt;Nubank anuncia novo produto de crédito {i}&lt;/a&gt;&amp;nbsp;&amp;nbsp;&lt;font color="#6f6f6f"&gt;Valor Econômico&lt;/font&gt;</description>
+      <source url="https://valor.globo.com">Valor Econômico</source>
+    </item>""")
+    return f"""<?xml version="1.0" encoding="UTF-8"?>
+<rss version="2.0" xmlns:media="http://search.yahoo.com/mrss/"><channel>
+<title>"Nubank when:7d" - Google Notícias</title>{''.join(entries)}
+</channel></rss>""".encode()
+
+
+def _legacy_shape(item):
+    """Item no formato antigo (data já formatada em GMT) para comparar os parsers"""
+    item = dict(item)
+    published_ts = item.pop("published_ts")
+    if published_ts is not None:
+        item["published_at"] = published_ts.strftime("%d/%m/%Y %H:%M")
+    return item
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark do parser do Google News")
+    parser.add_argument("--items", type=int, default=100, help="itens no feed (o Google devolve ~100)")
+    parser.add_argument("--repeat", type=int, default=100, help="repetições por medição")
+    args = parser.parse_args()
+
+    content = google_feed(args.items)
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        old = legacy_parse_google_news(content, "Nubank")
+        new = [_legacy_shape(item) for item in _parse_google_news(content, "Nubank")]
+    assert old == new, "os parsers produziram resultados diferentes"
+
+    def run(func):
+        with contextlib.redirect_stdout(io.StringIO()):
+            return min(timeit.repeat(lambda: func(content, "Nubank"), number=args.repeat, repeat=3)) / args.repeat
+
+    legacy = run(legacy_parse_google_news)
+    current = run(_parse_google_news)
+
+    print("\n" + "=" * 60)
+    print(f"⏱️ PARSING GOOGLE NEWS ({args.items} itens no feed, 10 extraídos)")
+    print("=" * 60)
+    print(f"✅ Resultados idênticos: {len(new)} notícias")
+    print(f"   - BeautifulSoup (antigo): {legacy * 1000:.2f} ms por feed")
+    print(f"   - lxml streaming (atual): {current * 1000:.2f} ms por feed")
+    print(f"\n🎯 Ganho: {legacy / current:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
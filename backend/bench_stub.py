@@ -0,0 +1,163 @@
+# -*- coding: utf-8 -*-
+"""
+🧪 Servidor de fontes local (benchmark)
+=======================================
+Responde no lugar de todas as fontes do ``data_source`` com as respostas
+gravadas em ``bench_fixtures/``, com latência e falhas configuráveis. O
+``bench_suite.py`` sobe este servidor num processo separado e redireciona
+para ele as requisições das fontes: ``https://news.google.com/rss/search?q=X``
+vira ``http://127.0.0.1:<porta>/news.google.com/rss/search?q=X``.
+
+As fixtures têm o marcador ``{company}``: nas buscas por empresa ele vira a
+empresa da URL (nas buscas em lote do Google, cada empresa do ``OR``
+recebe os itens da fixture); nos feeds globais (G1, InfoMoney, UOL, Reuters) cada item
+recebe uma das empresas configuradas, em rodízio.
+
+    uvicorn bench_stub:app --port 8002
+
+Configuração em ``POST /_bench/config`` (``latency``, ``jitter``,
+``fail_rate``, ``fail_hosts``, ``slow_hosts``, ``slow_latency``,
+``companies``) e contadores em ``GET /_bench/stats``.
+"""
+
+import asyncio
+import json
+import os
+import random
+import re
+from typing import Callable, Dict, Tuple
+from urllib.parse import parse_qs
+from xml.sax.saxutils import escape
+
+from fastapi import FastAPI, Request, Response
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "bench_fixtures")
+
+app = FastAPI(title="Bench stub")
+
+config = {
+    "latency": float(os.getenv("BENCH_STUB_LATENCY", "0.05")),
+    "jitter": 0.2,             # ±20% da latência
+    "fail_rate": float(os.getenv("BENCH_STUB_FAIL_RATE", "0")),
+    "fail_hosts": [],          # hosts que sempre respondem 503
+    "slow_hosts": [],          # hosts que respondem com ``slow_latency``
+    "slow_latency": 15.0,
+    "companies": ["Nubank", "Totvs", "Stone"],
+}
+stats = {"requests": 0, "failures": 0, "bytes": 0}
+
+_ITEM = re.compile(rb"<item>.*?</item>", re.DOTALL)
+_fixtures: Dict[str, bytes] = {}
+
+
+def _fixture(name: str) -> bytes:
+    if name not in _fixtures:
+        with open(os.path.join(FIXTURES_DIR, name), "rb") as f:
+            _fixtures[name] = f.read()
+    return _fixtures[name]
+
+
+def _escaped(name: str, company: str) -> bytes:
+    """Empresa escapada para o formato da fixture (XML/HTML ou JSON)"""
+    if name.endswith(".json"):
+        return json.dumps(company, ensure_ascii=False)[1:-1].encode("utf-8")
+    return escape(company).encode("utf-8")
+
+
+def _per_company(name: str, company: str) -> bytes:
+    return _fixture(name).replace(b"{company}", _escaped(name, company))
+
+
+def _global_feed(name: str) -> bytes:
+    companies = config["companies"] or ["Empresa"]
+    counter = iter(range(1 << 30))
+    return _ITEM.sub(
+        lambda m: m.group(0).replace(b"{company}", _escaped(name, companies[next(counter) % len(companies)])),
+        _fixture(name),
+    )
+
+
+def _search(name: str, query: str) -> bytes:
+    """
+    Busca por empresa; numa busca em lote (``("A" OR "B")``) os itens da
+    fixture se repetem para cada empresa, como num resultado combinado.
+    """
+    terms = [term.strip().strip('"') for term in query.strip("()").split(" OR ")]
+    if len(terms) == 1:
+        return _per_company(name, terms[0])
+    content = _fixture(name)
+    items = _ITEM.findall(content)
+    if not items:
+        return _per_company(name, terms[0])
+    head = content[:content.index(items[0])]
+    tail = content[content.rindex(items[-1]) + len(items[-1]):]
+    body = b"".join(item.replace(b"{company}", _escaped(name, term)) for term in terms for item in items)
+    return head + body + tail
+
+
+def _query(request: Request, name: str, strip: Tuple[str, ...] = ()) -> str:
+    value = parse_qs(request.url.query).get(name, [""])[0]
+    for text in strip:
+        value = value.replace(text, "")
+    return value.strip()
+
+
+# host → (fixture, conteúdo para a requisição, content-type)
+Route = Tuple[str, Callable[[Request, str], bytes], str]
+
+_XML, _HTML, _JSON = "application/rss+xml; charset=utf-8", "text/html; charset=utf-8", "application/json"
+
+ROUTES: Dict[str, Route] = {
+    "news.google.com": ("google.xml", lambda r, f: _search(f, _query(r, "q", (" when:7d",))), _XML),
+    "finance.yahoo.com": ("yahoo.xml", lambda r, f: _per_company(f, _query(r, "s")), _XML),
+    "html.duckduckgo.com": ("duckduckgo.html", lambda r, f: _per_company(f, _query(r, "q", (" news",))), _HTML),
+    "serpapi.com": ("linkedin.json", lambda r, f: _per_company(f, _query(r, "q", ("site:linkedin.com/company",))), _JSON),
+    "api.bing.microsoft.com": ("bing.json", lambda r, f: _per_company(f, _query(r, "q")), _JSON),
+    "g1.globo.com": ("g1.xml", lambda r, f: _global_feed(f), _XML),
+    "www.infomoney.com.br": ("infomoney.xml", lambda r, f: _global_feed(f), _XML),
+    "rss.uol.com.br": ("uol.xml", lambda r, f: _global_feed(f), _XML),
+    "www.reuters.com": ("reuters.xml", lambda r, f: _global_feed(f), _XML),
+}
+
+
+def _route(host: str, path: str) -> Route:
+    if host in ROUTES:
+        return ROUTES[host]
+    # Sites oficiais: RSS quando o caminho é de feed, senão a página de imprensa
+    if path.rstrip("/").endswith(("rss", "feed", ".xml")):
+        return "company_rss.xml", lambda r, f: _per_company(f, host), _XML
+    return "company_page.html", lambda r, f: _per_company(f, host), _HTML
+
+
+@app.post("/_bench/config")
+async def set_config(request: Request):
+    config.update(await request.json())
+    return config
+
+
+@app.get("/_bench/stats")
+async def get_stats():
+    return stats
+
+
+@app.post("/_bench/reset")
+async def reset_stats():
+    stats.update(requests=0, failures=0, bytes=0)
+    return stats
+
+
+@app.get("/{host}/{path:path}")
+async def serve(host: str, path: str, request: Request):
+    stats["requests"] += 1
+    slow = host in config["slow_hosts"]
+    latency = config["slow_latency"] if slow else config["latency"]
+    await asyncio.sleep(max(0.0, latency * random.uniform(1 - config["jitter"], 1 + config["jitter"])))
+
+    if host in config["fail_hosts"] or random.random() < config["fail_rate"]:
+        stats["failures"] += 1
+        return Response(status_code=503, content=b"falha simulada")
+
+    fixture, render, content_type = _route(host, path)
+    content = render(request, fixture)
+    stats["bytes"] += len(content)
+    return Response(content=content, media_type=content_type)
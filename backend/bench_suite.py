@@ -0,0 +1,415 @@
+# -*- coding: utf-8 -*-
+"""
+📏 Benchmark offline da coleta
+==============================
+Reproduz a coleta completa (``fetch_real_news``) contra um servidor local
+(``bench_stub.py``) que devolve as respostas gravadas em ``bench_fixtures/``
+para todas as fontes, com latência e falhas configuráveis. Nada sai para a
+internet.
+
+Para cada escala (1, 10 e 100 empresas por padrão) mede:
+
+- tempo total do ``fetch_real_news`` (mediana/mín/máx das repetições);
+- tempo de parede e de CPU por etapa: coleta (rede + parsing), intercalação
+  por data, deduplicação e classificação, além do tempo de parsing nas threads;
+- pico de memória (``tracemalloc``) de uma coleta completa;
+- requisições, falhas injetadas e bytes servidos pelo servidor local.
+
+O resultado vai em JSON (``--output``) para acompanhar regressões; com
+``--compare`` ele é comparado com um resultado anterior e o processo sai com
+código 1 se alguma métrica piorar além de ``--threshold``.
+
+    python bench_suite.py
+    python bench_suite.py --scales 1 10 --latency 0.2 --fail-rate 0.1 --output bench.json
+    python bench_suite.py --compare bench_baseline.json
+    python bench_suite.py --record Nubank      # regrava as fixtures a partir das fontes reais
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import platform
+import resource
+import socket
+import statistics
+import subprocess
+import sys
+import time
+import tracemalloc
+import warnings
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List, Tuple
+
+# Chaves fictícias: com elas as fontes opcionais (LinkedIn, Bing) também entram na medição
+os.environ.setdefault("SERP_API_KEY", "bench")
+os.environ.setdefault("BING_API_KEY", "bench")
+
+import httpx
+
+import aggregator
+import analyzer
+import metrics
+from aggregator import run_jobs_grouped
+from data_source import COMPANY_URLS, fetch_real_news, merge_by_date, source_registry
+from dedup import dedup_news
+from feed_cache import feed_cache
+from http_client import PooledTransport
+from rate_limit import rate_limiter
+from source_health import source_health
+from url_resolver import url_resolver
+
+BACKEND_DIR = os.path.dirname(os.path.abspath(__file__))
+FIXTURES_DIR = os.path.join(BACKEND_DIR, "bench_fixtures")
+
+# Empresas com site oficial mapeado primeiro, para que essa fonte também seja medida
+KNOWN_COMPANIES = [name.title() for name in COMPANY_URLS]
+
+
+def bench_companies(count: int) -> List[str]:
+    names = KNOWN_COMPANIES[:count]
+    return names + [f"Empresa {i}" for i in range(count - len(names))]
+
+
+# ============================================================
+# 🔀 REDIRECIONAMENTO PARA O SERVIDOR LOCAL
+# ============================================================
+
+class StubTransport(PooledTransport):
+    """Reescreve ``https://host/caminho`` para ``http://127.0.0.1:porta/host/caminho``"""
+
+    def __init__(self, port: int, limits: httpx.Limits):
+        super().__init__(limits)
+        self.port = port
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        url = request.url
+        request.url = url.copy_with(scheme="http", host="127.0.0.1", port=self.port,
+                                    raw_path=f"/{url.host}{url.raw_path.decode('ascii')}".encode("ascii"))
+        return await super().handle_async_request(request)
+
+
+def _stub_client_factory(port: int) -> Callable[..., httpx.AsyncClient]:
+    def new_client(max_connections: int = aggregator.MAX_CONCURRENCY) -> httpx.AsyncClient:
+        return httpx.AsyncClient(
+            transport=StubTransport(port, httpx.Limits(max_connections=max_connections)),
+            timeout=10,
+            follow_redirects=True,
+        )
+    return new_client
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+class StubServer:
+    """``bench_stub`` num processo separado (o CPU dele não entra na medição)"""
+
+    def __init__(self, port: int):
+        self.port = port
+        self.base_url = f"http://127.0.0.1:{port}"
+        self._process = None
+
+    def __enter__(self):
+        self._process = subprocess.Popen(
+            [sys.executable, "-m", "uvicorn", "bench_stub:app", "--port", str(self.port), "--log-level", "warning"],
+            cwd=BACKEND_DIR,
+        )
+        for _ in range(100):
+            try:
+                httpx.get(f"{self.base_url}/_bench/stats", timeout=1)
+                return self
+            except httpx.TransportError:
+                time.sleep(0.1)
+        self.__exit__()
+        raise RuntimeError("servidor local não subiu")
+
+    def __exit__(self, *exc):
+        self._process.terminate()
+        self._process.wait(timeout=10)
+
+    def configure(self, **values: Any) -> None:
+        httpx.post(f"{self.base_url}/_bench/config", json=values).raise_for_status()
+
+    def reset(self) -> None:
+        httpx.post(f"{self.base_url}/_bench/reset").raise_for_status()
+
+    def stats(self) -> Dict[str, int]:
+        return httpx.get(f"{self.base_url}/_bench/stats").json()
+
+
+# ============================================================
+# ⏱️ MEDIÇÕES
+# ============================================================
+
+def _reset_state() -> None:
+    """Cada execução começa fria: sem cache de feeds, memo de análise ou circuitos"""
+    feed_cache.clear()
+    analyzer._memo.clear()
+    source_health.reset()
+
+
+class _Stage:
+    """Tempo de parede e de CPU (todas as threads do processo) de uma etapa"""
+
+    def __init__(self, timings: Dict[str, Dict[str, float]], name: str):
+        self.timings, self.name = timings, name
+
+    def __enter__(self):
+        self.wall, self.cpu = time.perf_counter(), time.process_time()
+
+    def __exit__(self, *exc):
+        self.timings[self.name] = {
+            "wall_s": time.perf_counter() - self.wall,
+            "cpu_s": time.process_time() - self.cpu,
+        }
+
+
+def _parse_seconds() -> float:
+    return sum(value for name, _, value in metrics.PARSE_SECONDS.samples() if name.endswith("_sum"))
+
+
+async def _staged_run(companies: List[str]) -> Tuple[Dict[str, Dict[str, float]], int, int]:
+    """A mesma sequência do ``fetch_real_news_async``, medindo etapa por etapa"""
+    timings: Dict[str, Dict[str, float]] = {}
+    parse_before = _parse_seconds()
+
+    with _Stage(timings, "collect"):
+        per_job = await run_jobs_grouped(source_registry.jobs(companies))
+    timings["parse"] = {"thread_s": _parse_seconds() - parse_before}
+    with _Stage(timings, "merge"):
+        merged = merge_by_date(per_job)
+    with _Stage(timings, "resolve"):
+        merged = await url_resolver.resolve_news(merged)
+    with _Stage(timings, "dedup"):
+        unique = dedup_news(merged)
+    with _Stage(timings, "classify"):
+        await analyzer.analyze_many(unique)
+    return timings, len(merged), len(unique)
+
+
+def _summary(values: List[float]) -> Dict[str, float]:
+    return {"median": statistics.median(values), "min": min(values), "max": max(values)}
+
+
+def run_scale(stub: StubServer, count: int, repeat: int) -> Dict[str, Any]:
+    companies = bench_companies(count)
+    stub.configure(companies=companies)
+
+    # 1) Ponta a ponta: a função pública, como o /news a chamaria
+    e2e = []
+    stub.reset()
+    for _ in range(repeat):
+        _reset_state()
+        start = time.perf_counter()
+        fetch_real_news(companies)
+        e2e.append(time.perf_counter() - start)
+    upstream = stub.stats()
+
+    # 2) Etapa por etapa
+    stages: Dict[str, List[Dict[str, float]]] = {}
+    for _ in range(repeat):
+        _reset_state()
+        timings, items, unique = asyncio.run(_staged_run(companies))
+        for name, values in timings.items():
+            stages.setdefault(name, []).append(values)
+
+    # 3) Memória: uma coleta com tracemalloc (à parte, porque ele deixa tudo mais lento)
+    _reset_state()
+    tracemalloc.start()
+    fetch_real_news(companies)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {
+        "companies": count,
+        "jobs": len(source_registry.jobs(companies)),
+        "repeat": repeat,
+        "e2e_wall_s": _summary(e2e),
+        "stages": {
+            name: {key: statistics.median(run[key] for run in runs) for key in runs[0]}
+            for name, runs in stages.items()
+        },
+        "peak_memory_mb": peak / 2**20,
+        "items": items,
+        "unique_items": unique,
+        "upstream_requests_per_run": upstream["requests"] / repeat,
+        "upstream_failures_per_run": upstream["failures"] / repeat,
+        "upstream_bytes_per_run": upstream["bytes"] / repeat,
+    }
+
+
+def _git_commit() -> str:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=BACKEND_DIR,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return ""
+
+
+# ============================================================
+# 📊 RELATÓRIO E COMPARAÇÃO
+# ============================================================
+
+def _print_report(report: Dict[str, Any]) -> None:
+    print("\n" + "=" * 72)
+    print("📏 BENCHMARK OFFLINE - fetch_real_news")
+    print("=" * 72)
+    cfg = report["config"]
+    print(f"Latência {cfg['latency'] * 1000:.0f} ms ±{cfg['jitter'] * 100:.0f}% | falhas {cfg['fail_rate'] * 100:.0f}%"
+          f" | hosts fora do ar: {', '.join(cfg['fail_hosts']) or '-'} | lentos: {', '.join(cfg['slow_hosts']) or '-'}")
+    for result in report["results"]:
+        e2e, stages = result["e2e_wall_s"], result["stages"]
+        print(f"\n📊 {result['companies']} empresas ({result['jobs']} buscas, "
+              f"{result['upstream_requests_per_run']:.0f} requisições)")
+        print(f"   - fetch_real_news: {e2e['median'] * 1000:.0f} ms "
+              f"(mín {e2e['min'] * 1000:.0f}, máx {e2e['max'] * 1000:.0f})")
+        for name in ("collect", "merge", "resolve", "dedup", "classify"):
+            print(f"   - {name:<9} parede {stages[name]['wall_s'] * 1000:8.1f} ms | CPU {stages[name]['cpu_s'] * 1000:8.1f} ms")
+        print(f"   - parsing  {stages['parse']['thread_s'] * 1000:8.1f} ms nas threads")
+        print(f"   - notícias: {result['items']} ({result['unique_items']} únicas) | "
+              f"pico de memória: {result['peak_memory_mb']:.1f} MB")
+
+
+# Métricas comparadas (quanto menor, melhor)
+_COMPARED = [
+    ("e2e", lambda r: r["e2e_wall_s"]["median"]),
+    ("collect_cpu", lambda r: r["stages"]["collect"]["cpu_s"]),
+    ("dedup_cpu", lambda r: r["stages"]["dedup"]["cpu_s"]),
+    ("classify_cpu", lambda r: r["stages"]["classify"]["cpu_s"]),
+    ("parse", lambda r: r["stages"]["parse"]["thread_s"]),
+    ("peak_memory", lambda r: r["peak_memory_mb"]),
+]
+
+
+def compare(report: Dict[str, Any], baseline: Dict[str, Any], threshold: float) -> List[str]:
+    """Métricas que pioraram mais que ``threshold`` (fração) em relação ao ``baseline``"""
+    previous = {r["companies"]: r for r in baseline.get("results", [])}
+    regressions = []
+    print(f"\n🔍 Comparação com {baseline.get('meta', {}).get('commit') or 'resultado anterior'}")
+    for result in report["results"]:
+        old = previous.get(result["companies"])
+        if old is None:
+            continue
+        for name, get in _COMPARED:
+            before, after = get(old), get(result)
+            if before <= 0:
+                continue
+            change = after / before - 1
+            flag = "⚠️" if change > threshold else "  "
+            print(f"   {flag} {result['companies']:>3} empresas {name:<13} {before:10.4f} → {after:10.4f} ({change:+.0%})")
+            if change > threshold:
+                regressions.append(f"{result['companies']} empresas: {name} {change:+.0%}")
+    return regressions
+
+
+# ============================================================
+# 🎙️ GRAVAÇÃO DAS FIXTURES
+# ============================================================
+
+def record(company: str) -> None:
+    """
+    Regrava as fixtures com respostas reais das fontes para ``company``
+    (o nome da empresa vira o marcador ``{company}``).
+    """
+    from data_source import G1_FEED, INFOMONEY_FEED, REUTERS_FEEDS, UOL_FEED
+
+    quoted = httpx.QueryParams({"q": f"{company} when:7d", "hl": "pt-BR", "gl": "BR", "ceid": "BR:pt"})
+    sources = {
+        "google.xml": f"https://news.google.com/rss/search?{quoted}",
+        "yahoo.xml": f"https://finance.yahoo.com/rss/headline?s={company}",
+        "duckduckgo.html": f"https://html.duckduckgo.com/html/?q={company} news",
+        "g1.xml": G1_FEED,
+        "infomoney.xml": INFOMONEY_FEED,
+        "uol.xml": UOL_FEED,
+        "reuters.xml": REUTERS_FEEDS[0],
+    }
+    headers = {"User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36"}
+    with httpx.Client(follow_redirects=True, timeout=20, headers=headers) as client:
+        for name, url in sources.items():
+            try:
+                r = client.get(url)
+                r.raise_for_status()
+            except httpx.HTTPError as e:
+                print(f"⚠️ {name}: {e}")
+                continue
+            with open(os.path.join(FIXTURES_DIR, name), "wb") as f:
+                f.write(r.content.replace(company.encode("utf-8"), b"{company}"))
+            print(f"🎙️ {name}: {len(r.content)} bytes")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark offline do fetch_real_news")
+    parser.add_argument("--scales", type=int, nargs="+", default=[1, 10, 100], help="quantidades de empresas")
+    parser.add_argument("--repeat", type=int, default=3, help="repetições por escala")
+    parser.add_argument("--latency", type=float, default=0.05, help="latência das fontes (s)")
+    parser.add_argument("--jitter", type=float, default=0.2, help="variação da latência (fração)")
+    parser.add_argument("--fail-rate", type=float, default=0.0, help="fração de respostas 503")
+    parser.add_argument("--fail-hosts", nargs="*", default=[], help="hosts sempre fora do ar (ex.: www.reuters.com)")
+    parser.add_argument("--slow-hosts", nargs="*", default=[], help="hosts lentos")
+    parser.add_argument("--slow-latency", type=float, default=15.0, help="latência dos hosts lentos (s)")
+    parser.add_argument("--host-rate", type=float,
+                        help="requisições/s por host para todos os hosts (0 desliga o limite; padrão: o do rate_limit)")
+    parser.add_argument("--output", help="arquivo JSON com o resultado")
+    parser.add_argument("--compare", help="resultado anterior (JSON) para detectar regressões")
+    parser.add_argument("--threshold", type=float, default=0.2, help="piora tolerada na comparação (fração)")
+    parser.add_argument("--record", metavar="EMPRESA", help="regrava as fixtures a partir das fontes reais")
+    args = parser.parse_args()
+
+    if args.record:
+        record(args.record)
+        return
+
+    warnings.filterwarnings("ignore")
+    logging.getLogger().setLevel(logging.ERROR)
+
+    stub_config = {
+        "latency": args.latency, "jitter": args.jitter, "fail_rate": args.fail_rate,
+        "fail_hosts": args.fail_hosts, "slow_hosts": args.slow_hosts, "slow_latency": args.slow_latency,
+    }
+    if args.host_rate is not None:
+        rate_limiter.rates = {}
+        rate_limiter.default = (args.host_rate, max(args.host_rate * 2, 1.0))
+
+    port = _free_port()
+    aggregator.new_client = _stub_client_factory(port)
+
+    with StubServer(port) as stub:
+        stub.configure(**stub_config)
+        results = [run_scale(stub, count, args.repeat) for count in args.scales]
+
+    report = {
+        "meta": {
+            "commit": _git_commit(),
+            "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpus": os.cpu_count(),
+            "max_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+        },
+        "config": {**stub_config, "repeat": args.repeat, "scales": args.scales, "host_rate": args.host_rate,
+                   "deadline_s": aggregator.DEADLINE_SECONDS, "max_concurrency": aggregator.MAX_CONCURRENCY},
+        "results": results,
+    }
+    _print_report(report)
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        print(f"\n💾 Resultado salvo em {args.output}")
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            regressions = compare(report, json.load(f), args.threshold)
+        if regressions:
+            print(f"\n❌ {len(regressions)} regressões acima de {args.threshold:.0%}")
+            sys.exit(1)
+        print("\n✅ Sem regressões")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,147 @@
+"""
+🏢 Reconhecimento de empresas no texto
+======================================
+Decide quais empresas uma notícia de feed global menciona. Cada empresa
+pode ter apelidos e tickers ("Magalu", "MGLU3" → Magazine Luiza; "MELI" →
+Mercado Livre), e a comparação ignora maiúsculas, acentos e pontuação.
+
+O ``CompanyMatcher`` monta um índice invertido (primeira palavra do termo →
+termos que começam por ela) para todas as empresas pedidas: cada notícia é
+tokenizada uma única vez e cada palavra custa uma consulta ao dicionário,
+não importa quantas empresas estão na watchlist. Termos casam por palavra
+inteira ("Stone" não casa com "milestone").
+
+Apelidos extras podem vir de um JSON em ``NEWS_COMPANY_ALIASES``
+(``{"magazine luiza": ["magalu", "mglu3"], ...}``), somados aos padrões.
+"""
+
+import json
+import logging
+import os
+import re
+from functools import lru_cache
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+from analyzer import _fold
+
+logger = logging.getLogger(__name__)
+
+ALIASES_PATH = os.getenv("NEWS_COMPANY_ALIASES", "")
+
+# Nome canônico → apelidos, marcas e tickers
+DEFAULT_ALIASES: Dict[str, List[str]] = {
+    "magazine luiza": ["magalu", "mglu3"],
+    "mercado livre": ["mercadolivre", "mercado libre", "meli"],
+    "nubank": ["nu holdings", "nu pagamentos"],
+    "totvs": ["totvs3"],
+    "stone": ["stoneco", "stone co"],
+    "natura": ["natura &co", "ntco3"],
+    "itaú unibanco": ["itaú", "itub4"],
+    "petrobras": ["petróleo brasileiro", "petr3", "petr4"],
+    "banco do brasil": ["bbas3"],
+}
+
+_WORD = re.compile(r"\w+")
+
+Term = Tuple[str, ...]
+
+
+def _tokens(text: str) -> List[str]:
+    return _WORD.findall(_fold(text))
+
+
+def load_aliases(path: str = ALIASES_PATH) -> Dict[str, List[str]]:
+    """Apelidos padrão somados aos do arquivo ``path`` (se houver)"""
+    aliases = {name: list(names) for name, names in DEFAULT_ALIASES.items()}
+    if not path:
+        return aliases
+    try:
+        with open(path, encoding="utf-8") as f:
+            extra = json.load(f)
+    except (OSError, ValueError) as e:
+        logger.warning("⚠️ Não foi possível ler os apelidos de empresas em %s: %s", path, e)
+        return aliases
+    for name, names in extra.items():
+        aliases.setdefault(name, []).extend(names)
+    return aliases
+
+
+def _alias_index(aliases: Dict[str, List[str]]) -> Dict[Term, Term]:
+    """Qualquer nome ou apelido (tokenizado) → nome canônico (tokenizado)"""
+    index: Dict[Term, Term] = {}
+    for name, names in aliases.items():
+        canonical = tuple(_tokens(name))
+        for alias in [name, *names]:
+            index.setdefault(tuple(_tokens(alias)), canonical)
+    return index
+
+
+def _group_terms(index: Dict[Term, Term]) -> Dict[Term, List[Term]]:
+    """Nome canônico → todos os termos do grupo"""
+    groups: Dict[Term, List[Term]] = {}
+    for alias, canonical in index.items():
+        groups.setdefault(canonical, []).append(alias)
+    return groups
+
+
+ALIASES = load_aliases()
+_ALIAS_INDEX = _alias_index(ALIASES)
+_TERMS_BY_CANONICAL = _group_terms(_ALIAS_INDEX)
+
+
+def canonical_company(name: str) -> str:
+    """Nome canônico, sem acentos e em minúsculas ("Magalu" → "magazine luiza")"""
+    tokens = tuple(_tokens(name))
+    return " ".join(_ALIAS_INDEX.get(tokens, tokens))
+
+
+def company_terms(name: str) -> List[Term]:
+    """Termos que identificam a empresa: o próprio nome e os apelidos do seu grupo"""
+    tokens = tuple(_tokens(name))
+    canonical = _ALIAS_INDEX.get(tokens)
+    if canonical is None:
+        return [tokens] if tokens else []
+    terms = _TERMS_BY_CANONICAL[canonical]
+    return terms if tokens in terms else [tokens, *terms]
+
+
+class CompanyMatcher:
+    """Empresas mencionadas num texto, com todas as empresas verificadas numa única passada"""
+
+    def __init__(self, companies: Iterable[str]):
+        self.companies = list(dict.fromkeys(companies))
+        # primeira palavra → [(demais palavras, empresas)]
+        self._index: Dict[str, List[Tuple[Term, List[str]]]] = {}
+        owners: Dict[Term, List[str]] = {}
+        for company in self.companies:
+            for term in company_terms(company):
+                if company not in owners.setdefault(term, []):
+                    owners[term].append(company)
+        for term, found in owners.items():
+            self._index.setdefault(term[0], []).append((term[1:], found))
+
+    def find(self, *texts: Optional[str]) -> List[str]:
+        """Empresas mencionadas em ``texts`` (na ordem em que aparecem)"""
+        found: Dict[str, None] = {}
+        for text in texts:
+            if not text:
+                continue
+            tokens = _tokens(text)
+            for i, token in enumerate(tokens):
+                candidates = self._index.get(token)
+                if not candidates:
+                    continue
+                for rest, companies in candidates:
+                    if not rest or tuple(tokens[i + 1:i + 1 + len(rest)]) == rest:
+                        found.update(dict.fromkeys(companies))
+        return list(found)
+
+
+@lru_cache(maxsize=64)
+def _cached_matcher(companies: Tuple[str, ...]) -> CompanyMatcher:
+    return CompanyMatcher(companies)
+
+
+def company_matcher(companies: Sequence[str]) -> CompanyMatcher:
+    """``CompanyMatcher`` reaproveitado entre feeds e coletas para a mesma lista de empresas"""
+    return _cached_matcher(tuple(companies))
@@ -1,404 +1,289 @@
 import os
 import httpx
 from bs4 import BeautifulSoup
-from typing import List, Dict
+from typing import AsyncIterator, Dict, Iterable, List, Optional, Tuple
 from dotenv import load_dotenv
-from datetime import datetime
-import re
+from datetime import datetime, timezone
+from contextlib import aclosing
+import asyncio
+import heapq
+import json
+import logging
 import urllib.parse
 
+from aggregator import iter_jobs, run_blocking, run_jobs_grouped, run_jobs_sync
+from dates import parse_published, published_fields
+from dedup import dedup_news
+from analyzer import analyze_many
+from companies import canonical_company, company_matcher
+from feed_cache import feed_cache
+from rss_parser import iter_rss_items, parse_description_html
+from sources import FEED, PAID, SCRAPE, Source, _fetch_failed, _found, source_registry
+from url_resolver import url_resolver
+
 # 🔹 Carrega variáveis de ambiente (.env)
 load_dotenv()
 SERP_API_KEY = os.getenv("SERP_API_KEY")
 BING_API_KEY = os.getenv("BING_API_KEY")  # Opcional: Bing News API
+# Empresas por busca no Google News (consulta OR); 0 ou 1 faz uma busca por empresa
+GOOGLE_BATCH = int(os.getenv("NEWS_GOOGLE_BATCH", "5"))
+
+logger = logging.getLogger(__name__)
+
+# User-Agent de navegador para as fontes que recusam clientes HTTP genéricos
+BROWSER_HEADERS = {
+    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36"
+}
 
 # ==============================================================
 # 🧩 Utilitários
 # ==============================================================
 
-def _soup_xml(xml_bytes):
-    """Converte o RSS/XML para BeautifulSoup"""
-    try:
-        return BeautifulSoup(xml_bytes, "xml")
-    except Exception:
-        return BeautifulSoup(xml_bytes, "html.parser")
+def _parse_rss_mentions(content: bytes, companies: List[str], fonte: str, fonte_type: str,
+                        limit: int = 10, match_description: bool = True) -> Dict[str, List[Dict[str, str]]]:
+    """
+    Extrai de um feed global as notícias que mencionam cada empresa
+    (no título e, com ``match_description``, também na descrição), pelo
+    nome ou por um apelido ("Magalu", "MELI").
+    """
+    matcher = company_matcher(companies)
+    matches = {company: [] for company in matcher.companies}
+
+    for it in iter_rss_items(content, limit=limit):
+        title = it["title"]
+        description = it["description"]
+
+        # Filtra notícias relevantes às empresas
+        mentioned = matcher.find(title, description) if match_description else matcher.find(title)
+        if not mentioned:
+            continue
 
-def _first_publisher_link(description_html: str) -> str:
-    """Extrai o link real da notícia dentro do HTML do RSS"""
-    try:
-        soup = BeautifulSoup(description_html or "", "html.parser")
-        a = soup.find("a", href=True)
-        return a["href"].strip() if a else ""
-    except Exception:
-        return ""
+        published_ts, published_at = published_fields(it["pub_date"])
+
+        for company in mentioned:
+            matches[company].append({
+                "company": company,
+                "title": title,
+                "description": description,
+                "url": it["link"],
+                "fonte": fonte,
+                "fonte_type": fonte_type,
+                "published_at": published_at,
+                "published_ts": published_ts,
+            })
+
+    return matches
+
+def _parse_rss_company(content: bytes, company: str, fonte: str, fonte_type: str,
+                       limit: int = 5) -> List[Dict[str, str]]:
+    """Extrai as notícias de um feed RSS de uma única empresa (``fonte`` aceita ``{company}``)"""
+    results = []
+
+    for it in iter_rss_items(content, limit=limit):
+        published_ts, published_at = published_fields(it["pub_date"])
+
+        results.append({
+            "company": company,
+            "title": it["title"],
+            "description": it["description"],
+            "url": it["link"],
+            "fonte": fonte.replace("{company}", company),
+            "fonte_type": fonte_type,
+            "published_at": published_at,
+            "published_ts": published_ts,
+        })
+
+    return results
+
+def fetch_source_news(source: str, companies: List[str]) -> List[Dict[str, str]]:
+    """Busca notícias de uma única fonte do registro (versão síncrona, para scripts)"""
+    return run_jobs_sync(source_registry.jobs(companies, [source]))
 
 # ==============================================================
 # 🌎 GOOGLE NEWS RSS
 # ==============================================================
 
-def fetch_google_news(companies: List[str]) -> List[Dict[str, str]]:
-    """Busca notícias via Google News RSS (últimos 7 dias)"""
-    results: List[Dict[str, str]] = []
+# Notícias por empresa em cada busca do Google News (também a cota por empresa nas buscas em lote)
+GOOGLE_LIMIT = 10
+
+def _google_news_items(content: bytes, limit: Optional[int]) -> Iterable[Dict[str, str]]:
+    """Itens de um feed do Google News, ainda sem a empresa"""
+    for it in iter_rss_items(content, limit=limit):
+        title = it["title"]
+        link_google = it["link"]
+        raw_description = it["description"]
+
+        # 🔹 Limpa HTML residual da descrição e extrai, no mesmo parse,
+        #    o link real da matéria (publisher) e o nome da fonte (<font>)
+        description, publisher_url, source_name = parse_description_html(raw_description)
+        article_url = publisher_url or link_google
+        if not title or not article_url:
+            continue
 
-    for company in companies:
-        # Adiciona filtro temporal: when:7d (últimos 7 dias)
-        query = urllib.parse.quote(f"{company} when:7d")
-        url = f"https://news.google.com/rss/search?q={query}&hl=pt-BR&gl=BR&ceid=BR:pt"
-        print(f"🔍 Buscando notícias para: {company} → {url}")
+        # 🔹 Extrai data (RFC 822 / ISO 8601) já como timestamp com fuso
+        published_ts, published_at = published_fields(it["pub_date"])
+
+        # 🔹 Monta o dicionário compatível com o modelo
+        yield {
+            "title": title,
+            "description": description,
+            "url": article_url,
+            "fonte": source_name or "Google News",
+            "fonte_type": "google",
+            "published_at": published_at,
+            "published_ts": published_ts,
+        }
 
-        try:
-            r = httpx.get(url, timeout=10, follow_redirects=True)
-            r.raise_for_status()
-            soup = BeautifulSoup(r.content, "xml")
-            items = soup.find_all("item")
-
-            for it in items[:10]:
-                title = (it.title.text or "").strip() if it.title else ""
-                link_google = (it.link.text or "").strip() if it.link else ""
-                raw_description = (it.description.text or "").strip() if it.description else ""
-
-                # 🔹 Limpa HTML residual da descrição
-                try:
-                    desc_soup = BeautifulSoup(raw_description, "html.parser")
-                    description = desc_soup.get_text(" ", strip=True)
-                except Exception:
-                    description = raw_description
-
-                # 🔹 Extrai link real da matéria (link do publisher)
-                a_tag = BeautifulSoup(raw_description, "html.parser").find("a", href=True)
-                article_url = a_tag["href"].strip() if a_tag else link_google
-                if not title or not article_url:
-                    continue
-
-                # 🔹 Extrai nome da fonte (publisher)
-                source_name = ""
-                try:
-                    font_tag = BeautifulSoup(raw_description, "html.parser").find("font")
-                    if font_tag:
-                        source_name = font_tag.get_text(strip=True)
-                except Exception:
-                    pass
-
-                # 🔹 Extrai data (vários formatos possíveis)
-                published_at = None
-                try:
-                    pub_date_tag = (
-                        it.find("pubDate") or it.find("dc:date") or it.find("updated")
-                    )
-                    if pub_date_tag and pub_date_tag.text:
-                        date_text = pub_date_tag.text.strip()
-                        for fmt in (
-                            "%a, %d %b %Y %H:%M:%S %Z",  # Wed, 16 Oct 2025 13:14:00 GMT
-                            "%Y-%m-%dT%H:%M:%S%z",     # 2025-10-16T13:14:00+0000
-                            "%Y-%m-%dT%H:%M:%SZ",      # 2025-10-16T13:14:00Z
-                        ):
-                            try:
-                                dt = datetime.strptime(date_text, fmt)
-                                published_at = dt.strftime("%d/%m/%Y %H:%M")
-                                break
-                            except Exception:
-                                continue
-                        if not published_at:
-                            published_at = date_text
-                except Exception as e:
-                    print(f"⚠️ Erro ao ler data de {company}: {e}")
-
-                # 🔹 Loga o item encontrado
-                print(f"🕒 {company} → {title[:50]}... → {published_at or 'sem data'}")
-
-                # 🔹 Monta o dicionário compatível com o modelo
-                results.append({
-                    "company": company,
-                    "title": title,
-                    "description": description,
-                    "url": article_url,
-                    "fonte": source_name or "Google News",
-                    "fonte_type": "google",
-                    "published_at": published_at,
-                })
+def _parse_google_news(content: bytes, company: str) -> List[Dict[str, str]]:
+    """Extrai as notícias de um feed do Google News"""
+    results = []
 
-        except Exception as e:
-            print(f"⚠️ Erro ao buscar Google News para {company}: {e}")
+    for item in _google_news_items(content, limit=GOOGLE_LIMIT):
+        # 🔹 Loga o item encontrado
+        logger.debug("🕒 %s → %s... → %s", company, item["title"][:50],
+                     item["published_ts"] or item["published_at"] or "sem data")
+        results.append({"company": company, **item})
+
+    return results
+
+def _parse_google_news_batch(content: bytes, companies: List[str]) -> Dict[str, List[Dict[str, str]]]:
+    """
+    Extrai as notícias de uma busca em lote (``("A" OR "B") when:7d``):
+    cada item vai para as empresas que ele menciona (nome ou apelido), até
+    ``GOOGLE_LIMIT`` por empresa, como na busca individual.
+    """
+    matcher = company_matcher(companies)
+    matches = {company: [] for company in matcher.companies}
+    pending = len(matches)
+
+    for item in _google_news_items(content, limit=None):
+        for company in matcher.find(item["title"], item["description"]):
+            found = matches[company]
+            if len(found) >= GOOGLE_LIMIT:
+                continue
+            found.append({"company": company, **item})
+            if len(found) == GOOGLE_LIMIT:
+                pending -= 1
+        if not pending:
+            break  # todas as empresas já completaram a cota
 
-    print(f"✅ Google News: {len(results)} resultados no total.")
+    return matches
+
+def fetch_google_news(companies: List[str]) -> List[Dict[str, str]]:
+    """Busca notícias via Google News RSS (últimos 7 dias)"""
+    results = fetch_source_news("google", companies)
+    logger.info("✅ Google News: %d resultados no total.", len(results))
     return results
 
 # ==============================================================
 # 🔗 LINKEDIN VIA SERPAPI
 # ==============================================================
 
-def fetch_linkedin_posts(company: str) -> List[Dict[str, str]]:
-    """Busca postagens do LinkedIn via SerpApi (Google search)"""
+def _parse_linkedin(content: bytes, company: str) -> List[Dict[str, str]]:
+    """Extrai os resultados do LinkedIn da resposta JSON da SerpApi"""
     results = []
-    if not SERP_API_KEY:
-        print("⚠️ SERP_API_KEY não configurada no .env")
-        return results
-
-    url = "https://serpapi.com/search.json"
-    params = {
-        "engine": "google",
-        "q": f"site:linkedin.com/company {company}",
-        "api_key": SERP_API_KEY,
-        "hl": "pt-BR",
-        "num": 5,
-    }
 
     try:
-        r = httpx.get(url, params=params, timeout=15)
-        r.raise_for_status()
+        data = json.loads(content)
+    except ValueError:
+        logger.warning("⚠️ Resposta não JSON da SerpApi: %r", content[:200], extra={"source": "linkedin", "company": company})
+        return results
 
-        if "application/json" not in r.headers.get("content-type", ""):
-            print(f"⚠️ Resposta não JSON da SerpApi: {r.text[:200]}")
-            return results
-
-        data = r.json()
-        
-        # 🔹 Extrai data do search_metadata (created_at)
-        search_created_at = None
-        try:
-            search_metadata = data.get("search_metadata", {})
-            created_at_text = search_metadata.get("created_at", "")
-            if created_at_text:
-                # Formato: "2025-10-21 18:58:25 UTC"
-                dt = datetime.strptime(created_at_text, "%Y-%m-%d %H:%M:%S UTC")
-                search_created_at = dt.strftime("%d/%m/%Y %H:%M")
-                print(f"📅 LinkedIn {company}: Data da busca - {search_created_at}")
-        except Exception as e:
-            print(f"⚠️ Erro ao processar created_at do LinkedIn para {company}: {e}")
-        
-        for item in data.get("organic_results", []):
-            results.append({
-                "company": company,
-                "title": item.get("title", ""),
-                "description": item.get("snippet", ""),
-                "url": item.get("link", ""),
-                "fonte": "LinkedIn",
-                "fonte_type": "linkedin",
-                "published_at": search_created_at,  # Usa a data da busca como referência
-            })
-        print(f"🔗 LinkedIn: {len(results)} resultados para {company}")
-    except Exception as e:
-        print(f"⚠️ Erro ao buscar LinkedIn para {company}: {e}")
+    # 🔹 Extrai data do search_metadata (created_at)
+    # Formato: "2025-10-21 18:58:25 UTC"
+    created_at_text = (data.get("search_metadata") or {}).get("created_at", "")
+    search_created_at = parse_published(created_at_text)
+    if search_created_at:
+        logger.debug("📅 LinkedIn %s: Data da busca - %s", company, search_created_at)
+    elif created_at_text:
+        logger.warning("⚠️ Erro ao processar created_at do LinkedIn para %s: %r", company, created_at_text)
+
+    for item in data.get("organic_results", []):
+        results.append({
+            "company": company,
+            "title": item.get("title", ""),
+            "description": item.get("snippet", ""),
+            "url": item.get("link", ""),
+            "fonte": "LinkedIn",
+            "fonte_type": "linkedin",
+            "published_at": None,
+            "published_ts": search_created_at,  # Usa a data da busca como referência
+        })
 
     return results
 
+def fetch_linkedin_posts(company: str) -> List[Dict[str, str]]:
+    """Busca postagens do LinkedIn via SerpApi (Google search)"""
+    if not SERP_API_KEY:
+        logger.warning("⚠️ SERP_API_KEY não configurada no .env")
+        return []
+
+    return fetch_source_news("linkedin", [company])
+
 # ==============================================================
 # 🌍 BING NEWS SEARCH
 # ==============================================================
 
+def _parse_bing(content: bytes, company: str) -> List[Dict[str, str]]:
+    """Extrai as notícias da resposta JSON da Bing News Search API"""
+    results = []
+    data = json.loads(content)
+
+    for article in data.get("value", []):
+        published_ts, published_at = published_fields(article.get("datePublished"))
+
+        results.append({
+            "company": company,
+            "title": article.get("name", ""),
+            "description": article.get("description", ""),
+            "url": article.get("url", ""),
+            "fonte": article.get("provider", [{}])[0].get("name", "Bing News"),
+            "fonte_type": "bing",
+            "published_at": published_at,
+            "published_ts": published_ts,
+        })
+
+    return results
+
 def fetch_bing_news(companies: List[str]) -> List[Dict[str, str]]:
     """Busca notícias via Bing News Search API"""
-    results = []
-    
     if not BING_API_KEY:
-        print("⚠️ BING_API_KEY não configurada - pulando Bing News")
-        return results
-    
-    for company in companies:
-        url = "https://api.bing.microsoft.com/v7.0/news/search"
-        headers = {"Ocp-Apim-Subscription-Key": BING_API_KEY}
-        params = {
-            "q": company,
-            "mkt": "pt-BR",
-            "count": 10,
-            "freshness": "Week"
-        }
-        
-        try:
-            r = httpx.get(url, headers=headers, params=params, timeout=10)
-            r.raise_for_status()
-            data = r.json()
-            
-            for article in data.get("value", []):
-                published_at = None
-                if article.get("datePublished"):
-                    try:
-                        dt = datetime.fromisoformat(article["datePublished"].replace("Z", "+00:00"))
-                        published_at = dt.strftime("%d/%m/%Y %H:%M")
-                    except:
-                        published_at = article.get("datePublished")
-                
-                results.append({
-                    "company": company,
-                    "title": article.get("name", ""),
-                    "description": article.get("description", ""),
-                    "url": article.get("url", ""),
-                    "fonte": article.get("provider", [{}])[0].get("name", "Bing News"),
-                    "fonte_type": "bing",
-                    "published_at": published_at,
-                })
-            
-            print(f"🔵 Bing News: {len(results)} resultados para {company}")
-        except Exception as e:
-            print(f"⚠️ Erro ao buscar Bing News para {company}: {e}")
-    
-    return results
+        logger.warning("⚠️ BING_API_KEY não configurada - pulando Bing News")
+        return []
+
+    return fetch_source_news("bing", companies)
 
 # ==============================================================
-# 📰 G1 GLOBO (RSS)
+# 📰 PORTAIS (RSS GLOBAIS)
 # ==============================================================
+# Cada feed é baixado uma vez por coleta e filtrado para todas as empresas
+# (ver ``_parse_rss_mentions`` e o catálogo no fim do arquivo).
+
+G1_FEED = "https://g1.globo.com/dynamo/economia/rss2.xml"
+INFOMONEY_FEED = "https://www.infomoney.com.br/feed/"
+UOL_FEED = "https://rss.uol.com.br/feed/economia.xml"
+
+# Reuters tem vários feeds RSS
+REUTERS_FEEDS = [
+    "https://www.reuters.com/arc/outboundfeeds/v3/rss/?outputType=xml&size=10",
+    "https://www.reuters.com/business/rss/",
+]
 
 def fetch_g1_news(companies: List[str]) -> List[Dict[str, str]]:
     """Busca notícias no G1 via RSS"""
-    results = []
-    
-    for company in companies:
-        # G1 tem RSS de busca
-        query = urllib.parse.quote(company)
-        url = f"https://g1.globo.com/dynamo/economia/rss2.xml"
-        
-        try:
-            r = httpx.get(url, timeout=10, follow_redirects=True)
-            r.raise_for_status()
-            soup = BeautifulSoup(r.content, "xml")
-            items = soup.find_all("item")
-            
-            for it in items[:5]:
-                title = (it.title.text or "").strip() if it.title else ""
-                # Filtra apenas notícias que mencionam a empresa
-                if company.lower() not in title.lower():
-                    continue
-                
-                description = (it.description.text or "").strip() if it.description else ""
-                link = (it.link.text or "").strip() if it.link else ""
-                
-                published_at = None
-                if it.pubDate:
-                    try:
-                        date_text = it.pubDate.text.strip()
-                        dt = datetime.strptime(date_text, "%a, %d %b %Y %H:%M:%S %z")
-                        published_at = dt.strftime("%d/%m/%Y %H:%M")
-                    except:
-                        published_at = it.pubDate.text
-                
-                results.append({
-                    "company": company,
-                    "title": title,
-                    "description": description,
-                    "url": link,
-                    "fonte": "G1 Globo",
-                    "fonte_type": "g1",
-                    "published_at": published_at,
-                })
-            
-            print(f"🟢 G1: {len([r for r in results if r['company']==company])} resultados para {company}")
-        except Exception as e:
-            print(f"⚠️ Erro ao buscar G1 para {company}: {e}")
-    
-    return results
-
-# ==============================================================
-# 📊 INFOMONEY (RSS)
-# ==============================================================
+    return fetch_source_news("g1", companies)
 
 def fetch_infomoney_news(companies: List[str]) -> List[Dict[str, str]]:
     """Busca notícias no InfoMoney via RSS"""
-    results = []
-    
-    for company in companies:
-        url = "https://www.infomoney.com.br/feed/"
-        
-        try:
-            r = httpx.get(url, timeout=10, follow_redirects=True)
-            r.raise_for_status()
-            soup = BeautifulSoup(r.content, "xml")
-            items = soup.find_all("item")
-            
-            for it in items[:10]:
-                title = (it.title.text or "").strip() if it.title else ""
-                description = (it.description.text or "").strip() if it.description else ""
-                
-                # Filtra notícias relevantes à empresa
-                full_text = f"{title} {description}".lower()
-                if company.lower() not in full_text:
-                    continue
-                
-                link = (it.link.text or "").strip() if it.link else ""
-                
-                published_at = None
-                if it.pubDate:
-                    try:
-                        date_text = it.pubDate.text.strip()
-                        dt = datetime.strptime(date_text, "%a, %d %b %Y %H:%M:%S %z")
-                        published_at = dt.strftime("%d/%m/%Y %H:%M")
-                    except:
-                        published_at = it.pubDate.text
-                
-                results.append({
-                    "company": company,
-                    "title": title,
-                    "description": description,
-                    "url": link,
-                    "fonte": "InfoMoney",
-                    "fonte_type": "infomoney",
-                    "published_at": published_at,
-                })
-            
-            print(f"💰 InfoMoney: {len([r for r in results if r['company']==company])} resultados para {company}")
-        except Exception as e:
-            print(f"⚠️ Erro ao buscar InfoMoney para {company}: {e}")
-    
-    return results
+    return fetch_source_news("infomoney", companies)
 
-# ==============================================================
-# 🌎 REUTERS (RSS)
-# ==============================================================
+def fetch_uol_news(companies: List[str]) -> List[Dict[str, str]]:
+    """Busca notícias no UOL Economia via RSS"""
+    return fetch_source_news("uol", companies)
 
 def fetch_reuters_news(companies: List[str]) -> List[Dict[str, str]]:
     """Busca notícias na Reuters via RSS"""
-    results = []
-    
-    # Reuters tem vários feeds RSS
-    feeds = [
-        "https://www.reuters.com/arc/outboundfeeds/v3/rss/?outputType=xml&size=10",
-        "https://www.reuters.com/business/rss/",
-    ]
-    
-    for company in companies:
-        for feed_url in feeds:
-            try:
-                r = httpx.get(feed_url, timeout=10, follow_redirects=True)
-                r.raise_for_status()
-                soup = BeautifulSoup(r.content, "xml")
-                items = soup.find_all("item")
-                
-                for it in items[:10]:
-                    title = (it.title.text or "").strip() if it.title else ""
-                    description = (it.description.text or "").strip() if it.description else ""
-                    
-                    # Filtra notícias relevantes
-                    full_text = f"{title} {description}".lower()
-                    if company.lower() not in full_text:
-                        continue
-                    
-                    link = (it.link.text or "").strip() if it.link else ""
-                    
-                    published_at = None
-                    pub_date_tag = it.find("pubDate") or it.find("dc:date")
-                    if pub_date_tag:
-                        try:
-                            date_text = pub_date_tag.text.strip()
-                            dt = datetime.strptime(date_text, "%a, %d %b %Y %H:%M:%S %z")
-                            published_at = dt.strftime("%d/%m/%Y %H:%M")
-                        except:
-                            published_at = pub_date_tag.text
-                    
-                    results.append({
-                        "company": company,
-                        "title": title,
-                        "description": description,
-                        "url": link,
-                        "fonte": "Reuters",
-                        "fonte_type": "reuters",
-                        "published_at": published_at,
-                    })
-                
-            except Exception as e:
-                print(f"⚠️ Erro ao buscar Reuters ({feed_url}) para {company}: {e}")
-        
-        print(f"📰 Reuters: {len([r for r in results if r['company']==company])} resultados para {company}")
-    
-    return results
+    return fetch_source_news("reuters", companies)
 
 # ==============================================================
 # 💼 YAHOO FINANCE (RSS)
@@ -406,365 +291,300 @@ def fetch_reuters_news(companies: List[str]) -> List[Dict[str, str]]:
 
 def fetch_yahoo_finance_news(companies: List[str]) -> List[Dict[str, str]]:
     """Busca notícias no Yahoo Finance"""
-    results = []
-    
-    for company in companies:
-        query = urllib.parse.quote(company)
-        url = f"https://finance.yahoo.com/rss/headline?s={query}"
-        
-        try:
-            r = httpx.get(url, timeout=10, follow_redirects=True)
-            r.raise_for_status()
-            soup = BeautifulSoup(r.content, "xml")
-            items = soup.find_all("item")
-            
-            for it in items[:5]:
-                title = (it.title.text or "").strip() if it.title else ""
-                description = (it.description.text or "").strip() if it.description else ""
-                link = (it.link.text or "").strip() if it.link else ""
-                
-                published_at = None
-                if it.pubDate:
-                    try:
-                        date_text = it.pubDate.text.strip()
-                        dt = datetime.strptime(date_text, "%a, %d %b %Y %H:%M:%S %z")
-                        published_at = dt.strftime("%d/%m/%Y %H:%M")
-                    except:
-                        published_at = it.pubDate.text
-                
-                results.append({
-                    "company": company,
-                    "title": title,
-                    "description": description,
-                    "url": link,
-                    "fonte": "Yahoo Finance",
-                    "fonte_type": "yahoo",
-                    "published_at": published_at,
-                })
-            
-            print(f"💹 Yahoo Finance: {len([r for r in results if r['company']==company])} resultados para {company}")
-        except Exception as e:
-            print(f"⚠️ Erro ao buscar Yahoo Finance para {company}: {e}")
-    
-    return results
+    return fetch_source_news("yahoo", companies)
 
 # ==============================================================
 # 🦆 DUCKDUCKGO NEWS
 # ==============================================================
 
-def fetch_duckduckgo_news(companies: List[str]) -> List[Dict[str, str]]:
-    """Busca notícias via DuckDuckGo (HTML scraping)"""
+def _parse_duckduckgo(content: bytes, company: str) -> List[Dict[str, str]]:
+    """Extrai os resultados da página HTML do DuckDuckGo"""
     results = []
-    
-    for company in companies:
-        query = urllib.parse.quote(f"{company} news")
-        url = f"https://html.duckduckgo.com/html/?q={query}"
-        
-        try:
-            headers = {
-                "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36"
-            }
-            r = httpx.get(url, headers=headers, timeout=10, follow_redirects=True)
-            r.raise_for_status()
-            soup = BeautifulSoup(r.content, "html.parser")
-            
-            # DuckDuckGo usa divs com classe específica para resultados
-            result_divs = soup.find_all("div", class_="result__body")
-            
-            for div in result_divs[:5]:
-                title_tag = div.find("a", class_="result__a")
-                snippet_tag = div.find("a", class_="result__snippet")
-                
-                if not title_tag:
-                    continue
-                
-                title = title_tag.get_text(strip=True)
-                link = title_tag.get("href", "")
-                description = snippet_tag.get_text(strip=True) if snippet_tag else ""
-                
-                results.append({
-                    "company": company,
-                    "title": title,
-                    "description": description,
-                    "url": link,
-                    "fonte": "DuckDuckGo",
-                    "fonte_type": "duckduckgo",
-                    "published_at": None,
-                })
-            
-            print(f"🦆 DuckDuckGo: {len([r for r in results if r['company']==company])} resultados para {company}")
-        except Exception as e:
-            print(f"⚠️ Erro ao buscar DuckDuckGo para {company}: {e}")
-    
+    soup = BeautifulSoup(content, "html.parser")
+
+    # DuckDuckGo usa divs com classe específica para resultados
+    result_divs = soup.find_all("div", class_="result__body")
+
+    for div in result_divs[:5]:
+        title_tag = div.find("a", class_="result__a")
+        snippet_tag = div.find("a", class_="result__snippet")
+
+        if not title_tag:
+            continue
+
+        title = title_tag.get_text(strip=True)
+        link = title_tag.get("href", "")
+        description = snippet_tag.get_text(strip=True) if snippet_tag else ""
+
+        results.append({
+            "company": company,
+            "title": title,
+            "description": description,
+            "url": link,
+            "fonte": "DuckDuckGo",
+            "fonte_type": "duckduckgo",
+            "published_at": None,
+            "published_ts": None,
+        })
+
     return results
 
+def fetch_duckduckgo_news(companies: List[str]) -> List[Dict[str, str]]:
+    """Busca notícias via DuckDuckGo (HTML scraping)"""
+    return fetch_source_news("duckduckgo", companies)
+
 # ==============================================================
-# 📄 UOL ECONOMIA (RSS)
+# 🏢 SITE OFICIAL DA EMPRESA
 # ==============================================================
 
-def fetch_uol_news(companies: List[str]) -> List[Dict[str, str]]:
-    """Busca notícias no UOL Economia via RSS"""
+# Mapeamento de empresas conhecidas para seus feeds RSS/páginas de notícias
+COMPANY_URLS = {
+    "nubank": {
+        "rss": "https://nubank.com.br/rss",
+        "news_page": "https://blog.nubank.com.br/",
+        "press": "https://nubank.com.br/imprensa/"
+    },
+    "totvs": {
+        "news_page": "https://www.totvs.com/sala-de-imprensa/",
+        "press": "https://www.totvs.com/sala-de-imprensa/"
+    },
+    "stone": {
+        "press": "https://investors.stone.co/news-and-events/",
+        "news_page": "https://www.stone.com.br/imprensa/"
+    },
+    "magazine luiza": {
+        "press": "https://ri.magazineluiza.com.br/",
+        "news_page": "https://www.magazineluiza.com.br/"
+    },
+    "mercado livre": {
+        "press": "https://www.mercadolivre.com.br/institucional/sala-de-imprensa",
+    },
+    "natura": {
+        "press": "https://www.naturaeco.com.br/sala-de-imprensa/",
+    }
+}
+
+def _parse_company_page(content: bytes, company: str, news_url: str) -> List[Dict[str, str]]:
+    """Extrai notícias da página de imprensa do site oficial (scraping genérico)"""
     results = []
-    
-    for company in companies:
-        url = "https://rss.uol.com.br/feed/economia.xml"
-        
+    soup = BeautifulSoup(content, "html.parser")
+
+    # Procura por elementos comuns de notícias
+    # Isso varia muito por site, então é uma abordagem genérica
+    news_elements = (
+        soup.find_all("article", limit=5) or
+        soup.find_all("div", class_=lambda x: x and ("news" in x.lower() or "post" in x.lower()), limit=5) or
+        soup.find_all("h2", limit=5)
+    )
+
+    for elem in news_elements:
+        # Tenta extrair título
+        title_tag = elem.find(["h1", "h2", "h3", "a"])
+        if not title_tag:
+            continue
+
+        title = title_tag.get_text(strip=True)
+
+        # Tenta extrair link
+        link_tag = elem.find("a", href=True)
+        link = link_tag["href"] if link_tag else news_url
+
+        # Corrige links relativos
+        if link.startswith("/"):
+            link = urllib.parse.urljoin(news_url, link)
+
+        # Tenta extrair descrição
+        desc_tag = elem.find("p")
+        description = desc_tag.get_text(strip=True)[:200] if desc_tag else ""
+
+        results.append({
+            "company": company,
+            "title": title,
+            "description": description,
+            "url": link,
+            "fonte": f"{company} Oficial",
+            "fonte_type": "company_website",
+            "published_at": None,
+            "published_ts": None,
+        })
+
+    return results
+
+async def _fetch_company_website_company(client: httpx.AsyncClient, company: str) -> List[Dict[str, str]]:
+    """Tenta buscar notícias diretamente do site oficial de uma empresa"""
+    results = []
+    # Verifica se temos URLs mapeadas para esta empresa (também pelo apelido: "Magalu")
+    urls = COMPANY_URLS.get(canonical_company(company))
+    if urls is None:
+        logger.debug("⚠️  Site oficial: Empresa '%s' não mapeada", company)
+        return results
+
+    # Tenta buscar RSS primeiro
+    if "rss" in urls:
         try:
-            r = httpx.get(url, timeout=10, follow_redirects=True)
-            r.raise_for_status()
-            soup = BeautifulSoup(r.content, "xml")
-            items = soup.find_all("item")
-            
-            for it in items[:10]:
-                title = (it.title.text or "").strip() if it.title else ""
-                description = (it.description.text or "").strip() if it.description else ""
-                
-                # Filtra notícias relevantes
-                full_text = f"{title} {description}".lower()
-                if company.lower() not in full_text:
-                    continue
-                
-                link = (it.link.text or "").strip() if it.link else ""
-                
-                published_at = None
-                if it.pubDate:
-                    try:
-                        date_text = it.pubDate.text.strip()
-                        dt = datetime.strptime(date_text, "%a, %d %b %Y %H:%M:%S %z")
-                        published_at = dt.strftime("%d/%m/%Y %H:%M")
-                    except:
-                        published_at = it.pubDate.text
-                
-                results.append({
-                    "company": company,
-                    "title": title,
-                    "description": description,
-                    "url": link,
-                    "fonte": "UOL Economia",
-                    "fonte_type": "uol",
-                    "published_at": published_at,
-                })
-            
-            print(f"🔵 UOL: {len([r for r in results if r['company']==company])} resultados para {company}")
+            results = await feed_cache.fetch_parsed(
+                client, "company_website", urls["rss"], _parse_rss_company, company,
+                "{company} Oficial", "company_website", timeout=10, follow_redirects=True,
+            )
+            _found("company_website", company, len(results), kind="rss")
+            return results
+
         except Exception as e:
-            print(f"⚠️ Erro ao buscar UOL para {company}: {e}")
-    
-    return results
+            _fetch_failed("company_website", company, e, kind="rss")
 
-# ==============================================================
-# 🏢 SITE OFICIAL DA EMPRESA
-# ==============================================================
+    # Se não tiver RSS ou falhar, tenta scraping da página de notícias/imprensa
+    news_url = urls.get("press") or urls.get("news_page")
+    if news_url:
+        try:
+            results = await feed_cache.fetch_parsed(
+                client, "company_website", news_url, _parse_company_page, company, news_url,
+                headers=BROWSER_HEADERS, timeout=10, follow_redirects=True,
+            )
+            _found("company_website", company, len(results), kind="page")
+
+        except Exception as e:
+            _fetch_failed("company_website", company, e, kind="page")
+
+    return results
 
 def fetch_company_website_news(companies: List[str]) -> List[Dict[str, str]]:
     """Tenta buscar notícias diretamente do site oficial da empresa"""
-    results = []
-    
-    # Mapeamento de empresas conhecidas para seus feeds RSS/páginas de notícias
-    company_urls = {
-        "nubank": {
-            "rss": "https://nubank.com.br/rss",
-            "news_page": "https://blog.nubank.com.br/",
-            "press": "https://nubank.com.br/imprensa/"
-        },
-        "totvs": {
-            "news_page": "https://www.totvs.com/sala-de-imprensa/",
-            "press": "https://www.totvs.com/sala-de-imprensa/"
-        },
-        "stone": {
-            "press": "https://investors.stone.co/news-and-events/",
-            "news_page": "https://www.stone.com.br/imprensa/"
-        },
-        "magazine luiza": {
-            "press": "https://ri.magazineluiza.com.br/",
-            "news_page": "https://www.magazineluiza.com.br/"
-        },
-        "mercado livre": {
-            "press": "https://www.mercadolivre.com.br/institucional/sala-de-imprensa",
-        },
-        "natura": {
-            "press": "https://www.naturaeco.com.br/sala-de-imprensa/",
-        }
-    }
-    
-    for company in companies:
-        company_lower = company.lower()
-        
-        # Verifica se temos URLs mapeadas para esta empresa
-        if company_lower not in company_urls:
-            print(f"⚠️  Site oficial: Empresa '{company}' não mapeada")
-            continue
-        
-        urls = company_urls[company_lower]
-        
-        # Tenta buscar RSS primeiro
-        if "rss" in urls:
-            try:
-                r = httpx.get(urls["rss"], timeout=10, follow_redirects=True)
-                r.raise_for_status()
-                soup = BeautifulSoup(r.content, "xml")
-                items = soup.find_all("item")
-                
-                for it in items[:5]:
-                    title = (it.title.text or "").strip() if it.title else ""
-                    description = (it.description.text or "").strip() if it.description else ""
-                    link = (it.link.text or "").strip() if it.link else ""
-                    
-                    published_at = None
-                    if it.pubDate:
-                        try:
-                            date_text = it.pubDate.text.strip()
-                            dt = datetime.strptime(date_text, "%a, %d %b %Y %H:%M:%S %z")
-                            published_at = dt.strftime("%d/%m/%Y %H:%M")
-                        except:
-                            published_at = it.pubDate.text
-                    
-                    results.append({
-                        "company": company,
-                        "title": title,
-                        "description": description,
-                        "url": link,
-                        "fonte": f"{company} Oficial",
-                        "fonte_type": "company_website",
-                        "published_at": published_at,
-                    })
-                
-                print(f"🏢 {company} (Site Oficial RSS): {len([r for r in results if r['company']==company])} resultados")
-                continue
-                
-            except Exception as e:
-                print(f"⚠️  Erro ao buscar RSS de {company}: {e}")
-        
-        # Se não tiver RSS ou falhar, tenta scraping da página de notícias/imprensa
-        news_url = urls.get("press") or urls.get("news_page")
-        if news_url:
-            try:
-                headers = {
-                    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36"
-                }
-                r = httpx.get(news_url, headers=headers, timeout=10, follow_redirects=True)
-                r.raise_for_status()
-                soup = BeautifulSoup(r.content, "html.parser")
-                
-                # Procura por elementos comuns de notícias
-                # Isso varia muito por site, então é uma abordagem genérica
-                news_elements = (
-                    soup.find_all("article", limit=5) or
-                    soup.find_all("div", class_=lambda x: x and ("news" in x.lower() or "post" in x.lower()), limit=5) or
-                    soup.find_all("h2", limit=5)
-                )
-                
-                for elem in news_elements:
-                    # Tenta extrair título
-                    title_tag = elem.find(["h1", "h2", "h3", "a"])
-                    if not title_tag:
-                        continue
-                    
-                    title = title_tag.get_text(strip=True)
-                    
-                    # Tenta extrair link
-                    link_tag = elem.find("a", href=True)
-                    link = link_tag["href"] if link_tag else news_url
-                    
-                    # Corrige links relativos
-                    if link.startswith("/"):
-                        from urllib.parse import urljoin
-                        link = urljoin(news_url, link)
-                    
-                    # Tenta extrair descrição
-                    desc_tag = elem.find("p")
-                    description = desc_tag.get_text(strip=True)[:200] if desc_tag else ""
-                    
-                    results.append({
-                        "company": company,
-                        "title": title,
-                        "description": description,
-                        "url": link,
-                        "fonte": f"{company} Oficial",
-                        "fonte_type": "company_website",
-                        "published_at": None,
-                    })
-                
-                print(f"🏢 {company} (Site Oficial): {len([r for r in results if r['company']==company])} resultados")
-                
-            except Exception as e:
-                print(f"⚠️  Erro ao buscar site de {company}: {e}")
-    
-    return results
+    return fetch_source_news("company_website", companies)
+
+# ==============================================================
+# 📚 CATÁLOGO DE FONTES
+# ==============================================================
+# Ordem de registro = ordem de prioridade dos jobs. Uma fonte nova só
+# precisa do parser e de uma entrada aqui.
+
+# 🏢 PRIORIDADE: Site oficial da empresa (fonte mais confiável)
+source_registry.register(Source(
+    "company_website", _parse_company_page, fetch=_fetch_company_website_company,
+    concurrency=4, interval=3600, cost=SCRAPE,
+))
+
+# Fontes principais (sempre ativas)
+source_registry.register(Source(
+    "google", _parse_google_news, query="{company} when:7d",
+    url="https://news.google.com/rss/search?q={query}&hl=pt-BR&gl=BR&ceid=BR:pt",
+    interval=120, batch=GOOGLE_BATCH, batch_parse=_parse_google_news_batch,
+))
+# Feeds globais: baixados uma vez por requisição, filtrados para todas as empresas
+source_registry.register(Source(
+    "g1", _parse_rss_mentions, feeds=(G1_FEED,), parse_args=("G1 Globo", "g1", 5, False), cost=FEED,
+))
+source_registry.register(Source(
+    "infomoney", _parse_rss_mentions, feeds=(INFOMONEY_FEED,), parse_args=("InfoMoney", "infomoney"), cost=FEED,
+))
+source_registry.register(Source(
+    "uol", _parse_rss_mentions, feeds=(UOL_FEED,), parse_args=("UOL Economia", "uol"), cost=FEED,
+))
+source_registry.register(Source(
+    "reuters", _parse_rss_mentions, feeds=tuple(REUTERS_FEEDS), parse_args=("Reuters", "reuters"), cost=FEED,
+))
+source_registry.register(Source(
+    "yahoo", _parse_rss_company, url="https://finance.yahoo.com/rss/headline?s={query}",
+    parse_args=("Yahoo Finance", "yahoo"), interval=600,
+))
+source_registry.register(Source(
+    "duckduckgo", _parse_duckduckgo, url="https://html.duckduckgo.com/html/?q={query}", query="{company} news",
+    headers=BROWSER_HEADERS, concurrency=2, interval=900, cost=SCRAPE,
+))
+
+# Fontes com API key (opcionais)
+source_registry.register(Source(
+    "linkedin", _parse_linkedin, url="https://serpapi.com/search.json",
+    params={
+        "engine": "google",
+        "q": "site:linkedin.com/company {company}",
+        "api_key": SERP_API_KEY,
+        "hl": "pt-BR",
+        "num": 5,
+    },
+    timeout=15, concurrency=2, interval=3600, cost=PAID, enabled=lambda: bool(SERP_API_KEY),
+))
+source_registry.register(Source(
+    "bing", _parse_bing, url="https://api.bing.microsoft.com/v7.0/news/search",
+    params={"q": "{company}", "mkt": "pt-BR", "count": 10, "freshness": "Week"},
+    headers={"Ocp-Apim-Subscription-Key": BING_API_KEY or ""},
+    interval=900, cost=PAID, enabled=lambda: bool(BING_API_KEY),
+))
 
 # ==============================================================
 # 🔹 AGREGADOR FINAL
 # ==============================================================
 
-def fetch_real_news(companies: List[str]) -> List[Dict[str, str]]:
-    """Combina TODAS as fontes de notícias disponíveis e ordena por data"""
-    results = []
-    
-    print(f"\n🚀 Iniciando busca em múltiplas fontes para: {', '.join(companies)}\n")
-    
-    # 🏢 PRIORIDADE: Site oficial da empresa (fonte mais confiável)
-    results.extend(fetch_company_website_news(companies))
-    
-    # Fontes principais (sempre ativas)
-    results.extend(fetch_google_news(companies))
-    results.extend(fetch_g1_news(companies))
-    results.extend(fetch_infomoney_news(companies))
-    results.extend(fetch_uol_news(companies))
-    results.extend(fetch_reuters_news(companies))
-    results.extend(fetch_yahoo_finance_news(companies))
-    results.extend(fetch_duckduckgo_news(companies))
-    
-    # Fontes com API key (opcionais)
-    for company in companies:
-        results.extend(fetch_linkedin_posts(company))
-    
-    if BING_API_KEY:
-        results.extend(fetch_bing_news(companies))
-    
-    print(f"\n✅ Total: {len(results)} notícias encontradas de todas as fontes")
-    
-    # 📅 ORDENAÇÃO POR DATA (mais recente primeiro)
-    results = sort_by_date(results)
-    print(f"📅 Notícias ordenadas por data (mais recentes primeiro)\n")
-    
+async def fetch_real_news_async(companies: List[str], client: httpx.AsyncClient = None,
+                                sources: Optional[Iterable[str]] = None, finalize: bool = True,
+                                evento: Optional[str] = None) -> List[Dict[str, str]]:
+    """
+    Combina TODAS as fontes (ou só ``sources``) em paralelo e ordena por data.
+    Com ``finalize`` aplica ``finalize_news`` (deduplicação + classificação).
+    """
+    jobs = source_registry.jobs(companies, sources)
+    logger.debug("🚀 Iniciando busca em múltiplas fontes", extra={"companies": companies, "jobs": len(jobs)})
+    per_job = await run_jobs_grouped(jobs, client=client)
+
+    # 📅 ORDENAÇÃO POR DATA (mais recente primeiro): intercala as listas de cada fonte
+    results = merge_by_date(per_job)
+    # 🔗 Links de redirecionamento (Google News) → URL final da matéria, antes da deduplicação
+    results = await url_resolver.resolve_news(results, client)
+    logger.debug("✅ Total: %d notícias encontradas de todas as fontes (ordenadas por data)", len(results),
+                 extra={"companies": companies, "items": len(results)})
+
+    # 🧬 DEDUPLICAÇÃO + 🏷️ CLASSIFICAÇÃO
+    if finalize:
+        total = len(results)
+        results = await finalize_news(results, evento)
+        logger.debug("🧬 %d notícias únicas e classificadas (de %d)", len(results), total)
+
     return results
 
+async def stream_real_news(companies: List[str], client: httpx.AsyncClient = None,
+                           sources: Optional[Iterable[str]] = None) -> AsyncIterator[Tuple[str, List[Dict[str, str]]]]:
+    """
+    Emite (fonte, notícias) à medida que cada busca termina, sem ordenar.
+    Os links de redirecionamento só são trocados se já estiverem no cache
+    (os demais são resolvidos em segundo plano): nenhum frame espera por eles.
+    """
+    logger.debug("🚀 Iniciando busca (streaming) em múltiplas fontes", extra={"companies": companies})
+
+    async with aclosing(iter_jobs(source_registry.jobs(companies, sources), client=client)) as finished:
+        async for job, items in finished:
+            yield job.source, await url_resolver.resolve_news(items, client, wait=False)
+
+def fetch_real_news(companies: List[str], sources: Optional[Iterable[str]] = None) -> List[Dict[str, str]]:
+    """Combina TODAS as fontes de notícias disponíveis (ou só ``sources``) e ordena por data"""
+    return asyncio.run(fetch_real_news_async(companies, sources=sources))
+
+
+async def finalize_news(news_list: List[Dict[str, str]], evento: Optional[str] = None) -> List[Dict[str, str]]:
+    """
+    Etapas finais sobre a lista já ordenada: agrupa as duplicatas entre fontes,
+    preenche ``evento``/``resumo`` em lote e, se pedido, filtra por evento.
+    """
+    unique = await analyze_many(await run_blocking(dedup_news, news_list))
+    if evento:
+        unique = [news for news in unique if news["evento"] == evento]
+    return unique
+
+# Notícias sem data ficam depois de todas as datadas
+_NO_DATE = datetime.min.replace(tzinfo=timezone.utc)
+
+def _date_key(news_item: Dict[str, str]) -> datetime:
+    """Chave de ordenação: o published_ts da coleta (notícias sem data vão para o final)"""
+    return news_item.get("published_ts") or _NO_DATE
 
 def sort_by_date(news_list: List[Dict[str, str]]) -> List[Dict[str, str]]:
     """Ordena lista de notícias por data (mais recente primeiro)"""
-    def parse_date(news_item):
-        """Converte string de data para datetime para ordenação"""
-        published_at = news_item.get("published_at")
-        
-        if not published_at:
-            # Notícias sem data vão para o final
-            return datetime.min
-        
-        try:
-            # Formato esperado: "DD/MM/YYYY HH:MM"
-            if "/" in published_at and ":" in published_at:
-                dt = datetime.strptime(published_at, "%d/%m/%Y %H:%M")
-                return dt
-            
-            # Tenta outros formatos comuns
-            for fmt in [
-                "%Y-%m-%d %H:%M:%S",
-                "%Y-%m-%dT%H:%M:%S",
-                "%d/%m/%Y",
-                "%Y-%m-%d"
-            ]:
-                try:
-                    return datetime.strptime(published_at, fmt)
-                except:
-                    continue
-            
-            # Se não conseguir parsear, coloca no final
-            return datetime.min
-            
-        except Exception as e:
-            print(f"⚠️  Erro ao parsear data '{published_at}': {e}")
-            return datetime.min
-    
-    # Ordena por data (mais recente primeiro)
-    sorted_news = sorted(news_list, key=parse_date, reverse=True)
-    
-    return sorted_news
+    return sorted(news_list, key=_date_key, reverse=True)
+
+def merge_by_date(news_lists: Iterable[List[Dict[str, str]]]) -> List[Dict[str, str]]:
+    """
+    Junta as listas de cada fonte numa só, da mais recente para a mais antiga.
+
+    Cada lista é ordenada isoladamente (os feeds já vêm quase em ordem, então
+    custa ~O(n)) e depois todas são intercaladas com um merge de k vias.
+    """
+    ordered = [sort_by_date(news) for news in news_lists if news]
+    return list(heapq.merge(*ordered, key=_date_key, reverse=True))
@@ -0,0 +1,62 @@
+"""
+🕒 Datas de publicação
+======================
+As fontes entregam datas em formatos variados (RFC 822 nos feeds RSS, ISO
+8601 nas APIs). Cada uma é convertida uma única vez, na coleta, para um
+``datetime`` com fuso (UTC), usado na ordenação. O texto exibido
+("dd/mm/aaaa HH:MM", no fuso de exibição) só é gerado na serialização.
+"""
+
+import os
+from datetime import datetime, timedelta, timezone
+from email.utils import parsedate_to_datetime
+from typing import Optional, Tuple
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+
+DISPLAY_FORMAT = "%d/%m/%Y %H:%M"
+
+try:
+    DISPLAY_TZ = ZoneInfo(os.getenv("NEWS_DISPLAY_TZ", "America/Sao_Paulo"))
+except ZoneInfoNotFoundError:
+    # Imagem sem tzdata: Brasília não tem horário de verão desde 2019
+    DISPLAY_TZ = timezone(timedelta(hours=-3), "BRT")
+
+
+def parse_published(text: Optional[str]) -> Optional[datetime]:
+    """Data da fonte como ``datetime`` em UTC; ``None`` se vazia ou não reconhecida"""
+    if not text:
+        return None
+    text = text.strip()
+
+    try:
+        dt = parsedate_to_datetime(text)  # Wed, 16 Oct 2025 13:14:00 GMT
+    except (TypeError, ValueError, IndexError):
+        try:
+            # 2025-10-16T13:14:00Z, 2025-10-16T13:14:00+0000, 2025-10-21 18:58:25 UTC
+            dt = datetime.fromisoformat(text.removesuffix(" UTC").replace("Z", "+00:00"))
+        except ValueError:
+            return None
+
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)
+    return dt.astimezone(timezone.utc)
+
+
+def published_fields(text: Optional[str]) -> Tuple[Optional[datetime], Optional[str]]:
+    """
+    ``(published_ts, published_at)`` de um item: o timestamp quando a data é
+    reconhecida; senão o texto original, para ainda ser exibido.
+    """
+    published_ts = parse_published(text)
+    if published_ts is not None:
+        return published_ts, None
+    return None, (text.strip() or None) if text else None
+
+
+def format_published(dt: Optional[datetime]) -> Optional[str]:
+    """Texto exibido no frontend ("dd/mm/aaaa HH:MM" no fuso de exibição)"""
+    if dt is None:
+        return None
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)
+    return dt.astimezone(DISPLAY_TZ).strftime(DISPLAY_FORMAT)
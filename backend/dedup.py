@@ -0,0 +1,271 @@
+"""
+🧬 Deduplicação entre fontes
+============================
+A mesma matéria costuma chegar pelo Google News, G1, UOL e Yahoo ao mesmo
+tempo. Esta etapa agrupa as cópias de cada empresa e devolve uma notícia
+representante por grupo, com as demais fontes em ``alternates``.
+
+1. Duplicatas exatas: URL canônica (sem rastreamento, sem AMP, com os
+   redirecionadores do Google/Bing/DuckDuckGo desembrulhados) ou título igual.
+2. Quase-duplicatas: assinaturas MinHash dos títulos, agrupadas por LSH
+   (bandas), e confirmadas pela similaridade de Jaccard (exigindo os mesmos
+   números nos dois títulos). Cada notícia só é
+   comparada com as que caem no mesmo balde, então o custo é ~linear.
+"""
+
+import os
+import random
+import re
+import unicodedata
+import zlib
+from typing import Dict, List, Optional, Sequence, Tuple
+from urllib.parse import parse_qs, parse_qsl, urlencode, urlsplit, urlunsplit
+
+# 🔹 Parâmetros do MinHash/LSH: 8 bandas x 4 linhas ≈ limiar de 0.6 de Jaccard
+NUM_BANDS = 8
+ROWS_PER_BAND = 4
+NUM_PERM = NUM_BANDS * ROWS_PER_BAND
+JACCARD_THRESHOLD = float(os.getenv("NEWS_DEDUP_THRESHOLD", "0.6"))
+# Títulos com menos tokens que isso só são agrupados por igualdade exata
+MIN_TOKENS = 3
+# Comparações por balde; protege contra baldes enormes (ex.: títulos genéricos)
+MAX_BUCKET_COMPARISONS = 16
+
+# Fonte preferida como representante do grupo (primeira = melhor)
+SOURCE_PRIORITY = (
+    "company_website", "reuters", "g1", "infomoney", "uol",
+    "google", "yahoo", "bing", "duckduckgo", "linkedin",
+)
+
+# Parâmetros só de rastreamento, que não mudam o conteúdo da página (``ref``, ``source``
+# e afins ficam: muitos sites os usam para escolher a página)
+_TRACKING_PARAMS = re.compile(r"^(utm_\w+|gclid|fbclid|msclkid|ocid|cmpid|mc_cid|mc_eid)$", re.IGNORECASE)
+
+# Redirecionadores conhecidos: host → parâmetro com a URL de destino
+_REDIRECT_PARAMS = {
+    "news.google.com": "url",
+    "google.com": "q",
+    "bing.com": "url",
+    "duckduckgo.com": "uddg",
+}
+
+_STOPWORDS = frozenset("""
+a o e as os de da do das dos em no na nos nas um uma uns umas para por com sem sobre ao aos
+que se sua seu suas seus mais diz apos entre como ja the of to in on for and is at by with from
+""".split())
+
+_PRIME = (1 << 61) - 1
+_rng = random.Random(20251016)
+_PERMUTATIONS = [(_rng.randrange(1, _PRIME), _rng.randrange(0, _PRIME)) for _ in range(NUM_PERM)]
+
+
+# ============================================================
+# 🔗 URLS E TÍTULOS
+# ============================================================
+
+def normalize_url(url: str) -> str:
+    """URL sem fragmento, sem parâmetros de rastreamento, host em minúsculas e sem www."""
+    parts = urlsplit(url.strip())
+    host = parts.netloc.lower()
+    if host.startswith("www."):
+        host = host[4:]
+    query = urlencode(sorted((k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True)
+                             if not _TRACKING_PARAMS.match(k)))
+    path = parts.path.rstrip("/") or "/"
+    return urlunsplit((parts.scheme.lower() or "https", host, path, query, ""))
+
+
+def clean_url(url: str) -> str:
+    """
+    URL para exibir e guardar: sem parâmetros de rastreamento e sem fragmento,
+    esquema e host em minúsculas, sem a porta padrão. O caminho e os demais
+    parâmetros ficam como estão (a URL continua abrindo a mesma página).
+    """
+    url = url.strip()
+    parts = urlsplit(url)
+    if not parts.netloc:
+        return url
+    scheme = parts.scheme.lower() or "https"
+    host = parts.netloc.lower().rstrip(".")
+    default_port = {"http": ":80", "https": ":443"}.get(scheme)
+    if default_port and host.endswith(default_port):
+        host = host[:-len(default_port)]
+    params = parse_qsl(parts.query, keep_blank_values=True)
+    kept = [(k, v) for k, v in params if not _TRACKING_PARAMS.match(k)]
+    query = urlencode(kept) if len(kept) != len(params) else parts.query
+    return urlunsplit((scheme, host, parts.path or "/", query, ""))
+
+
+def canonical_url(url: str) -> str:
+    """
+    Forma canônica para comparar URLs de fontes diferentes: desembrulha
+    redirecionadores, troca http por https e remove variantes AMP/mobile.
+    """
+    url = url.strip()
+    if url.startswith("//"):
+        url = "https:" + url
+
+    for _ in range(3):  # redirecionadores aninhados
+        parts = urlsplit(url)
+        host = parts.netloc.lower().removeprefix("www.")
+        param = _REDIRECT_PARAMS.get(host)
+        target = parse_qs(parts.query).get(param, [""])[0] if param else ""
+        if not target.startswith(("http://", "https://")):
+            break
+        url = target
+
+    parts = urlsplit(normalize_url(url))
+    host = parts.netloc
+    for prefix in ("amp.", "m."):
+        if host.startswith(prefix):
+            host = host[len(prefix):]
+    path = re.sub(r"/amp$|\.amp$", "", parts.path) or "/"
+    return urlunsplit(("https", host, path, parts.query, ""))
+
+
+def _strip_accents(text: str) -> str:
+    return "".join(c for c in unicodedata.normalize("NFKD", text) if not unicodedata.combining(c))
+
+
+def normalize_title(title: str) -> str:
+    return " ".join(title.lower().split())
+
+
+def title_tokens(title: str) -> frozenset:
+    """Tokens do título sem acentos, sem stopwords e sem o sufixo " - Veículo" """
+    title = re.sub(r"\s[-|–]\s[^-|–]{1,40}$", "", title.strip())
+    words = re.findall(r"\w+", _strip_accents(title.lower()))
+    return frozenset(w for w in words if w not in _STOPWORDS)
+
+
+# ============================================================
+# 🧮 MINHASH
+# ============================================================
+
+def _minhash(tokens: frozenset) -> Tuple[int, ...]:
+    hashes = [zlib.crc32(t.encode("utf-8")) for t in tokens]
+    return tuple(min((a * h + b) % _PRIME for h in hashes) for a, b in _PERMUTATIONS)
+
+
+def _jaccard(a: frozenset, b: frozenset) -> float:
+    if not a or not b:
+        return 0.0
+    return len(a & b) / len(a | b)
+
+
+def _similar(a: frozenset, b: frozenset, threshold: float) -> bool:
+    """Jaccard acima do limiar e os mesmos números ("1º trimestre" ≠ "2º trimestre")"""
+    if {t for t in a if any(c.isdigit() for c in t)} != {t for t in b if any(c.isdigit() for c in t)}:
+        return False
+    return _jaccard(a, b) >= threshold
+
+
+class _UnionFind:
+    def __init__(self, size: int):
+        self.parent = list(range(size))
+
+    def find(self, i: int) -> int:
+        while self.parent[i] != i:
+            self.parent[i] = self.parent[self.parent[i]]
+            i = self.parent[i]
+        return i
+
+    def union(self, a: int, b: int) -> None:
+        ra, rb = self.find(a), self.find(b)
+        if ra != rb:
+            # A raiz é sempre o menor índice (mantém a ordem de entrada)
+            self.parent[max(ra, rb)] = min(ra, rb)
+
+
+# ============================================================
+# 🧬 AGRUPAMENTO
+# ============================================================
+
+def cluster_news(items: Sequence[Dict[str, str]], threshold: float = JACCARD_THRESHOLD) -> List[List[int]]:
+    """
+    Agrupa as notícias duplicadas da mesma empresa.
+
+    Retorna grupos de índices de ``items``; o primeiro índice de cada grupo é
+    o representante escolhido e os grupos seguem a ordem da entrada (o grupo
+    aparece onde aparecia a sua notícia mais bem posicionada).
+    """
+    uf = _UnionFind(len(items))
+    exact: Dict[Tuple[str, str], int] = {}
+    buckets: Dict[Tuple[str, int, Tuple[int, ...]], List[int]] = {}
+    tokens: List[frozenset] = []
+
+    for i, item in enumerate(items):
+        company = (item.get("company") or "").lower()
+        title = item.get("title") or ""
+        tokens.append(title_tokens(title))
+
+        # 1) Duplicatas exatas (URL canônica ou título)
+        keys = [("t", normalize_title(title))] if title.strip() else []
+        if item.get("url"):
+            keys.append(("u", canonical_url(item["url"])))
+        for kind, value in keys:
+            key = (company, kind + ":" + value)
+            if key in exact:
+                uf.union(exact[key], i)
+            else:
+                exact[key] = i
+
+        # 2) Quase-duplicatas (LSH sobre o MinHash do título)
+        if len(tokens[i]) < MIN_TOKENS:
+            continue
+        signature = _minhash(tokens[i])
+        for band in range(NUM_BANDS):
+            rows = signature[band * ROWS_PER_BAND:(band + 1) * ROWS_PER_BAND]
+            members = buckets.setdefault((company, band, rows), [])
+            for j in members[:MAX_BUCKET_COMPARISONS]:
+                if uf.find(i) != uf.find(j) and _similar(tokens[i], tokens[j], threshold):
+                    uf.union(i, j)
+            members.append(i)
+
+    groups: Dict[int, List[int]] = {}
+    for i in range(len(items)):
+        groups.setdefault(uf.find(i), []).append(i)
+
+    clusters = []
+    for root in sorted(groups):
+        members = groups[root]
+        best = min(members, key=lambda i: _cluster_sort_key(items[i], i))
+        clusters.append([best] + [i for i in members if i != best])
+    return clusters
+
+
+def _source_rank(item: Dict[str, str]) -> int:
+    try:
+        return SOURCE_PRIORITY.index(item.get("fonte_type") or "")
+    except ValueError:
+        return len(SOURCE_PRIORITY)
+
+
+def _cluster_sort_key(item: Dict[str, str], index: int) -> Tuple[int, bool, int]:
+    """Representante do grupo: fonte mais confiável, depois com data, depois a primeira coletada"""
+    has_date = bool(item.get("published_ts") or item.get("published_at"))
+    return _source_rank(item), not has_date, index
+
+
+def dedup_news(items: Sequence[Dict[str, str]], clusters: Optional[List[List[int]]] = None) -> List[Dict[str, str]]:
+    """Uma notícia por grupo, com as outras fontes do grupo em ``alternates``"""
+    if clusters is None:
+        clusters = cluster_news(items)
+
+    results = []
+    for best, *others in clusters:
+        news = dict(items[best])
+        seen = {(news.get("fonte_type"), canonical_url(news["url"]) if news.get("url") else "")}
+        alternates = []
+        for i in others:
+            other = items[i]
+            # A mesma URL vinda da mesma fonte (ex.: duas buscas) aparece uma vez só
+            key = (other.get("fonte_type"), canonical_url(other["url"]) if other.get("url") else "")
+            if key in seen:
+                continue
+            seen.add(key)
+            alternates.append({"fonte": other.get("fonte", ""), "fonte_type": other.get("fonte_type", ""),
+                               "url": other.get("url", "")})
+        news["alternates"] = alternates
+        results.append(news)
+    return results
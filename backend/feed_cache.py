@@ -0,0 +1,385 @@
+"""
+🗄️ Cache de feeds
+=================
+Cache em memória (LRU limitado) para as respostas das fontes, com TTL por
+fonte e revalidação condicional (``If-None-Match`` / ``If-Modified-Since``).
+
+O cache guarda o corpo da resposta e também o resultado já parseado: um
+acerto dentro do TTL ou uma revalidação com ``304 Not Modified`` não baixa
+nem parseia o feed de novo.
+
+Leitura incremental (``with feed_cache.incremental():``): cada feed (URL +
+parser + argumentos) tem um ``HighWaterMark`` e só o que apareceu desde a
+última leitura incremental é devolvido. Feed igual ao da última leitura
+não é nem parseado; num feed em ordem cronológica o parse para no primeiro
+item já visto; e, em qualquer fonte, resultados com URL já devolvida saem
+do resultado. Assim o custo da coleta periódica acompanha o volume de
+notícias novas, não o tamanho dos feeds.
+
+As marcas só avançam no ``commit()`` da leitura, chamado depois que as
+notícias foram gravadas: se a gravação falhar, a próxima coleta lê tudo
+de novo. ``seen`` traz as notícias puladas por já terem sido lidas (ainda
+presentes no feed), para o armazenamento renovar o ``last_seen`` delas.
+"""
+
+import copy
+import os
+import time
+import zlib
+from collections import OrderedDict
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from functools import partial
+from typing import Any, Callable, Dict, Hashable, Iterator, Optional, Set, Tuple
+
+import httpx
+
+from aggregator import SingleFlight, env_seconds_map, run_blocking, shared_client
+from metrics import PARSE_SECONDS
+from rss_parser import MAX_SEEN_ITEMS, HighWaterMark, reading
+from source_health import CircuitOpen, source_health
+
+# 🔹 TTL padrão (segundos) por fonte; feeds de notícias mudam a cada poucos minutos
+DEFAULT_TTLS: Dict[str, float] = {
+    "google": 300,
+    "g1": 300,
+    "infomoney": 300,
+    "uol": 300,
+    "reuters": 300,
+    "yahoo": 600,
+    "duckduckgo": 900,
+    "bing": 900,
+    "company_website": 1800,
+    "linkedin": 3600,
+}
+DEFAULT_TTL = float(os.getenv("FEED_CACHE_DEFAULT_TTL", "300"))
+MAX_ENTRIES = int(os.getenv("FEED_CACHE_MAX_ENTRIES", "512"))
+
+# Quantos resultados parseados (parser + argumentos) guardar por feed
+MAX_PARSED_PER_ENTRY = 8
+
+
+@dataclass
+class CacheEntry:
+    content: bytes
+    etag: Optional[str]
+    last_modified: Optional[str]
+    expires_at: float
+    parsed: "OrderedDict[Hashable, Any]" = field(default_factory=OrderedDict)
+
+
+# (empresa, URL) de uma notícia devolvida pelo parser
+SeenItem = Tuple[str, str]
+
+
+@dataclass
+class FeedMark:
+    """Estado da leitura incremental de um feed"""
+    items: HighWaterMark = field(default_factory=HighWaterMark)
+    urls: "OrderedDict[SeenItem, None]" = field(default_factory=OrderedDict)  # já devolvidas
+    live: Set[SeenItem] = field(default_factory=set)  # devolvidas e ainda presentes no feed
+    checksum: Optional[int] = None  # conteúdo da última leitura
+    empty: Any = None               # resultado vazio no formato do parser
+
+
+@dataclass
+class CacheStats:
+    hits: int = 0
+    misses: int = 0
+    revalidations: int = 0        # 304: reaproveitou corpo e parse
+    revalidated_changed: int = 0  # revalidou, mas o feed mudou (200)
+    evictions: int = 0
+    stale_served: int = 0         # circuito da fonte aberto: serviu a versão vencida
+    incremental_unchanged: int = 0  # leitura incremental de um feed igual ao da última: sem parse
+    incremental_stops: int = 0      # parse parou no primeiro item já visto
+    incremental_skipped: int = 0    # resultados já devolvidos antes, descartados
+
+
+class IncrementalRead:
+    """Uma coleta incremental: as marcas lidas só passam a valer no ``commit``"""
+
+    def __init__(self, cache: "FeedCache"):
+        self._cache = cache
+        self._pending: Dict[Tuple[str, Hashable], FeedMark] = {}
+        self.seen: Set[SeenItem] = set()
+
+    def commit(self) -> None:
+        for mark_key, mark in self._pending.items():
+            self._cache._set_mark(mark_key, mark)
+        self._pending.clear()
+
+
+# Coleta incremental do contexto atual (e das tarefas criadas dentro dele)
+_incremental: ContextVar[Optional[IncrementalRead]] = ContextVar("feed_cache_incremental", default=None)
+
+
+class FeedCache:
+    """Cache LRU de respostas HTTP + resultados parseados"""
+
+    def __init__(self, max_entries: int = MAX_ENTRIES, ttls: Optional[Dict[str, float]] = None,
+                 default_ttl: float = DEFAULT_TTL):
+        self.max_entries = max_entries
+        self.ttls = ttls if ttls is not None else env_seconds_map("FEED_CACHE_TTLS", DEFAULT_TTLS)
+        self.default_ttl = default_ttl
+        self.stats = CacheStats()
+        self._entries: "OrderedDict[str, CacheEntry]" = OrderedDict()
+        self._marks: "OrderedDict[Tuple[str, Hashable], FeedMark]" = OrderedDict()
+        self._flight = SingleFlight()
+
+    def ttl_for(self, source: str) -> float:
+        return self.ttls.get(source, self.default_ttl)
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self._marks.clear()
+
+    @contextmanager
+    def incremental(self) -> Iterator[IncrementalRead]:
+        """
+        Dentro do bloco, ``fetch_parsed`` devolve só o que é novo em cada feed.
+        Chame ``commit()`` na leitura devolvida depois de gravar o resultado.
+        """
+        session = IncrementalRead(self)
+        token = _incremental.set(session)
+        try:
+            yield session
+        finally:
+            _incremental.reset(token)
+
+    def _set_mark(self, mark_key: Tuple[str, Hashable], mark: FeedMark) -> None:
+        self._marks[mark_key] = mark
+        self._marks.move_to_end(mark_key)
+        while len(self._marks) > max(self.max_entries, 1) * MAX_PARSED_PER_ENTRY:
+            self._marks.popitem(last=False)
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Contadores para dimensionar o cache"""
+        lookups = self.stats.hits + self.stats.misses + self.stats.revalidations + self.stats.revalidated_changed
+        return {
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "hits": self.stats.hits,
+            "misses": self.stats.misses,
+            "revalidations": self.stats.revalidations,
+            "revalidated_changed": self.stats.revalidated_changed,
+            "evictions": self.stats.evictions,
+            "stale_served": self.stats.stale_served,
+            "incremental_feeds": len(self._marks),
+            "incremental_unchanged": self.stats.incremental_unchanged,
+            "incremental_stops": self.stats.incremental_stops,
+            "incremental_skipped": self.stats.incremental_skipped,
+            "coalesced": self._flight.shared,
+            "downloads_inflight": self._flight.inflight,
+            "hit_ratio": round((self.stats.hits + self.stats.revalidations) / lookups, 3) if lookups else 0.0,
+        }
+
+    def _store(self, key: str, entry: CacheEntry) -> None:
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.stats.evictions += 1
+
+    async def _parsed(self, source: str, entry: CacheEntry, parser: Callable[..., Any], args: tuple) -> Any:
+        """Devolve o parse memoizado (ou parseia uma vez e guarda)"""
+        memo_key = (parser.__module__, parser.__qualname__, _freeze(args))
+        if memo_key in entry.parsed:
+            entry.parsed.move_to_end(memo_key)
+            value = entry.parsed[memo_key]
+        else:
+            # Quem chega enquanto o mesmo feed é parseado espera por esse parse
+            value = await self._flight.do(
+                (id(entry), memo_key), partial(self._parse_into, source, entry, memo_key, parser, args),
+            )
+        # Cópia para que etapas posteriores possam alterar os itens livremente
+        return copy.deepcopy(value)
+
+    async def _delta(self, session: IncrementalRead, source: str, key: str, entry: CacheEntry,
+                     parser: Callable[..., Any], args: tuple) -> Any:
+        """Parse incremental: só os itens que apareceram desde a última leitura deste feed"""
+        mark_key = (key, (parser.__module__, parser.__qualname__, _freeze(args)))
+        current = self._marks.get(mark_key) or FeedMark()
+
+        checksum = zlib.crc32(entry.content)
+        if checksum == current.checksum and current.items.complete:
+            # Nada mudou desde a última leitura completa: nada novo, sem parse
+            self.stats.incremental_unchanged += 1
+            session.seen.update(current.live)
+            session._pending[mark_key] = current
+            return copy.deepcopy(current.empty)
+
+        # A leitura avança uma cópia da marca; a original só muda no commit
+        items = current.items.copy()
+        value = await run_blocking(_timed_delta_parse, source, items, parser, entry.content, *args)
+        if items.stopped:
+            self.stats.incremental_stops += 1
+
+        value, returned, skipped = self._drop_seen(current, value)
+        urls = OrderedDict(current.urls)
+        for seen_item in returned:
+            urls[seen_item] = None
+            urls.move_to_end(seen_item)
+        while len(urls) > MAX_SEEN_ITEMS:
+            urls.popitem(last=False)
+        # Parou num item já visto: o que vinha depois continua no feed
+        still_there = current.live if items.stopped else set()
+
+        session.seen.update(skipped, still_there)
+        session._pending[mark_key] = FeedMark(items, urls, set(returned) | still_there, checksum, _empty_like(value))
+        return value
+
+    def _drop_seen(self, mark: FeedMark, value: Any) -> Tuple[Any, Set[SeenItem], Set[SeenItem]]:
+        """
+        Tira do resultado (lista, ou dict de listas por empresa) as notícias com
+        URL devolvida em leituras anteriores. Devolve o resultado, todas as
+        notícias do parse e as que saíram.
+        """
+        returned: Set[SeenItem] = set()
+        skipped: Set[SeenItem] = set()
+
+        def drop(items: Any) -> Any:
+            if not isinstance(items, list):
+                return items
+            kept = []
+            for item in items:
+                url = item.get("url") if isinstance(item, dict) else None
+                if url:
+                    seen_item = (item.get("company") or "", url)
+                    returned.add(seen_item)
+                    if seen_item in mark.urls:
+                        skipped.add(seen_item)
+                        self.stats.incremental_skipped += 1
+                        continue
+                kept.append(item)
+            return kept
+
+        value = {k: drop(v) for k, v in value.items()} if isinstance(value, dict) else drop(value)
+        return value, returned, skipped
+
+    async def _parse_into(self, source: str, entry: CacheEntry, memo_key: Hashable,
+                          parser: Callable[..., Any], args: tuple) -> Any:
+        value = await run_blocking(_timed_parse, source, parser, entry.content, *args)
+        entry.parsed[memo_key] = value
+        while len(entry.parsed) > MAX_PARSED_PER_ENTRY:
+            entry.parsed.popitem(last=False)
+        return value
+
+    async def fetch_parsed(
+        self,
+        client: httpx.AsyncClient,
+        source: str,
+        url: str,
+        parser: Callable[..., Any],
+        *args,
+        params: Optional[Dict[str, Any]] = None,
+        headers: Optional[Dict[str, str]] = None,
+        **request_kwargs,
+    ) -> Any:
+        """
+        Baixa (ou reaproveita) ``url`` e devolve ``parser(content, *args)``.
+
+        Erros HTTP são propagados e nunca ficam em cache. Com o circuito da
+        fonte aberto, a última versão em cache (mesmo vencida) é usada.
+        """
+        key = str(httpx.URL(url).copy_merge_params(params) if params else httpx.URL(url))
+        entry = self._entries.get(key)
+
+        if entry is not None and time.monotonic() < entry.expires_at:
+            self.stats.hits += 1
+            self._entries.move_to_end(key)
+            return await self._read(source, key, entry, parser, args)
+
+        try:
+            # Buscas simultâneas do mesmo feed compartilham um único download, feito no
+            # cliente do processo: o cliente de quem chegou primeiro pode ser fechado antes do fim
+            entry = await self._flight.do(key, partial(
+                self._download, shared_client() or client, source, key, url, params, headers, request_kwargs,
+            ))
+        except CircuitOpen:
+            if entry is None:
+                raise
+            # Fonte fora do ar: melhor a última versão conhecida do que nada
+            self.stats.stale_served += 1
+        return await self._read(source, key, entry, parser, args)
+
+    async def _read(self, source: str, key: str, entry: CacheEntry, parser: Callable[..., Any], args: tuple) -> Any:
+        session = _incremental.get()
+        if session is not None:
+            return await self._delta(session, source, key, entry, parser, args)
+        return await self._parsed(source, entry, parser, args)
+
+    async def _download(self, client: httpx.AsyncClient, source: str, key: str, url: str,
+                        params: Optional[Dict[str, Any]], headers: Optional[Dict[str, str]],
+                        request_kwargs: Dict[str, Any]) -> CacheEntry:
+        """Baixa ou revalida o feed e atualiza a entrada do cache"""
+        now = time.monotonic()
+        entry = self._entries.get(key)
+
+        # Entrada vencida com validadores: pergunta ao servidor se mudou
+        conditional = entry is not None and bool(entry.etag or entry.last_modified)
+        request_headers = dict(headers or {})
+        if conditional:
+            if entry.etag:
+                request_headers["If-None-Match"] = entry.etag
+            if entry.last_modified:
+                request_headers["If-Modified-Since"] = entry.last_modified
+
+        r = await source_health.get_url(client, source, url, params=params, headers=request_headers,
+                                        **request_kwargs)
+
+        if conditional and r.status_code == 304:
+            self.stats.revalidations += 1
+            entry.expires_at = now + self.ttl_for(source)
+            self._entries.move_to_end(key)
+            return entry
+
+        r.raise_for_status()
+        if conditional:
+            self.stats.revalidated_changed += 1
+        else:
+            self.stats.misses += 1
+
+        entry = CacheEntry(
+            content=r.content,
+            etag=r.headers.get("etag"),
+            last_modified=r.headers.get("last-modified"),
+            expires_at=now + self.ttl_for(source),
+        )
+        self._store(key, entry)
+        return entry
+
+
+def _timed_parse(source: str, parser: Callable[..., Any], content: bytes, *args) -> Any:
+    """Executa o parser (na thread de parsing) medindo o tempo gasto"""
+    start = time.perf_counter()
+    try:
+        return parser(content, *args)
+    finally:
+        PARSE_SECONDS.observe(time.perf_counter() - start, source=source)
+
+
+def _timed_delta_parse(source: str, mark: HighWaterMark, parser: Callable[..., Any], content: bytes, *args) -> Any:
+    """``_timed_parse`` com o ``iter_rss_items`` lendo a partir de ``mark``"""
+    with reading(mark):
+        return _timed_parse(source, parser, content, *args)
+
+
+def _empty_like(value: Any) -> Any:
+    """Resultado vazio com o mesmo formato (lista, ou dict de listas por empresa)"""
+    if isinstance(value, dict):
+        return {k: _empty_like(v) for k, v in value.items()}
+    return [] if isinstance(value, list) else value
+
+
+def _freeze(value: Any) -> Hashable:
+    """Converte listas/dicts em tuplas para usar como chave de memo"""
+    if isinstance(value, (list, tuple)):
+        return tuple(_freeze(v) for v in value)
+    if isinstance(value, dict):
+        return tuple(sorted((k, _freeze(v)) for k, v in value.items()))
+    return value
+
+
+# Instância compartilhada pelo processo
+feed_cache = FeedCache()
@@ -0,0 +1,308 @@
+"""
+🌐 Cliente HTTP compartilhado
+=============================
+Um único ``httpx.AsyncClient`` por processo (criado no lifespan do FastAPI)
+é usado por todas as fontes: conexões ficam abertas entre coletas
+(keep-alive), hosts com suporte falam HTTP/2 (várias requisições na mesma
+conexão) e os endereços resolvidos ficam num pequeno cache de DNS. Assim
+handshake TCP/TLS e consulta DNS são pagos uma vez por host, não por busca.
+
+O transporte (``PooledTransport``) monta o pool do httpcore com o backend
+de rede que faz o cache de DNS, conta requisições, conexões novas,
+consultas DNS e a ocupação do pool, expostos em ``GET /admin/http`` e no
+``/metrics``.
+
+Como o transporte é próprio, o httpx não lê sozinho ``HTTP_PROXY``/``HTTPS_PROXY``/
+``ALL_PROXY``/``NO_PROXY``: ``new_client`` monta os transportes de proxy a partir
+dessas variáveis (requisições via proxy não passam pelo cache de DNS nem pelos
+contadores do pool).
+
+HTTP/2 precisa do pacote ``h2`` (``pip install "httpx[http2]"``); sem ele
+o cliente usa HTTP/1.1 normalmente.
+"""
+
+import asyncio
+import importlib.util
+import ipaddress
+import logging
+import os
+import socket
+import ssl
+import time
+import urllib.request
+import weakref
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Any, AsyncIterator, Dict, Iterable, Iterator, List, Optional, Tuple
+
+import httpcore
+import httpx
+
+logger = logging.getLogger(__name__)
+
+# 🔹 Parâmetros configuráveis via variáveis de ambiente
+MAX_CONNECTIONS = int(os.getenv("NEWS_HTTP_MAX_CONNECTIONS", "100"))
+MAX_KEEPALIVE = int(os.getenv("NEWS_HTTP_MAX_KEEPALIVE", "40"))
+KEEPALIVE_EXPIRY = float(os.getenv("NEWS_HTTP_KEEPALIVE", "60"))
+HTTP2 = os.getenv("NEWS_HTTP2", "1") not in ("0", "false", "no")
+DNS_TTL = float(os.getenv("NEWS_DNS_TTL", "300"))
+DNS_MAX_ENTRIES = 256
+
+HTTP2_AVAILABLE = importlib.util.find_spec("h2") is not None
+
+
+def _is_ip(host: str) -> bool:
+    try:
+        ipaddress.ip_address(host)
+        return True
+    except ValueError:
+        return False
+
+
+class CachingResolverBackend(httpcore.AsyncNetworkBackend):
+    """
+    Backend de rede do httpcore com cache de DNS. Só o ``connect_tcp`` muda:
+    o host vira o IP em cache (o TLS continua usando o nome original no SNI
+    e na verificação do certificado). Consultas simultâneas ao mesmo host
+    viram uma só.
+    """
+
+    def __init__(self, backend: Optional[httpcore.AsyncNetworkBackend] = None,
+                 ttl: float = DNS_TTL, max_entries: int = DNS_MAX_ENTRIES):
+        self._backend = backend or httpcore.AnyIOBackend()
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._cache: "OrderedDict[Tuple[str, int], Tuple[float, List[str]]]" = OrderedDict()
+        self._lookups: Dict[Tuple[str, int], asyncio.Task] = {}
+        self.hits = 0
+        self.misses = 0
+        self.connects = 0
+
+    async def _lookup(self, host: str, port: int) -> List[str]:
+        infos = await asyncio.get_running_loop().getaddrinfo(host, port, type=socket.SOCK_STREAM)
+        return list(dict.fromkeys(info[4][0] for info in infos))
+
+    async def resolve(self, host: str, port: int) -> List[str]:
+        if _is_ip(host) or host == "localhost":
+            return [host]
+        key = (host, port)
+        cached = self._cache.get(key)
+        if cached is not None and cached[0] > time.monotonic():
+            self.hits += 1
+            self._cache.move_to_end(key)
+            return cached[1]
+
+        self.misses += 1
+        task = self._lookups.get(key)
+        if task is None:
+            task = self._lookups[key] = asyncio.ensure_future(self._lookup(host, port))
+            task.add_done_callback(lambda _: self._lookups.pop(key, None))
+        addresses = await asyncio.shield(task)
+        self._cache[key] = (time.monotonic() + self.ttl, addresses)
+        self._cache.move_to_end(key)
+        while len(self._cache) > self.max_entries:
+            self._cache.popitem(last=False)
+        return addresses
+
+    def forget(self, host: str, port: int) -> None:
+        self._cache.pop((host, port), None)
+
+    async def connect_tcp(self, host: str, port: int, timeout: Optional[float] = None,
+                          local_address: Optional[str] = None,
+                          socket_options: Optional[Iterable[Any]] = None) -> httpcore.AsyncNetworkStream:
+        self.connects += 1
+        # O timeout vale para a conexão inteira (DNS e todos os endereços), não para cada tentativa
+        deadline = time.monotonic() + timeout if timeout is not None else None
+        try:
+            addresses = await self.resolve(host, port)
+        except OSError as e:
+            raise httpcore.ConnectError(str(e)) from e
+
+        error: Optional[Exception] = None
+        for address in addresses:
+            remaining = deadline - time.monotonic() if deadline is not None else None
+            if remaining is not None and remaining <= 0:
+                error = httpcore.ConnectTimeout(f"tempo esgotado ao conectar em {host}:{port}")
+                break
+            try:
+                return await self._backend.connect_tcp(address, port, remaining, local_address, socket_options)
+            except (httpcore.ConnectError, httpcore.ConnectTimeout) as e:
+                error = e
+        # Nenhum endereço respondeu: o host pode ter mudado de IP
+        self.forget(host, port)
+        raise error or httpcore.ConnectError(f"nenhum endereço encontrado para {host}")
+
+    async def connect_unix_socket(self, path: str, timeout: Optional[float] = None,
+                                  socket_options: Optional[Iterable[Any]] = None) -> httpcore.AsyncNetworkStream:
+        return await self._backend.connect_unix_socket(path, timeout, socket_options)
+
+    async def sleep(self, seconds: float) -> None:
+        await self._backend.sleep(seconds)
+
+
+# Exceções do httpcore → equivalentes do httpx (as mais específicas primeiro)
+_ERRORS = [(getattr(httpcore, name), getattr(httpx, name)) for name in (
+    "ConnectTimeout", "ReadTimeout", "WriteTimeout", "PoolTimeout", "ConnectError", "ReadError", "WriteError",
+    "RemoteProtocolError", "LocalProtocolError", "ProxyError", "UnsupportedProtocol",
+    "TimeoutException", "NetworkError", "ProtocolError",
+)]
+
+
+@contextmanager
+def _httpx_errors() -> Iterator[None]:
+    try:
+        yield
+    except Exception as e:
+        for core_error, httpx_error in _ERRORS:
+            if isinstance(e, core_error):
+                raise httpx_error(str(e)) from e
+        raise
+
+
+class _ResponseStream(httpx.AsyncByteStream):
+    """Corpo da resposta do httpcore no formato do httpx; conta as respostas abertas no transporte"""
+
+    def __init__(self, response: httpcore.Response, transport: "PooledTransport"):
+        self._response = response
+        self._transport: Optional["PooledTransport"] = transport
+        transport.streaming += 1
+
+    async def __aiter__(self) -> AsyncIterator[bytes]:
+        with _httpx_errors():
+            async for chunk in self._response.aiter_stream():
+                yield chunk
+
+    async def aclose(self) -> None:
+        if self._transport is not None:
+            self._transport.streaming -= 1
+            self._transport = None
+        await self._response.aclose()
+
+
+class PooledTransport(httpx.AsyncBaseTransport):
+    """
+    Transporte do httpx sobre um pool do httpcore montado aqui (a API pública
+    do httpx não aceita outro backend de rede), com cache de DNS e contadores
+    de uso do pool.
+    """
+
+    def __init__(self, limits: httpx.Limits, http2: bool = False, dns_ttl: float = DNS_TTL,
+                 ssl_context: Optional[ssl.SSLContext] = None):
+        self.limits = limits
+        self.http2 = http2
+        self.resolver = CachingResolverBackend(ttl=dns_ttl)
+        self.pool = httpcore.AsyncConnectionPool(
+            ssl_context=ssl_context or httpx.create_ssl_context(),
+            max_connections=limits.max_connections,
+            max_keepalive_connections=limits.max_keepalive_connections,
+            keepalive_expiry=limits.keepalive_expiry,
+            http1=True,
+            http2=http2,
+            network_backend=self.resolver,
+        )
+        self.requests = 0
+        self.inflight = 0
+        self.peak_inflight = 0
+        # Respostas com o corpo ainda aberto (cada uma segura uma conexão HTTP/1.1)
+        self.streaming = 0
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        self.requests += 1
+        self.inflight += 1
+        self.peak_inflight = max(self.peak_inflight, self.inflight)
+        try:
+            core_request = httpcore.Request(
+                method=request.method,
+                url=httpcore.URL(scheme=request.url.raw_scheme, host=request.url.raw_host,
+                                 port=request.url.port, target=request.url.raw_path),
+                headers=request.headers.raw,
+                content=request.stream,
+                extensions=request.extensions,
+            )
+            with _httpx_errors():
+                response = await self.pool.handle_async_request(core_request)
+            return httpx.Response(status_code=response.status, headers=response.headers,
+                                  stream=_ResponseStream(response, self), extensions=response.extensions)
+        finally:
+            self.inflight -= 1
+
+    async def aclose(self) -> None:
+        await self.pool.aclose()
+
+    def snapshot(self) -> Dict[str, Any]:
+        connections = self.pool.connections
+        active = sum(1 for connection in connections if not connection.is_idle())
+        # Estimativa pelos próprios contadores (HTTP/1.1: uma requisição por conexão)
+        queued = max(0, self.inflight + self.streaming - self.limits.max_connections)
+        new_connections = self.resolver.connects
+        return {
+            "http2": self.http2,
+            "max_connections": self.limits.max_connections,
+            "connections": len(connections),
+            "active": active,
+            "idle": len(connections) - active,
+            "http2_connections": sum(1 for connection in connections if "HTTP/2" in connection.info()),
+            "queued": queued,
+            "inflight": self.inflight,
+            "peak_inflight": self.peak_inflight,
+            "saturation": round(active / self.limits.max_connections, 3) if self.limits.max_connections else 0.0,
+            "requests": self.requests,
+            "new_connections": new_connections,
+            "reuse_ratio": round(1 - new_connections / self.requests, 3) if self.requests else None,
+            "dns_hits": self.resolver.hits,
+            "dns_misses": self.resolver.misses,
+        }
+
+
+# Transporte de cada cliente criado por ``new_client`` (para o ``pool_stats``)
+_transports: "weakref.WeakKeyDictionary[httpx.AsyncClient, PooledTransport]" = weakref.WeakKeyDictionary()
+
+
+def proxy_mounts(limits: httpx.Limits, http2: bool = False) -> Dict[str, Optional[httpx.AsyncBaseTransport]]:
+    """
+    Transportes de proxy lidos de ``HTTP_PROXY``/``HTTPS_PROXY``/``ALL_PROXY``, com
+    as exceções de ``NO_PROXY`` (mapeadas para ``None``: conexão direta), no formato
+    do ``mounts`` do httpx.
+    """
+    proxies = urllib.request.getproxies()
+    mounts: Dict[str, Optional[httpx.AsyncBaseTransport]] = {}
+    for scheme in ("http", "https", "all"):
+        if proxies.get(scheme):
+            url = proxies[scheme] if "://" in proxies[scheme] else f"http://{proxies[scheme]}"
+            mounts[f"{scheme}://"] = httpx.AsyncHTTPTransport(proxy=url, limits=limits, http2=http2)
+    if not mounts:
+        return {}
+    for host in (h.strip() for h in proxies.get("no", "").split(",")):
+        if host == "*":
+            return {}
+        if not host:
+            continue
+        if "://" in host:
+            mounts[host] = None
+        elif _is_ip(host) or host.lower() == "localhost":
+            mounts[f"all://{host}"] = None
+        else:
+            mounts[f"all://*{host.lstrip('*')}"] = None
+    return mounts
+
+
+def new_client(max_connections: int = MAX_CONNECTIONS, http2: bool = HTTP2,
+               timeout: float = 10) -> httpx.AsyncClient:
+    """Cliente com pool ajustado, keep-alive, HTTP/2 (se disponível), cache de DNS e os proxies do ambiente"""
+    http2 = http2 and HTTP2_AVAILABLE
+    limits = httpx.Limits(
+        max_connections=max_connections,
+        max_keepalive_connections=min(MAX_KEEPALIVE, max_connections),
+        keepalive_expiry=KEEPALIVE_EXPIRY,
+    )
+    transport = PooledTransport(limits, http2=http2)
+    client = httpx.AsyncClient(transport=transport, mounts=proxy_mounts(limits, http2), timeout=timeout,
+                               follow_redirects=True)
+    _transports[client] = transport
+    return client
+
+
+def pool_stats(client: httpx.AsyncClient) -> Optional[Dict[str, Any]]:
+    """Contadores do pool, se o cliente foi criado por ``new_client``"""
+    transport = _transports.get(client)
+    return transport.snapshot() if transport is not None else None
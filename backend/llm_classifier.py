@@ -0,0 +1,264 @@
+"""
+🤖 Classificação via LLM (em lote)
+==================================
+Backend de classificação para o ``analyzer`` que usa uma API no formato
+OpenAI Chat Completions, pensado para o volume do agregador:
+
+- várias notícias por requisição (um único prompt com a lista em JSON);
+- cache em disco (SQLite) por hash do conteúdo + modelo: a mesma notícia
+  nunca é enviada duas vezes, nem depois de reiniciar o servidor;
+- um único ``AsyncClient`` e um teto de chamadas simultâneas;
+- prazo por análise e orçamento de chamadas por hora: o que não couber
+  volta como "sem resposta" e o ``analyzer`` usa a heurística.
+
+Para testar sem rede, suba o ``llm_stub.py`` e aponte ``LLM_BASE_URL`` para ele.
+"""
+
+import asyncio
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from collections import deque
+from dataclasses import asdict, dataclass
+from typing import Dict, List, Mapping, Optional, Sequence, Tuple
+
+import httpx
+
+from aggregator import run_blocking
+from analyzer import EVENT_OUTRO, KEYWORDS, _truncate, content_hash
+
+# 🔹 Configuração (variáveis de ambiente)
+ANALYZER_BACKEND = os.getenv("ANALYZER_BACKEND", "auto")  # auto | llm | heuristic
+LLM_API_KEY = os.getenv("LLM_API_KEY") or os.getenv("OPENAI_API_KEY")
+LLM_BASE_URL = os.getenv("LLM_BASE_URL", "https://api.openai.com/v1")
+LLM_MODEL = os.getenv("LLM_MODEL", "gpt-4o-mini")
+LLM_BATCH_SIZE = int(os.getenv("LLM_BATCH_SIZE", "20"))
+LLM_MAX_INFLIGHT = int(os.getenv("LLM_MAX_INFLIGHT", "2"))
+LLM_DEADLINE_SECONDS = float(os.getenv("LLM_DEADLINE_SECONDS", "8"))
+LLM_CALLS_PER_HOUR = int(os.getenv("LLM_CALLS_PER_HOUR", "120"))
+LLM_TIMEOUT = float(os.getenv("LLM_TIMEOUT", "20"))
+LLM_CACHE_PATH = os.getenv("LLM_CACHE_PATH", os.path.join(os.path.dirname(os.path.abspath(__file__)), "llm_cache.db"))
+
+logger = logging.getLogger(__name__)
+
+EVENTS = list(KEYWORDS) + [EVENT_OUTRO]
+# A descrição é cortada antes de ir para o prompt (o resumo não precisa de mais)
+MAX_DESCRIPTION_CHARS = 500
+
+SYSTEM_PROMPT = (
+    "Você é um classificador de notícias corporativas. "
+    "Você recebe um JSON com uma lista 'noticias' (id, empresa, titulo, descricao). "
+    "Para cada notícia, retorne o evento e um resumo. "
+    f"Eventos possíveis: {', '.join(EVENTS)}. "
+    "O resumo deve ter no máximo 200 caracteres, em português natural. "
+    'Responda apenas em JSON: {"resultados": [{"id": 0, "evento": "...", "resumo": "..."}]}'
+)
+
+
+class CallBudget:
+    """No máximo ``per_hour`` chamadas na última hora (janela deslizante)"""
+
+    def __init__(self, per_hour: int):
+        self.per_hour = per_hour
+        self._calls: deque = deque()
+
+    def try_spend(self) -> bool:
+        now = time.monotonic()
+        while self._calls and now - self._calls[0] > 3600:
+            self._calls.popleft()
+        if len(self._calls) >= self.per_hour:
+            return False
+        self._calls.append(now)
+        return True
+
+    @property
+    def remaining(self) -> int:
+        now = time.monotonic()
+        return self.per_hour - sum(1 for t in self._calls if now - t <= 3600)
+
+
+class AnalysisCache:
+    """Cache em disco: chave (hash do conteúdo + modelo) → (evento, resumo)"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=10)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS analyses (key TEXT PRIMARY KEY, evento TEXT NOT NULL, "
+            "resumo TEXT NOT NULL, created_at REAL NOT NULL)"
+        )
+
+    def get_many(self, keys: Sequence[str]) -> Dict[str, Tuple[str, str]]:
+        found: Dict[str, Tuple[str, str]] = {}
+        with self._lock:
+            # Em blocos, por causa do limite de parâmetros do SQLite
+            for start in range(0, len(keys), 500):
+                chunk = keys[start:start + 500]
+                rows = self._conn.execute(
+                    f"SELECT key, evento, resumo FROM analyses WHERE key IN ({', '.join('?' * len(chunk))})", chunk
+                )
+                found.update({key: (evento, resumo) for key, evento, resumo in rows})
+        return found
+
+    def put_many(self, results: Mapping[str, Tuple[str, str]]) -> None:
+        if not results:
+            return
+        now = time.time()
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO analyses (key, evento, resumo, created_at) VALUES (?, ?, ?, ?)",
+                [(key, evento, resumo, now) for key, (evento, resumo) in results.items()],
+            )
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+@dataclass
+class LLMStats:
+    analyses: int = 0
+    cache_hits: int = 0
+    calls: int = 0
+    items_sent: int = 0
+    failures: int = 0
+    timeouts: int = 0           # lotes descartados pelo prazo
+    budget_exhausted: int = 0   # lotes não enviados por falta de orçamento
+    invalid_answers: int = 0    # itens sem resposta válida no JSON do modelo
+
+
+class LLMBackend:
+    """Classificador em lote via Chat Completions, com cache e orçamento"""
+
+    name = "llm"
+
+    def __init__(self, api_key: Optional[str] = LLM_API_KEY, base_url: str = LLM_BASE_URL,
+                 model: str = LLM_MODEL, batch_size: int = LLM_BATCH_SIZE,
+                 max_inflight: int = LLM_MAX_INFLIGHT, deadline: float = LLM_DEADLINE_SECONDS,
+                 calls_per_hour: int = LLM_CALLS_PER_HOUR, cache_path: str = LLM_CACHE_PATH,
+                 transport: Optional[httpx.AsyncBaseTransport] = None):
+        self.api_key = api_key
+        self.base_url = base_url.rstrip("/")
+        self.model = model
+        self.batch_size = max(1, batch_size)
+        self.deadline = deadline
+        self.budget = CallBudget(calls_per_hour)
+        self.cache = AnalysisCache(cache_path)
+        self.stats = LLMStats()
+        self._inflight = asyncio.Semaphore(max_inflight)
+        self._transport = transport
+        self._client: Optional[httpx.AsyncClient] = None
+
+    def _get_client(self) -> httpx.AsyncClient:
+        if self._client is None:
+            headers = {"Content-Type": "application/json"}
+            if self.api_key:
+                headers["Authorization"] = f"Bearer {self.api_key}"
+            self._client = httpx.AsyncClient(base_url=self.base_url, headers=headers,
+                                             timeout=LLM_TIMEOUT, transport=self._transport)
+        return self._client
+
+    async def aclose(self) -> None:
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+        await run_blocking(self.cache.close)
+
+    def _key(self, item: Mapping[str, str]) -> str:
+        return f"{self.model}:{content_hash(item.get('title') or '', item.get('description') or '')}"
+
+    async def analyze(self, items: Sequence[Mapping[str, str]]) -> List[Optional[Tuple[str, str]]]:
+        self.stats.analyses += 1
+        keys = [self._key(item) for item in items]
+        cached = await run_blocking(self.cache.get_many, keys)
+        self.stats.cache_hits += len(cached)
+        results: List[Optional[Tuple[str, str]]] = [cached.get(key) for key in keys]
+
+        todo = [i for i, result in enumerate(results) if result is None]
+        batches = [todo[start:start + self.batch_size] for start in range(0, len(todo), self.batch_size)]
+        tasks = {asyncio.create_task(self._call([items[i] for i in batch])): batch for batch in batches}
+        if not tasks:
+            return results
+
+        done, pending = await asyncio.wait(tasks, timeout=self.deadline)
+        for task in pending:
+            task.cancel()
+        self.stats.timeouts += len(pending)
+
+        fresh: Dict[str, Tuple[str, str]] = {}
+        for task in done:
+            answers = task.result()
+            if answers is None:
+                continue
+            for i, answer in zip(tasks[task], answers):
+                if answer is not None:
+                    results[i] = fresh[keys[i]] = answer
+        await run_blocking(self.cache.put_many, fresh)
+        return results
+
+    async def _call(self, batch: Sequence[Mapping[str, str]]) -> Optional[List[Optional[Tuple[str, str]]]]:
+        """Uma requisição para o lote inteiro; ``None`` se não foi possível chamar"""
+        async with self._inflight:
+            if not self.budget.try_spend():
+                self.stats.budget_exhausted += 1
+                return None
+
+            payload = {
+                "model": self.model,
+                "temperature": 0,
+                "response_format": {"type": "json_object"},
+                "messages": [
+                    {"role": "system", "content": SYSTEM_PROMPT},
+                    {"role": "user", "content": json.dumps({"noticias": [
+                        {
+                            "id": i,
+                            "empresa": item.get("company") or "",
+                            "titulo": item.get("title") or "",
+                            "descricao": (item.get("description") or "")[:MAX_DESCRIPTION_CHARS],
+                        }
+                        for i, item in enumerate(batch)
+                    ]}, ensure_ascii=False)},
+                ],
+            }
+            self.stats.calls += 1
+            self.stats.items_sent += len(batch)
+            try:
+                r = await self._get_client().post("/chat/completions", json=payload)
+                r.raise_for_status()
+                content = r.json()["choices"][0]["message"]["content"]
+                return self._parse(content, len(batch))
+            except Exception as e:
+                self.stats.failures += 1
+                logger.warning("⚠️ Erro na análise via LLM: %s", e, extra={"batch": len(batch)})
+                return None
+
+    def _parse(self, content: str, size: int) -> List[Optional[Tuple[str, str]]]:
+        """Resultados por posição do lote; itens ausentes ou inválidos ficam ``None``"""
+        answers: List[Optional[Tuple[str, str]]] = [None] * size
+        for entry in json.loads(content).get("resultados", []):
+            try:
+                index = int(entry["id"])
+                evento = entry["evento"]
+                resumo = _truncate(str(entry.get("resumo") or ""))
+            except (KeyError, TypeError, ValueError):
+                continue
+            if 0 <= index < size and evento in EVENTS and resumo:
+                answers[index] = (evento, resumo)
+        self.stats.invalid_answers += sum(1 for answer in answers if answer is None)
+        return answers
+
+    def snapshot(self) -> Dict[str, object]:
+        return {"backend": self.name, "model": self.model, "base_url": self.base_url,
+                "budget_remaining": self.budget.remaining, **asdict(self.stats)}
+
+
+def backend_from_env() -> Optional[LLMBackend]:
+    """LLMBackend se configurado (``ANALYZER_BACKEND=llm``, ou ``auto`` com chave de API)"""
+    if ANALYZER_BACKEND == "llm" or (ANALYZER_BACKEND == "auto" and LLM_API_KEY):
+        return LLMBackend()
+    return None
@@ -0,0 +1,60 @@
+# -*- coding: utf-8 -*-
+"""
+🧪 Servidor LLM local (stand-in)
+================================
+Imita o endpoint ``/v1/chat/completions`` usado pelo ``llm_classifier``,
+respondendo com a heurística de palavras-chave. Serve para testar o backend
+LLM (lotes, cache, prazo, orçamento) sem rede e sem custo.
+
+    uvicorn llm_stub:app --port 8001
+    ANALYZER_BACKEND=llm LLM_BASE_URL=http://localhost:8001/v1 uvicorn main:app
+
+Variáveis opcionais: ``LLM_STUB_LATENCY`` (segundos por chamada) e
+``LLM_STUB_FAIL_RATE`` (fração de chamadas que respondem 500).
+"""
+
+import asyncio
+import json
+import os
+import random
+
+from fastapi import FastAPI, HTTPException, Request
+
+from analyzer import heuristic_analysis
+
+LATENCY = float(os.getenv("LLM_STUB_LATENCY", "0.2"))
+FAIL_RATE = float(os.getenv("LLM_STUB_FAIL_RATE", "0"))
+
+app = FastAPI(title="LLM stub")
+stats = {"calls": 0, "items": 0, "failures": 0}
+
+
+@app.post("/v1/chat/completions")
+async def chat_completions(request: Request):
+    body = await request.json()
+    noticias = json.loads(body["messages"][-1]["content"])["noticias"]
+    stats["calls"] += 1
+    stats["items"] += len(noticias)
+
+    await asyncio.sleep(LATENCY)
+    if random.random() < FAIL_RATE:
+        stats["failures"] += 1
+        raise HTTPException(status_code=500, detail="falha simulada")
+
+    analyses = heuristic_analysis([{"title": n["titulo"], "description": n["descricao"]} for n in noticias])
+    content = json.dumps({"resultados": [
+        {"id": n["id"], "evento": evento, "resumo": resumo}
+        for n, (evento, resumo) in zip(noticias, analyses)
+    ]}, ensure_ascii=False)
+
+    return {
+        "id": "stub",
+        "object": "chat.completion",
+        "model": body.get("model", "stub"),
+        "choices": [{"index": 0, "message": {"role": "assistant", "content": content}, "finish_reason": "stop"}],
+    }
+
+
+@app.get("/stats")
+async def get_stats():
+    return stats
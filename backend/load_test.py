@@ -0,0 +1,168 @@
+# -*- coding: utf-8 -*-
+"""
+🏋️ Teste de Carga do /news
+==========================
+Mede a latência de chamadas concorrentes ao /news enquanto uma busca longa
+(muitas empresas) está em andamento. Tudo roda offline: as fontes são
+simuladas com latência artificial e o app é chamado in-process.
+
+    python load_test.py                 # parsing fora do event loop (padrão)
+    python load_test.py --inline-parse  # parsing no event loop, para comparar
+
+Cada chamada curta pede uma empresa ainda não vista, então o /news não
+responde do banco local: toda chamada passa pela coleta (fontes + parsing).
+
+O resultado esperado é um p99 praticamente igual com e sem a busca longa.
+"""
+
+import argparse
+import asyncio
+import contextlib
+import io
+import logging
+import os
+import statistics
+import tempfile
+import time
+import warnings
+
+from itertools import count
+
+import httpx
+
+import aggregator
+import feed_cache as feed_cache_module
+import main
+from feed_cache import feed_cache
+from news_store import news_store
+from rate_limit import rate_limiter
+
+UPSTREAM_LATENCY = 0.3  # segundos por requisição às fontes
+FEED_ITEMS = 60
+
+def _fake_feed(items: int = FEED_ITEMS) -> bytes:
+    """Gera um RSS grande o bastante para o parsing custar CPU de verdade"""
+    entries = []
+    for i in range(items):
+        entries.append(
+            f"<item><title>Nubank Totvs Stone notícia {i}</title>"
+            f"<link>https://news.google.com/articles/{i}</link>"
+            f"<description>&lt;a href=\"https://example.com/{i}\"&gt;Notícia {i}&lt;/a&gt;"
+            f"&amp;nbsp;&lt;font color=\"#6f6f6f\"&gt;Portal {i}&lt;/font&gt; {'texto ' * 40}</description>"
+            f"<pubDate>Wed, 16 Oct 2025 13:{i % 60:02d}:00 GMT</pubDate></item>"
+        )
+    return f"<?xml version=\"1.0\"?><rss><channel>{''.join(entries)}</channel></rss>".encode()
+
+FEED = _fake_feed()
+
+async def _upstream(request: httpx.Request) -> httpx.Response:
+    await asyncio.sleep(UPSTREAM_LATENCY)
+    return httpx.Response(200, content=FEED, headers={"content-type": "application/xml"})
+
+def _mock_client(*args, **kwargs) -> httpx.AsyncClient:
+    return httpx.AsyncClient(transport=httpx.MockTransport(_upstream), follow_redirects=True)
+
+# Empresas das chamadas curtas: sempre novas, para forçar a coleta
+_probe_companies = count()
+
+def _percentile(values, pct):
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+async def _probe(client: httpx.AsyncClient, workers: int, requests_per_worker: int):
+    """Dispara chamadas curtas (1 empresa, sem dados no banco) e devolve as latências"""
+    latencies = []
+
+    async def worker():
+        for _ in range(requests_per_worker):
+            start = time.perf_counter()
+            company = f"Nubank {next(_probe_companies)}"
+            r = await client.get("/news", params={"companies": company})
+            r.raise_for_status()
+            latencies.append(time.perf_counter() - start)
+
+    await asyncio.gather(*(worker() for _ in range(workers)))
+    return latencies
+
+async def _loop_lag(stop: asyncio.Event):
+    """Mede quanto o event loop atrasa um sleep de 10 ms"""
+    lags = []
+    while not stop.is_set():
+        start = time.perf_counter()
+        await asyncio.sleep(0.01)
+        lags.append(time.perf_counter() - start - 0.01)
+    return lags
+
+def _report(name, latencies, lags):
+    print(f"\n📊 {name}")
+    print(f"   - chamadas: {len(latencies)}")
+    print(f"   - p50: {statistics.median(latencies) * 1000:.0f} ms")
+    print(f"   - p95: {_percentile(latencies, 95) * 1000:.0f} ms")
+    print(f"   - p99: {_percentile(latencies, 99) * 1000:.0f} ms")
+    print(f"   - atraso máximo do event loop: {max(lags) * 1000:.0f} ms")
+
+async def run(args):
+    transport = httpx.ASGITransport(app=main.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test", timeout=120) as client:
+        # 1) Linha de base: só chamadas curtas
+        stop = asyncio.Event()
+        lag_task = asyncio.create_task(_loop_lag(stop))
+        idle = await _probe(client, args.workers, args.requests)
+        stop.set()
+        idle_lags = await lag_task
+
+        # 2) Mesmas chamadas com uma busca longa em andamento
+        companies = [f"Empresa {i}" for i in range(args.long_companies)]
+        long_scrape = asyncio.create_task(client.get("/news", params={"companies": companies}))
+        await asyncio.sleep(UPSTREAM_LATENCY)  # garante que a busca longa já começou
+
+        stop = asyncio.Event()
+        lag_task = asyncio.create_task(_loop_lag(stop))
+        busy = await _probe(client, args.workers, args.requests)
+        stop.set()
+        busy_lags = await lag_task
+        long_status = (await long_scrape).status_code
+
+    return idle, idle_lags, busy, busy_lags, long_status
+
+def main_cli():
+    parser = argparse.ArgumentParser(description="Teste de carga offline do /news")
+    parser.add_argument("--workers", type=int, default=3, help="clientes concorrentes")
+    parser.add_argument("--requests", type=int, default=10, help="chamadas por cliente")
+    parser.add_argument("--long-companies", type=int, default=80, help="empresas na busca longa")
+    parser.add_argument("--inline-parse", action="store_true", help="faz o parsing no event loop")
+    args = parser.parse_args()
+
+    aggregator.new_client = _mock_client
+    # Sem cache: cada chamada precisa buscar e parsear de verdade
+    feed_cache.max_entries = 0
+    # Sem limite por host: a fila do limitador mediria o ritmo das fontes, não o event loop
+    rate_limiter.rates = {}
+    rate_limiter.default = (0, 1)
+    # Banco descartável, para não misturar com o news.db local
+    news_store.path = os.path.join(tempfile.mkdtemp(), "load_test.db")
+    if args.inline_parse:
+        async def inline(func, *a):
+            return func(*a)
+        feed_cache_module.run_blocking = inline
+
+    print("\n" + "=" * 60)
+    print("🏋️ TESTE DE CARGA - /news")
+    print("=" * 60)
+    print(f"Parsing: {'no event loop' if args.inline_parse else 'pool de threads'}")
+
+    # Silencia os logs das fontes durante a medição
+    warnings.filterwarnings("ignore")
+    logging.getLogger().setLevel(logging.ERROR)
+    with contextlib.redirect_stdout(io.StringIO()):
+        idle, idle_lags, busy, busy_lags, long_status = asyncio.run(run(args))
+
+    _report("Sem busca longa", idle, idle_lags)
+    _report(f"Com busca longa ({args.long_companies} empresas, HTTP {long_status})", busy, busy_lags)
+
+    ratio = _percentile(busy, 99) / _percentile(idle, 99)
+    print(f"\n🎯 p99 com carga / p99 sem carga: {ratio:.2f}x")
+
+if __name__ == "__main__":
+    main_cli()
@@ -0,0 +1,90 @@
+"""
+📝 Logs estruturados
+====================
+Configuração do ``logging`` do backend. Cada módulo usa
+``logging.getLogger(__name__)`` e passa os dados do evento em ``extra``
+(``source``, ``company``, ``items``...), que viram campos do registro.
+
+- ``NEWS_LOG_LEVEL``: nível mínimo (padrão ``INFO``; ``DEBUG`` mostra cada
+  fonte e cada notícia encontrada).
+- ``NEWS_LOG_FORMAT``: ``text`` (padrão) ou ``json`` (uma linha por registro).
+
+A escrita acontece numa thread própria (``QueueHandler``/``QueueListener``):
+quem loga só enfileira o registro, sem bloquear o event loop com I/O.
+"""
+
+import atexit
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import sys
+from datetime import datetime, timezone
+from typing import Optional
+
+LOG_LEVEL = os.getenv("NEWS_LOG_LEVEL", "INFO").upper()
+LOG_FORMAT = os.getenv("NEWS_LOG_FORMAT", "text").lower()
+
+# Atributos padrão de um LogRecord; o resto veio de ``extra``
+_STANDARD_ATTRS = frozenset(vars(logging.LogRecord("", 0, "", 0, "", (), None))) | {"message", "asctime"}
+
+# Bibliotecas que logam cada requisição em INFO
+_NOISY_LOGGERS = ("httpx", "httpcore")
+
+_listener: Optional[logging.handlers.QueueListener] = None
+
+
+def _extra_fields(record: logging.LogRecord) -> dict:
+    return {k: v for k, v in vars(record).items() if k not in _STANDARD_ATTRS and not k.startswith("_")}
+
+
+class JsonFormatter(logging.Formatter):
+    """Uma linha JSON por registro, com os campos de ``extra``"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "msg": record.getMessage(),
+            **_extra_fields(record),
+        }
+        if record.exc_info:
+            entry["exc_info"] = self.formatException(record.exc_info)
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+class TextFormatter(logging.Formatter):
+    """Formato legível; os campos de ``extra`` vão no fim como chave=valor"""
+
+    def __init__(self):
+        super().__init__("%(asctime)s %(levelname)-7s %(name)s: %(message)s")
+
+    def format(self, record: logging.LogRecord) -> str:
+        line = super().format(record)
+        extra = _extra_fields(record)
+        if extra:
+            line += " | " + " ".join(f"{k}={v}" for k, v in extra.items())
+        return line
+
+
+def setup_logging(level: str = LOG_LEVEL, fmt: str = LOG_FORMAT) -> None:
+    """Configura o logger raiz (idempotente)"""
+    global _listener
+    if _listener is not None:
+        return
+
+    handler = logging.StreamHandler(sys.stderr)
+    handler.setFormatter(JsonFormatter() if fmt == "json" else TextFormatter())
+
+    records: queue.SimpleQueue = queue.SimpleQueue()
+    _listener = logging.handlers.QueueListener(records, handler, respect_handler_level=True)
+    _listener.start()
+    atexit.register(_listener.stop)
+
+    root = logging.getLogger()
+    root.addHandler(logging.handlers.QueueHandler(records))
+    root.setLevel(level)
+    for name in _NOISY_LOGGERS:
+        logging.getLogger(name).setLevel(max(logging.WARNING, root.level))
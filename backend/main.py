@@ -1,20 +1,373 @@
-from typing import List
-from fastapi import FastAPI, Query
+import asyncio
+import hashlib
+import json
+import logging
+import time
+from contextlib import asynccontextmanager
+from functools import partial
+from typing import List, Optional, Set, Tuple
+from fastapi import FastAPI, HTTPException, Query, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
-from schemas import NewsItem
-from data_source import fetch_real_news
-from analyzer import analyze_text
+from fastapi.responses import PlainTextResponse, StreamingResponse
+from schemas import EventType, NewsItem
+from data_source import finalize_news, sort_by_date, stream_real_news
+from dedup import cluster_news, dedup_news
+from analyzer import analyze_many, analyze_text, get_classifier_backend, set_classifier_backend
+from llm_classifier import backend_from_env
+from aggregator import AdmissionGate, Overloaded, SingleFlight, run_blocking, set_shared_client, shared_client
+import http_client
+from feed_cache import feed_cache
+from source_health import CLOSED, HALF_OPEN, source_health
+from rate_limit import rate_limiter
+from url_resolver import url_resolver
+from logs import setup_logging
+import metrics
+from news_store import (Cursor, decode_cursor, decode_since, encode_cursor, encode_since, ingest, news_store,
+                        row_cursor)
+from sources import parse_sources, source_registry
+import scheduler as refresh
 
-app = FastAPI(title="Market News Monitor API")
+setup_logging()
+logger = logging.getLogger(__name__)
+
+# Coleta periódica da watchlist, para que o /news sirva dados já aquecidos
+scheduler = refresh.Scheduler()
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Um único cliente HTTP (pool, keep-alive, HTTP/2, cache de DNS) para todas as fontes
+    client = http_client.new_client()
+    set_shared_client(client)
+    # Classificação via LLM, se configurada; senão fica a heurística
+    llm = backend_from_env()
+    if llm is not None:
+        set_classifier_backend(llm)
+    if refresh.ENABLED:
+        scheduler.start()
+    yield
+    await scheduler.stop()
+    await get_classifier_backend().aclose()
+    set_shared_client(None)
+    await client.aclose()
+    url_resolver.close()
+
+app = FastAPI(title="Market News Monitor API", lifespan=lifespan)
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["*"],  # Em produção, especifique os domínios permitidos
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["ETag", "X-Next-Cursor", "X-Latest-Cursor"],  # paginação do /news
 )
 
+@app.middleware("http")
+async def observe_latency(request: Request, call_next):
+    """Latência por rota (até o início da resposta, no caso do streaming)"""
+    start = time.perf_counter()
+    response = await call_next(request)
+    route = request.scope.get("route")
+    metrics.HTTP_SECONDS.observe(time.perf_counter() - start, route=getattr(route, "path", "other"),
+                                 status=str(response.status_code))
+    return response
+
+# Maior página aceita pelo /news (parâmetro limit)
+MAX_PAGE_SIZE = 500
+# Uma página lê no máximo limit × isso linhas do store (filtros muito seletivos devolvem páginas menores)
+PAGE_SCAN_FACTOR = 10
+
+# Limita buscas simultâneas; excedentes recebem 503 em vez de enfileirar sem fim
+scrape_gate = AdmissionGate()
+
+def _overloaded() -> HTTPException:
+    return HTTPException(
+        status_code=503,
+        detail="Servidor ocupado, tente novamente em instantes",
+        headers={"Retry-After": "5"},
+    )
+
+def _ndjson(frame: dict) -> bytes:
+    return (json.dumps(frame, ensure_ascii=False) + "\n").encode("utf-8")
+
+def _etag(rows: List[dict], *params) -> str:
+    """ETag do resultado: conteúdo das linhas lidas + parâmetros que mudam a resposta"""
+    digest = hashlib.sha1(repr(params).encode("utf-8"))
+    for row in rows:
+        digest.update(repr((row["id"], row["published_ts"], row["published_at"], row["title"],
+                            row["description"], row["url"])).encode("utf-8"))
+    return f'"{digest.hexdigest()}"'
+
+async def _news_page(companies: List[str], fonte_type: Optional[str], limit: Optional[int],
+                     after: Optional[Cursor], since: Optional[int], sources: Optional[List[str]],
+                     evento: Optional[str]) -> Tuple[List[dict], List[dict], Optional[dict]]:
+    """
+    Página do /news: lê o store em blocos de ``limit`` linhas até juntar
+    ``limit`` notícias já deduplicadas e do ``evento`` pedido. Retorna
+    (linhas lidas, notícias da página, última linha da página se há uma próxima).
+
+    A página termina antes da primeira linha do grupo que não coube; uma
+    cópia de notícia da página que só aparece depois desse ponto volta na próxima.
+    """
+    rows: List[dict] = []
+    cursor = after
+    while True:
+        chunk = await run_blocking(news_store.query, companies, fonte_type, limit, cursor, since, sources)
+        rows += chunk
+        exhausted = not limit or len(chunk) < limit
+        # Grupos na ordem do /news (pela primeira linha de cada um)
+        clusters = sorted(await run_blocking(cluster_news, rows), key=min)
+        unique = await analyze_many(dedup_news(rows, clusters))
+        matching = [i for i, news in enumerate(unique) if not evento or news["evento"] == evento]
+        if exhausted or len(matching) > limit or len(rows) >= limit * PAGE_SCAN_FACTOR:
+            break
+        cursor = row_cursor(chunk[-1])
+
+    if limit and len(matching) > limit:
+        cut = min(clusters[matching[limit]])
+        return rows[:cut], [unique[i] for i in matching[:limit]], rows[cut - 1]
+    return rows, [unique[i] for i in matching], None if exhausted else rows[-1]
+
+def _selected_sources(values: Optional[List[str]]) -> Optional[List[str]]:
+    """Fontes pedidas em ``?sources=`` (None = todas); 400 para fontes desconhecidas"""
+    sources = parse_sources(values)
+    if sources:
+        try:
+            source_registry.select(sources)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+    return sources
+
+def _not_modified(request: Request, etag: str) -> bool:
+    if_none_match = request.headers.get("if-none-match")
+    if not if_none_match:
+        return False
+    tags = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+    return "*" in tags or etag in tags
+
+# Coletas iniciais idênticas e simultâneas (mesmo conjunto de empresas) viram uma só
+_ingest_flight = SingleFlight()
+
+async def _gated_ingest(companies: List[str], sources: Optional[List[str]] = None) -> int:
+    async with scrape_gate:
+        return await ingest(companies, sources=sources)
+
+async def _ingest_once(companies: List[str], sources: Optional[List[str]] = None) -> int:
+    key = (frozenset(c.strip().lower() for c in companies), frozenset(sources) if sources else None)
+    return await _ingest_flight.do(key, partial(_gated_ingest, companies, sources))
+
+# Empresas com coleta em segundo plano em andamento (evita coletas duplicadas)
+_refreshing: Set[str] = set()
+_background_tasks: Set[asyncio.Task] = set()
+
+async def _refresh(companies: List[str], sources: Optional[List[str]] = None):
+    try:
+        async with scrape_gate:
+            await ingest(companies, sources=sources)
+    except Overloaded:
+        logger.warning("⚠️ Atualização adiada (servidor ocupado)", extra={"companies": companies})
+    except Exception as e:
+        logger.warning("⚠️ Erro ao atualizar: %s", e, extra={"companies": companies})
+    finally:
+        _refreshing.difference_update(c.lower() for c in companies)
+
+def _refresh_in_background(companies: List[str], sources: Optional[List[str]] = None):
+    pending = [c for c in companies if c.lower() not in _refreshing]
+    if not pending:
+        return
+    _refreshing.update(c.lower() for c in pending)
+    task = asyncio.create_task(_refresh(pending, sources))
+    _background_tasks.add(task)
+    task.add_done_callback(_background_tasks.discard)
+
 @app.get("/news", response_model=List[NewsItem])
-async def get_news(companies: List[str] = Query(...)):
-    raw = fetch_real_news(companies)
-    return raw
+async def get_news(request: Request, response: Response, companies: List[str] = Query(...),
+                   fonte_type: Optional[str] = None, evento: Optional[EventType] = None,
+                   limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE),
+                   cursor: Optional[str] = None, since: Optional[str] = None,
+                   sources: Optional[List[str]] = Query(None)):
+    """
+    Lê as notícias do armazenamento local. Empresas nunca coletadas são
+    coletadas na hora; dados velhos são servidos enquanto uma nova coleta
+    roda em segundo plano. ``evento`` filtra pela classificação.
+
+    ``sources`` (ex.: ``?sources=google,g1``) restringe a resposta a essas
+    fontes, e as coletas disparadas pela requisição consultam só elas.
+
+    Paginação por cursor sobre ``(published_ts, id)``: ``limit`` é o número de
+    notícias da página, já sem duplicatas e filtradas por ``evento``, e o
+    cabeçalho ``X-Next-Cursor`` (enviado de volta em ``cursor``) aponta a próxima. ``X-Latest-Cursor`` marca a última notícia
+    gravada; enviado em ``since``, traz só o que foi gravado depois dela
+    (inclusive notícias com data antiga ou sem data). Com
+    ``If-None-Match`` igual ao ``ETag`` a resposta é ``304``.
+    """
+    try:
+        after = decode_cursor(cursor) if cursor else None
+        newer_than = decode_since(since) if since else None
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    sources = _selected_sources(sources)
+
+    missing, stale = await run_blocking(news_store.freshness, companies, sources)
+    if missing:
+        try:
+            await _ingest_once(missing, sources)
+        except Overloaded:
+            raise _overloaded()
+    if stale:
+        _refresh_in_background(stale, sources)
+    # Lido antes da consulta: o que for gravado no meio vem de novo no próximo since, mas nada se perde
+    latest_id = await run_blocking(news_store.latest_id)
+    rows, page, last = await _news_page(companies, fonte_type, limit, after, newer_than, sources, evento)
+
+    headers = {"ETag": _etag(rows, evento, sources)}
+    if not after:
+        headers["X-Latest-Cursor"] = encode_since(latest_id)
+    if last is not None:
+        headers["X-Next-Cursor"] = encode_cursor(last)
+
+    if _not_modified(request, headers["ETag"]):
+        return Response(status_code=304, headers=headers)
+    response.headers.update(headers)
+    return page
+
+@app.get("/news/stream")
+async def stream_news(companies: List[str] = Query(...), evento: Optional[EventType] = None,
+                      sources: Optional[List[str]] = Query(None)):
+    """
+    Variante em streaming do /news (NDJSON, um objeto por linha).
+
+    Cada fonte concluída gera um frame ``{"type": "items", ...}`` com as
+    notícias numeradas por ``seq``; o último frame ``{"type": "done", ...}``
+    traz em ``order`` os ``seq`` na mesma ordem (por data) que o /news devolveria,
+    já sem as duplicatas, em ``alternates`` as outras fontes de cada ``seq`` e
+    em ``latest_cursor`` o valor a enviar em ``/news?since=`` para buscar novidades.
+    Com ``evento``, só as notícias desse evento são enviadas; com ``sources``,
+    só essas fontes são consultadas.
+    """
+    sources = _selected_sources(sources)
+    if scrape_gate.full:
+        raise _overloaded()
+
+    async def frames():
+        start = time.perf_counter()
+        collected = []
+        # Ponto de partida para o cliente pedir só as novidades (/news?since=...)
+        latest_id = await run_blocking(news_store.latest_id)
+        try:
+            async with scrape_gate:
+                async for source, items in stream_real_news(companies, sources=sources):
+                    batch = []
+                    for item in await analyze_many(items):
+                        # Guarda o item original (com o published_ts) para ordenar e armazenar no fim
+                        item["seq"] = len(collected)
+                        collected.append(item)
+                        if not evento or item["evento"] == evento:
+                            news = NewsItem.model_validate(item).model_dump(mode="json")
+                            news["seq"] = item["seq"]
+                            batch.append(news)
+                    if batch:
+                        yield _ndjson({"type": "items", "source": source, "items": batch})
+        except Overloaded:
+            yield _ndjson({"type": "error", "status": 503, "detail": "Servidor ocupado, tente novamente em instantes"})
+            return
+
+        # Os links que o stream mandou sem resolver (já em andamento) são trocados antes de gravar
+        await url_resolver.resolve_news(collected)
+        await run_blocking(news_store.upsert_many, collected, companies, sources)
+        unique = await finalize_news(sort_by_date(collected), evento)
+
+        yield _ndjson({
+            "type": "done",
+            "total": len(collected),
+            "order": [news["seq"] for news in unique],
+            "alternates": {news["seq"]: news["alternates"] for news in unique if news["alternates"]},
+            "latest_cursor": encode_since(latest_id),
+            "elapsed_ms": round((time.perf_counter() - start) * 1000),
+        })
+
+    return StreamingResponse(frames(), media_type="application/x-ndjson")
+
+@app.get("/sources")
+async def list_sources():
+    """Fontes aceitas em ``?sources=``: tipo (por empresa ou feed), custo, limites e se estão ativas"""
+    return source_registry.snapshot()
+
+@app.get("/health")
+async def health():
+    return {
+        "status": "ok",
+        "scrapes_inflight": scrape_gate.inflight,
+        "scrapes_queued": scrape_gate.queued,
+        "ingests_inflight": _ingest_flight.inflight,
+        "ingests_coalesced": _ingest_flight.shared,
+    }
+
+@app.get("/admin/cache")
+async def cache_stats():
+    """Contadores do cache de feeds (acertos, falhas, revalidações)"""
+    return feed_cache.snapshot()
+
+@app.get("/admin/store")
+async def store_stats():
+    """Tamanho do armazenamento local e horário da última coleta"""
+    return await run_blocking(news_store.snapshot)
+
+@app.get("/admin/scheduler")
+async def scheduler_stats():
+    """Estado da coleta periódica (última execução, erros, espera por orçamento)"""
+    return scheduler.snapshot()
+
+@app.get("/admin/classifier")
+async def classifier_stats():
+    """Backend de classificação em uso e seus contadores (chamadas, cache, orçamento)"""
+    return get_classifier_backend().snapshot()
+
+@app.get("/admin/sources")
+async def source_stats():
+    """Circuito (fechado/aberto/meio-aberto), latências e timeout adaptativo de cada fonte"""
+    return source_health.snapshot()
+
+@app.get("/admin/http")
+async def http_stats():
+    """Pool do cliente HTTP compartilhado: conexões ativas/ociosas, fila, reaproveitamento e cache de DNS"""
+    client = shared_client()
+    return (http_client.pool_stats(client) if client is not None else None) or {"shared_client": False}
+
+@app.get("/admin/urls")
+async def url_stats():
+    """Resolução de links de redirecionamento: acertos no cache, resolvidos, falhas e adiados"""
+    return url_resolver.snapshot()
+
+@app.get("/admin/hosts")
+async def host_stats():
+    """Limite de requisições por host: taxa atual, esperas, 429 recebidos e pausas (Retry-After)"""
+    return rate_limiter.snapshot()
+
+# Estado atual de outros componentes, lido na hora de exportar as métricas
+_CIRCUIT_STATE = metrics.gauge("news_source_circuit_state", "Circuito da fonte: 0 fechado, 1 meio-aberto, 2 aberto",
+                               ["source", "host"])
+_FEED_CACHE = metrics.gauge("news_feed_cache", "Contadores do cache de feeds", ["stat"])
+_SCRAPES = metrics.gauge("news_scrapes", "Buscas completas em execução e na fila", ["state"])
+_HTTP_POOL = metrics.gauge("news_http_pool", "Pool do cliente HTTP compartilhado (conexões, fila, reaproveitamento)",
+                           ["stat"])
+
+def _collect_state():
+    for source, hosts in source_health.snapshot().items():
+        for host, health in hosts.items():
+            state = 0 if health["state"] == CLOSED else 1 if health["state"] == HALF_OPEN else 2
+            _CIRCUIT_STATE.set(state, source=source, host=host)
+    for stat, value in feed_cache.snapshot().items():
+        _FEED_CACHE.set(value, stat=stat)
+    _SCRAPES.set(scrape_gate.inflight, state="inflight")
+    _SCRAPES.set(scrape_gate.queued, state="queued")
+    client = shared_client()
+    for stat, value in ((http_client.pool_stats(client) if client is not None else None) or {}).items():
+        if isinstance(value, (int, float)) and not isinstance(value, bool):
+            _HTTP_POOL.set(value, stat=stat)
+
+metrics.REGISTRY.add_collector(_collect_state)
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def prometheus_metrics():
+    """Métricas no formato texto do Prometheus (latência, bytes, itens e erros por fonte)"""
+    return PlainTextResponse(metrics.REGISTRY.render(), media_type=metrics.CONTENT_TYPE)
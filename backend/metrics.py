@@ -0,0 +1,200 @@
+"""
+📈 Métricas (formato texto do Prometheus)
+=========================================
+Contadores e histogramas em memória, exportados pelo ``GET /metrics``.
+Implementação mínima, sem dependências, no formato de exposição 0.0.4:
+
+    news_fetch_seconds_bucket{source="google",le="0.5"} 12
+
+Os valores podem ser atualizados de qualquer thread (o parsing roda no pool
+do ``aggregator``). Estados que já existem em outros objetos (cache, circuitos)
+entram por coletores chamados na hora da exportação.
+"""
+
+import bisect
+import threading
+from typing import Callable, Dict, Iterable, List, Sequence, Tuple
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Limites (segundos) dos histogramas de latência
+LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 20)
+PARSE_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1)
+
+Labels = Tuple[str, ...]
+Sample = Tuple[str, Dict[str, str], float]
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(labels: Dict[str, str]) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in labels.items()) + "}"
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, description: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.description = description
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, str]) -> Labels:
+        return tuple(str(labels.get(name, "")) for name in self.labelnames)
+
+    def samples(self) -> List[Sample]:
+        raise NotImplementedError
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.description}", f"# TYPE {self.name} {self.kind}"]
+        lines += [f"{name}{_format_labels(labels)} {_format_value(value)}" for name, labels, value in self.samples()]
+        return lines
+
+
+class Counter(_Metric):
+    """Valor que só cresce (requisições, erros, bytes)"""
+
+    kind = "counter"
+
+    def __init__(self, name: str, description: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, description, labelnames)
+        self._values: Dict[Labels, float] = {}
+
+    def inc(self, amount: float = 1, **labels: str) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def samples(self) -> List[Sample]:
+        with self._lock:
+            values = list(self._values.items())
+        return [(self.name, dict(zip(self.labelnames, key)), value) for key, value in sorted(values)]
+
+
+class Gauge(_Metric):
+    """Valor instantâneo (ocupação, estado do circuito)"""
+
+    kind = "gauge"
+
+    def __init__(self, name: str, description: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, description, labelnames)
+        self._values: Dict[Labels, float] = {}
+
+    def set(self, value: float, **labels: str) -> None:
+        with self._lock:
+            self._values[self._key(labels)] = value
+
+    def samples(self) -> List[Sample]:
+        with self._lock:
+            values = list(self._values.items())
+        return [(self.name, dict(zip(self.labelnames, key)), value) for key, value in sorted(values)]
+
+
+class Histogram(_Metric):
+    """Distribuição em baldes cumulativos (latências, tempo de parse)"""
+
+    kind = "histogram"
+
+    def __init__(self, name: str, description: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = LATENCY_BUCKETS):
+        super().__init__(name, description, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # labels → (contagem por balde, soma, total)
+        self._values: Dict[Labels, List] = {}
+
+    def observe(self, value: float, **labels: str) -> None:
+        key = self._key(labels)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                state = self._values[key] = [[0] * len(self.buckets), 0.0, 0]
+            index = bisect.bisect_left(self.buckets, value)
+            if index < len(self.buckets):
+                state[0][index] += 1
+            state[1] += value
+            state[2] += 1
+
+    def samples(self) -> List[Sample]:
+        with self._lock:
+            values = [(key, list(counts), total, count) for key, (counts, total, count) in self._values.items()]
+        samples: List[Sample] = []
+        for key, counts, total, count in sorted(values):
+            labels = dict(zip(self.labelnames, key))
+            cumulative = 0
+            for bound, n in zip(self.buckets, counts):
+                cumulative += n
+                samples.append((f"{self.name}_bucket", {**labels, "le": _format_value(bound)}, cumulative))
+            samples.append((f"{self.name}_bucket", {**labels, "le": "+Inf"}, count))
+            samples.append((f"{self.name}_sum", labels, total))
+            samples.append((f"{self.name}_count", labels, count))
+        return samples
+
+
+class Registry:
+    """Conjunto de métricas exportadas; coletores atualizam gauges antes da exportação"""
+
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+        self._collectors: List[Callable[[], None]] = []
+
+    def register(self, metric: _Metric) -> _Metric:
+        self._metrics[metric.name] = metric
+        return metric
+
+    def add_collector(self, collector: Callable[[], None]) -> None:
+        self._collectors.append(collector)
+
+    def render(self) -> str:
+        for collector in self._collectors:
+            collector()
+        lines: List[str] = []
+        for metric in self._metrics.values():
+            lines += metric.render()
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+
+
+def counter(name: str, description: str, labelnames: Iterable[str] = ()) -> Counter:
+    return REGISTRY.register(Counter(name, description, tuple(labelnames)))
+
+
+def gauge(name: str, description: str, labelnames: Iterable[str] = ()) -> Gauge:
+    return REGISTRY.register(Gauge(name, description, tuple(labelnames)))
+
+
+def histogram(name: str, description: str, labelnames: Iterable[str] = (),
+              buckets: Sequence[float] = LATENCY_BUCKETS) -> Histogram:
+    return REGISTRY.register(Histogram(name, description, tuple(labelnames), buckets))
+
+
+# ============================================================
+# 📊 MÉTRICAS DA COLETA
+# ============================================================
+
+FETCH_SECONDS = histogram("news_fetch_seconds", "Latência das requisições às fontes", ["source"])
+FETCH_REQUESTS = counter("news_fetch_requests_total", "Requisições às fontes por resultado (status HTTP ou erro)",
+                         ["source", "result"])
+FETCH_BYTES = counter("news_fetch_bytes_total", "Bytes baixados das fontes", ["source"])
+URL_RESOLVE = counter("news_url_resolve_total",
+                      "Links de redirecionamento por resultado (cache, resolvido, falha, adiado, pulado)", ["result"])
+RATE_LIMIT_WAIT = histogram("news_rate_limit_wait_seconds", "Espera pelo limite de requisições do host", ["source"])
+PARSE_SECONDS = histogram("news_parse_seconds", "Tempo de parsing por feed", ["source"], PARSE_BUCKETS)
+JOB_SECONDS = histogram("news_job_seconds", "Duração de cada busca (fonte, empresa)", ["source"])
+# Sem rótulo de empresa: as empresas vêm da query string e fariam as séries crescerem sem limite
+JOB_ERRORS = counter("news_job_errors_total", "Buscas que falharam, por fonte", ["source"])
+JOBS_CANCELLED = counter("news_jobs_cancelled_total", "Buscas canceladas pelo prazo", ["source"])
+ITEMS = counter("news_items_total", "Notícias coletadas por fonte", ["source"])
+HTTP_SECONDS = histogram("news_http_request_seconds", "Latência das rotas da API", ["route", "status"])
@@ -0,0 +1,369 @@
+"""
+🗃️ Armazenamento local de notícias
+==================================
+Guarda as notícias coletadas em SQLite (modo WAL) para que o ``/news`` leia
+de dados locais indexados em vez de raspar as fontes a cada chamada.
+
+Cada notícia é identificada por ``(empresa, dedup_key)``, onde ``dedup_key``
+é o hash da URL canônica (ou do título, quando não há URL). Uma nova
+ingestão da mesma notícia apenas atualiza o registro existente.
+"""
+
+import base64
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from aggregator import run_blocking
+from data_source import fetch_real_news_async
+from dedup import canonical_url, normalize_title
+from feed_cache import feed_cache
+from sources import source_registry
+from url_resolver import url_resolver
+
+DB_PATH = os.getenv("NEWS_DB_PATH", os.path.join(os.path.dirname(os.path.abspath(__file__)), "news.db"))
+# Depois disso (segundos) os dados de uma empresa são considerados velhos
+MAX_AGE = float(os.getenv("NEWS_STORE_MAX_AGE", "600"))
+# Notícias que não aparecem em nenhuma coleta há mais tempo que isso são removidas
+RETENTION_DAYS = float(os.getenv("NEWS_STORE_RETENTION_DAYS", "30"))
+# Ingestão incremental: de cada feed só entra o que apareceu desde a última coleta
+INCREMENTAL = os.getenv("NEWS_INCREMENTAL", "1") not in ("0", "false", "no")
+
+logger = logging.getLogger(__name__)
+
+NEWS_FIELDS = ("company", "title", "description", "url", "fonte", "fonte_type", "published_at", "published_ts")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS news (
+    company      TEXT NOT NULL COLLATE NOCASE,
+    dedup_key    TEXT NOT NULL,
+    title        TEXT NOT NULL,
+    description  TEXT,
+    url          TEXT NOT NULL,
+    fonte        TEXT NOT NULL,
+    fonte_type   TEXT NOT NULL,
+    published_at TEXT,
+    published_ts REAL,
+    first_seen   REAL NOT NULL,
+    last_seen    REAL NOT NULL,
+    PRIMARY KEY (company, dedup_key)
+);
+CREATE INDEX IF NOT EXISTS idx_news_company_ts ON news (company, published_ts DESC);
+CREATE INDEX IF NOT EXISTS idx_news_fonte_ts ON news (fonte_type, published_ts DESC);
+CREATE INDEX IF NOT EXISTS idx_news_ts ON news (published_ts DESC);
+CREATE INDEX IF NOT EXISTS idx_news_last_seen ON news (last_seen);
+
+-- Última coleta de cada (empresa, fonte)
+CREATE TABLE IF NOT EXISTS refreshes (
+    company      TEXT NOT NULL COLLATE NOCASE,
+    source       TEXT NOT NULL,
+    refreshed_at REAL NOT NULL,
+    PRIMARY KEY (company, source)
+);
+"""
+
+# ============================================================
+# 🔑 CHAVE DE DEDUPLICAÇÃO
+# ============================================================
+
+def dedup_key(item: Dict[str, str]) -> str:
+    """Hash da URL canônica; sem URL, hash do título normalizado"""
+    url = (item.get("url") or "").strip()
+    basis = "u:" + canonical_url(url) if url else "t:" + normalize_title(item.get("title") or "")
+    return hashlib.sha1(basis.encode("utf-8")).hexdigest()
+
+
+# Posição na ordem do /news: (published_ts em epoch, rowid)
+Cursor = Tuple[Optional[float], int]
+
+
+def _encode(value: object) -> str:
+    raw = json.dumps(value, separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def _decode(cursor: str) -> object:
+    return json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+
+
+def row_cursor(news: Dict[str, object]) -> Cursor:
+    """Posição da notícia (linha devolvida por ``NewsStore.query``) na ordem do /news"""
+    return _epoch(news.get("published_ts")), news["id"]
+
+
+def encode_cursor(news: Dict[str, object]) -> str:
+    """Cursor opaco da notícia (linha devolvida por ``NewsStore.query``)"""
+    return _encode(list(row_cursor(news)))
+
+
+def decode_cursor(cursor: str) -> Cursor:
+    """Inverso de ``encode_cursor``; ``ValueError`` se o cursor for inválido"""
+    try:
+        ts, rowid = _decode(cursor)
+        if (ts is not None and not isinstance(ts, (int, float))) or not isinstance(rowid, int):
+            raise TypeError
+        return (float(ts) if ts is not None else None), rowid
+    except (TypeError, ValueError, UnicodeDecodeError) as e:
+        raise ValueError(f"cursor inválido: {cursor!r}") from e
+
+
+def encode_since(last_id: int) -> str:
+    """Cursor do ``since``: a última notícia gravada (``NewsStore.latest_id``), na ordem de inserção"""
+    return _encode({"id": last_id})
+
+
+def decode_since(cursor: str) -> int:
+    """Inverso de ``encode_since``; ``ValueError`` se o cursor for inválido"""
+    try:
+        last_id = _decode(cursor)["id"]
+        if not isinstance(last_id, int):
+            raise TypeError
+        return last_id
+    except (TypeError, ValueError, KeyError, UnicodeDecodeError) as e:
+        raise ValueError(f"cursor inválido: {cursor!r}") from e
+
+
+def _epoch(published_ts: Optional[datetime]) -> Optional[float]:
+    return published_ts.timestamp() if published_ts is not None else None
+
+
+def _source_names(sources: Optional[Iterable[str]]) -> List[str]:
+    """Nomes das fontes ativas entre ``sources`` (None = todas)"""
+    return [source.name for source in source_registry.select(sources)]
+
+
+def _row_to_news(row: sqlite3.Row) -> Dict[str, object]:
+    news = dict(row)
+    if news["published_ts"] is not None:
+        news["published_ts"] = datetime.fromtimestamp(news["published_ts"], timezone.utc)
+    return news
+
+
+# ============================================================
+# 🗃️ STORE
+# ============================================================
+
+class NewsStore:
+    """Acesso ao SQLite; uma conexão por thread (o WAL permite leituras em paralelo)"""
+
+    def __init__(self, path: str = DB_PATH):
+        self.path = path
+        self._local = threading.local()
+        self._schema_lock = threading.Lock()
+        self._schema_ready = False
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=10)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            with self._schema_lock:
+                if not self._schema_ready:
+                    conn.executescript(_SCHEMA)
+                    self._schema_ready = True
+            self._local.conn = conn
+        return conn
+
+    def close(self) -> None:
+        """Fecha a conexão da thread atual"""
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
+
+    def upsert_many(self, items: Iterable[Dict[str, str]], companies: Iterable[str] = (),
+                    sources: Optional[Iterable[str]] = None) -> int:
+        """
+        Insere ou atualiza as notícias e marca ``companies`` como atualizadas
+        nas fontes coletadas (todas, ou só ``sources``). Retorna quantas
+        notícias eram novas.
+        """
+        now = time.time()
+        companies = list(companies)
+        names = _source_names(sources) if companies else []
+        rows = []
+        for item in items:
+            if not item.get("title") or not item.get("url"):
+                continue
+            rows.append((
+                item["company"], dedup_key(item), item["title"], item.get("description") or "",
+                item["url"], item.get("fonte") or "", item.get("fonte_type") or "",
+                item.get("published_at"), _epoch(item.get("published_ts")), now, now,
+            ))
+
+        conn = self._conn()
+        with conn:
+            before = conn.total_changes
+            conn.executemany(
+                """INSERT OR IGNORE INTO news (company, dedup_key, title, description, url, fonte,
+                       fonte_type, published_at, published_ts, first_seen, last_seen)
+                   VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)""",
+                rows,
+            )
+            inserted = conn.total_changes - before
+            # Notícias já conhecidas: atualiza o conteúdo e quando foram vistas pela última vez
+            conn.executemany(
+                """UPDATE news SET title = ?, description = ?, url = ?, fonte = ?, fonte_type = ?,
+                       published_at = COALESCE(?, published_at), published_ts = COALESCE(?, published_ts),
+                       last_seen = ?
+                   WHERE company = ? AND dedup_key = ? AND first_seen < ?""",
+                [(r[2], r[3], r[4], r[5], r[6], r[7], r[8], now, r[0], r[1], now) for r in rows],
+            )
+            conn.executemany(
+                "INSERT OR REPLACE INTO refreshes (company, source, refreshed_at) VALUES (?, ?, ?)",
+                [(company, name, now) for company in companies for name in names],
+            )
+        return inserted
+
+    def touch(self, items: Iterable[Tuple[str, str]]) -> int:
+        """Renova o ``last_seen`` de notícias ``(empresa, url)`` que continuam nas fontes"""
+        now = time.time()
+        rows = [(now, company, dedup_key({"url": url})) for company, url in items if company and url]
+        conn = self._conn()
+        with conn:
+            before = conn.total_changes
+            conn.executemany("UPDATE news SET last_seen = ? WHERE company = ? AND dedup_key = ?", rows)
+            return conn.total_changes - before
+
+    def prune(self, retention_days: float = RETENTION_DAYS) -> int:
+        """Remove notícias que não aparecem em nenhuma coleta há ``retention_days``"""
+        conn = self._conn()
+        with conn:
+            cur = conn.execute("DELETE FROM news WHERE last_seen < ?", (time.time() - retention_days * 86400,))
+        return cur.rowcount
+
+    def query(self, companies: List[str], fonte_type: Optional[str] = None, limit: Optional[int] = None,
+              after: Optional[Cursor] = None, since: Optional[int] = None,
+              sources: Optional[List[str]] = None) -> List[Dict[str, object]]:
+        """
+        Notícias das empresas, mais recentes primeiro (sem data vão para o final),
+        opcionalmente só das fontes em ``sources``.
+
+        A ordem é ``(published_ts DESC, id)``; ``after`` devolve o que vem depois
+        desse cursor (próxima página). ``since`` (um ``latest_id``) restringe às
+        notícias gravadas depois dele, tenham data mais antiga ou nenhuma.
+        Cada notícia traz o seu ``id``.
+        """
+        if not companies:
+            return []
+        sql = (f"SELECT rowid AS id, {', '.join(NEWS_FIELDS)} FROM news "
+               f"WHERE company IN ({', '.join('?' * len(companies))})")
+        params: list = list(companies)
+        if fonte_type:
+            sql += " AND fonte_type = ?"
+            params.append(fonte_type)
+        if sources:
+            sql += f" AND fonte_type IN ({', '.join('?' * len(sources))})"
+            params += list(sources)
+        if after is not None:
+            ts, rowid = after
+            if ts is None:
+                sql += " AND published_ts IS NULL AND rowid > ?"
+                params.append(rowid)
+            else:
+                sql += " AND (published_ts < ? OR (published_ts = ? AND rowid > ?) OR published_ts IS NULL)"
+                params += [ts, ts, rowid]
+        if since is not None:
+            sql += " AND rowid > ?"
+            params.append(since)
+        sql += " ORDER BY published_ts DESC, rowid"
+        if limit:
+            sql += " LIMIT ?"
+            params.append(limit)
+        return [_row_to_news(row) for row in self._conn().execute(sql, params)]
+
+    def latest_id(self) -> int:
+        """``id`` da última notícia gravada (0 com o banco vazio); marca o ponto de partida do ``since``"""
+        return self._conn().execute("SELECT COALESCE(MAX(rowid), 0) FROM news").fetchone()[0]
+
+    def freshness(self, companies: List[str], sources: Optional[Iterable[str]] = None,
+                  max_age: float = MAX_AGE) -> Tuple[List[str], List[str]]:
+        """
+        Separa as empresas em (alguma das fontes nunca coletada, alguma
+        coletada há mais de ``max_age``), olhando todas as fontes ou só ``sources``.
+        """
+        names = _source_names(sources)
+        if not companies or not names:
+            return [], []
+        rows = self._conn().execute(
+            f"SELECT company, source, refreshed_at FROM refreshes "
+            f"WHERE company IN ({', '.join('?' * len(companies))}) AND source IN ({', '.join('?' * len(names))})",
+            list(companies) + names,
+        ).fetchall()
+        refreshed: Dict[str, Dict[str, float]] = {}
+        for row in rows:
+            refreshed.setdefault(row["company"].lower(), {})[row["source"]] = row["refreshed_at"]
+        now = time.time()
+        missing, stale = [], []
+        for company in companies:
+            by_source = refreshed.get(company.lower(), {})
+            if len(by_source) < len(names):
+                missing.append(company)
+            elif now - min(by_source.values()) > max_age:
+                stale.append(company)
+        return missing, stale
+
+    def snapshot(self) -> Dict[str, object]:
+        conn = self._conn()
+        return {
+            "path": self.path,
+            "news": conn.execute("SELECT COUNT(*) FROM news").fetchone()[0],
+            "companies": conn.execute("SELECT COUNT(DISTINCT company) FROM refreshes").fetchone()[0],
+            "last_refresh": conn.execute("SELECT MAX(refreshed_at) FROM refreshes").fetchone()[0],
+        }
+
+
+# ============================================================
+# 📥 INGESTÃO
+# ============================================================
+
+async def _touch_seen(store: "NewsStore", seen: Iterable[Tuple[str, str]]) -> None:
+    """
+    Notícias puladas por já terem sido lidas continuam nas fontes: renova o
+    ``last_seen`` para o ``prune`` não removê-las. Os links de redirecionamento
+    são trocados pela URL gravada (a resolvida, se já estiver no cache).
+    """
+    seen = list(seen)
+    if not seen:
+        return
+    resolved = await url_resolver.known(url for _, url in seen)
+    await run_blocking(store.touch, [(company, resolved.get(url, url)) for company, url in seen])
+
+
+async def ingest(companies: List[str], store: Optional["NewsStore"] = None,
+                 sources: Optional[Iterable[str]] = None, incremental: bool = INCREMENTAL) -> int:
+    """
+    Coleta as fontes (todas ou só ``sources``) para ``companies`` e grava no
+    store; retorna quantas notícias eram novas.
+
+    Com ``incremental``, cada feed devolve só os itens que apareceram desde
+    a última coleta (os anteriores já estão no store).
+    """
+    store = store or news_store
+    if incremental:
+        with feed_cache.incremental() as read:
+            results = await fetch_real_news_async(companies, sources=sources, finalize=False)
+    else:
+        read = None
+        results = await fetch_real_news_async(companies, sources=sources, finalize=False)
+    inserted = await run_blocking(store.upsert_many, results, companies, sources)
+    if read is not None:
+        await _touch_seen(store, read.seen)
+        # Só agora (com tudo gravado) os feeds contam como lidos
+        read.commit()
+    await run_blocking(store.prune)
+    logger.info("🗃️ %d notícias novas gravadas (%d coletadas)", inserted, len(results),
+                extra={"companies": companies, "sources": list(sources) if sources else None})
+    return inserted
+
+
+# Instância compartilhada pelo processo
+news_store = NewsStore()
@@ -0,0 +1,236 @@
+"""
+🚦 Limite de requisições por host
+=================================
+Token bucket por host: cada host aceita ``rate`` requisições por segundo,
+com rajadas de até ``burst``. Quem passa do limite espera a sua vez em vez
+de disparar (e tomar 429 ou captcha). Usado pelo ``source_health.get_url``,
+então vale para todas as fontes.
+
+- Enquanto espera a vez, um job devolve a sua vaga de concorrência
+  (``bind_job``), então um host lento não segura as buscas dos outros.
+- Um job com prazo (``bind_job``) não espera uma vez que só chegaria depois
+  do prazo: ``source_health.get_url`` falha na hora em vez de gastá-lo.
+- ``Retry-After`` (em 429/503) pausa o host inteiro até o horário indicado.
+- 429 sem ``Retry-After`` reduz a taxa do host pela metade; cada resposta
+  bem-sucedida devolve um pouco da taxa configurada (AIMD).
+
+``NEWS_HOST_RATES`` ajusta hosts específicos no formato
+``"html.duckduckgo.com=1/3,news.google.com=10"`` (taxa por segundo e, depois
+da barra, a rajada). Hosts sem ajuste usam ``NEWS_HOST_RATE``/``NEWS_HOST_BURST``;
+taxa ``0`` desliga o limite.
+"""
+
+import asyncio
+import logging
+import os
+import time
+from contextvars import ContextVar
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Any, AsyncContextManager, Callable, Dict, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# 🔹 Parâmetros configuráveis via variáveis de ambiente
+DEFAULT_RATE = float(os.getenv("NEWS_HOST_RATE", "5"))
+DEFAULT_BURST = float(os.getenv("NEWS_HOST_BURST", "10"))
+# Maior pausa aceita de um Retry-After (protege contra valores absurdos)
+MAX_RETRY_AFTER = float(os.getenv("NEWS_MAX_RETRY_AFTER", "300"))
+
+# Hosts que bloqueiam rápido (captcha/429) recebem taxas menores
+HOST_RATES: Dict[str, Tuple[float, float]] = {
+    "news.google.com": (10, 20),
+    "html.duckduckgo.com": (3, 6),
+    "finance.yahoo.com": (5, 10),
+    "serpapi.com": (2, 5),
+    "api.bing.microsoft.com": (3, 5),
+}
+
+# Recuperação da taxa após um 429: fração da taxa configurada por resposta bem-sucedida
+RECOVERY_STEP = 0.05
+# A taxa nunca cai abaixo desta fração da configurada
+MIN_RATE_FACTOR = 0.05
+
+
+# Por tarefa (cada job do aggregator roda na sua): fim do prazo da coleta (time.monotonic)
+# e o que fazer durante a espera pela vez do host
+_deadline: ContextVar[Optional[float]] = ContextVar("rate_limit_deadline", default=None)
+_while_waiting: ContextVar[Optional[Callable[[], AsyncContextManager[None]]]] = ContextVar(
+    "rate_limit_while_waiting", default=None)
+
+
+def bind_job(deadline: Optional[float], while_waiting: Optional[Callable[[], AsyncContextManager[None]]] = None) -> None:
+    """
+    Associa à tarefa atual o prazo da coleta e um context manager aberto
+    durante cada espera pelo limite (ex.: devolve a vaga de concorrência).
+    """
+    _deadline.set(deadline)
+    _while_waiting.set(while_waiting)
+
+
+def remaining_budget() -> Optional[float]:
+    """Segundos até o prazo da tarefa atual (None sem prazo)"""
+    deadline = _deadline.get()
+    return deadline - time.monotonic() if deadline is not None else None
+
+
+def env_host_rates(name: str, defaults: Dict[str, Tuple[float, float]]) -> Dict[str, Tuple[float, float]]:
+    """Lê um mapa host → (taxa, rajada) no formato "host=2/5,outro=10" (sobrepõe ``defaults``)"""
+    values = dict(defaults)
+    for pair in os.getenv(name, "").split(","):
+        if "=" not in pair:
+            continue
+        host, spec = pair.split("=", 1)
+        rate, _, burst = spec.partition("/")
+        try:
+            values[host.strip().lower()] = (float(rate), float(burst) if burst else max(float(rate), 1.0))
+        except ValueError:
+            logger.warning("⚠️ Valor inválido em %s: %s", name, pair)
+    return values
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Segundos de um cabeçalho ``Retry-After`` (número ou data HTTP)"""
+    if not value:
+        return None
+    value = value.strip()
+    try:
+        seconds = float(value)
+    except ValueError:
+        try:
+            when = parsedate_to_datetime(value)
+        except (TypeError, ValueError):
+            return None
+        if when.tzinfo is None:
+            when = when.replace(tzinfo=timezone.utc)
+        seconds = (when - datetime.now(timezone.utc)).total_seconds()
+    return min(max(seconds, 0.0), MAX_RETRY_AFTER)
+
+
+@dataclass
+class HostBucket:
+    host: str
+    rate: float
+    burst: float
+    configured_rate: float
+    tokens: float
+    updated: float
+    paused_until: float = 0.0
+    requests: int = 0
+    waited: float = 0.0
+    throttled: int = 0
+
+    def _refill(self, now: float) -> None:
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def projected_wait(self) -> float:
+        """Quanto uma reserva feita agora esperaria (sem reservar)"""
+        now = time.monotonic()
+        tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate) - 1
+        wait = -tokens / self.rate if tokens < 0 else 0.0
+        return max(wait, self.paused_until - now)
+
+    def reserve(self) -> float:
+        """
+        Reserva uma vaga e retorna quanto esperar por ela. Os tokens podem
+        ficar negativos: cada espera já conta com as reservas anteriores, então
+        as requisições saem espaçadas na ordem de chegada.
+        """
+        now = time.monotonic()
+        self._refill(now)
+        self.tokens -= 1
+        self.requests += 1
+        wait = -self.tokens / self.rate if self.tokens < 0 else 0.0
+        return max(wait, self.paused_until - now)
+
+
+class HostRateLimiter:
+    """Token buckets por host, compartilhados pelo processo"""
+
+    def __init__(self, rates: Optional[Dict[str, Tuple[float, float]]] = None,
+                 default_rate: float = DEFAULT_RATE, default_burst: float = DEFAULT_BURST):
+        self.rates = rates if rates is not None else env_host_rates("NEWS_HOST_RATES", HOST_RATES)
+        self.default = (default_rate, default_burst)
+        self._buckets: Dict[str, HostBucket] = {}
+
+    def bucket(self, host: str) -> HostBucket:
+        bucket = self._buckets.get(host)
+        if bucket is None:
+            rate, burst = self.rates.get(host, self.default)
+            bucket = self._buckets[host] = HostBucket(host, rate, burst, rate, tokens=burst,
+                                                      updated=time.monotonic())
+        return bucket
+
+    def reset(self) -> None:
+        self._buckets.clear()
+
+    def paused_for(self, host: str) -> float:
+        """Segundos que faltam da pausa pedida pelo host (``Retry-After``)"""
+        bucket = self._buckets.get(host)
+        return max(0.0, bucket.paused_until - time.monotonic()) if bucket is not None else 0.0
+
+    def projected_wait(self, host: str) -> float:
+        """Quanto ``acquire(host)`` esperaria agora"""
+        bucket = self.bucket(host)
+        return bucket.projected_wait() if bucket.rate > 0 else 0.0
+
+    async def acquire(self, host: str) -> float:
+        """
+        Espera a vez de ``host``; retorna quanto tempo esperou. Durante a
+        espera fica aberto o context manager de ``bind_job``, se houver.
+        """
+        bucket = self.bucket(host)
+        if bucket.rate <= 0:
+            return 0.0  # sem limite
+        wait = bucket.reserve()
+        if wait > 0:
+            bucket.waited += wait
+            while_waiting = _while_waiting.get()
+            try:
+                if while_waiting is None:
+                    await asyncio.sleep(wait)
+                else:
+                    async with while_waiting():
+                        await asyncio.sleep(wait)
+            except asyncio.CancelledError:
+                bucket.tokens += 1  # devolve a vaga reservada
+                raise
+        return wait
+
+    def throttled(self, host: str, retry_after: Optional[float]) -> None:
+        """O host pediu para desacelerar (429, ou 503 com ``Retry-After``)"""
+        bucket = self.bucket(host)
+        bucket.throttled += 1
+        if retry_after is not None:
+            bucket.paused_until = max(bucket.paused_until, time.monotonic() + retry_after)
+        else:
+            bucket.rate = max(bucket.rate / 2, bucket.configured_rate * MIN_RATE_FACTOR)
+        logger.warning("🚦 %s pediu para desacelerar: %s", host,
+                       f"pausa de {retry_after:.0f}s" if retry_after is not None else f"taxa reduzida para {bucket.rate:.2f}/s",
+                       extra={"host": host, "retry_after": retry_after, "rate": bucket.rate})
+
+    def succeeded(self, host: str) -> None:
+        bucket = self._buckets.get(host)
+        if bucket is not None and bucket.rate < bucket.configured_rate:
+            bucket.rate = min(bucket.configured_rate, bucket.rate + bucket.configured_rate * RECOVERY_STEP)
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        now = time.monotonic()
+        return {
+            host: {
+                "rate": round(bucket.rate, 3),
+                "configured_rate": bucket.configured_rate,
+                "burst": bucket.burst,
+                "requests": bucket.requests,
+                "throttled": bucket.throttled,
+                "waited": round(bucket.waited, 2),
+                "paused_for": round(max(0.0, bucket.paused_until - now), 1),
+            }
+            for host, bucket in sorted(self._buckets.items())
+        }
+
+
+# Instância compartilhada pelo processo
+rate_limiter = HostRateLimiter()
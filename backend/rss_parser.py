@@ -0,0 +1,216 @@
+"""
+📡 Extrator de itens RSS
+========================
+Parser em streaming (``lxml.etree.iterparse``) que percorre os ``<item>`` de
+um feed uma única vez, sem montar a árvore inteira, e para assim que atinge
+o limite de itens pedido. A descrição HTML de cada item também é parseada
+uma única vez, devolvendo texto, link do publisher e nome da fonte juntos.
+
+Na leitura incremental (``reading(mark)``) o ``HighWaterMark`` do feed
+guarda os itens já vistos (guid/link) e a data mais recente: num feed em
+ordem cronológica a leitura para no primeiro item já visto, devolvendo só
+o que é novo.
+"""
+
+from collections import OrderedDict
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from datetime import datetime
+from io import BytesIO
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from bs4 import BeautifulSoup
+from lxml import etree
+from lxml import html as lxml_html
+
+from dates import parse_published
+
+# Campos de data em ordem de preferência (RSS, Dublin Core, Atom)
+_DATE_TAGS = ("pubDate", "date", "updated")
+_TEXT_TAGS = ("title", "link", "description", "guid")
+
+
+# Itens lembrados por feed (os mais recentes)
+MAX_SEEN_ITEMS = 500
+
+
+@dataclass
+class HighWaterMark:
+    """Até onde um feed já foi lido: itens vistos (guid/link), data mais recente e se o feed é cronológico"""
+    seen: "OrderedDict[str, None]" = field(default_factory=OrderedDict)
+    latest: Optional[datetime] = None
+    ordered: bool = False       # a última leitura completa achou o feed do mais novo para o mais antigo
+    complete: bool = False      # a última leitura foi até o fim, sem parar num item já visto
+    stopped: bool = False       # a leitura atual parou num item já visto
+    _observed: List[Tuple[str, Optional[datetime]]] = field(default_factory=list)
+
+    @property
+    def can_stop(self) -> bool:
+        """
+        Só para no primeiro item já visto se a leitura anterior foi completa e
+        confirmou a ordem cronológica; depois de uma leitura interrompida, a
+        próxima vai até o fim e confere a ordem de novo.
+        """
+        return self.ordered and self.complete
+
+    def copy(self) -> "HighWaterMark":
+        return HighWaterMark(OrderedDict(self.seen), self.latest, self.ordered, self.complete)
+
+    def reached(self, key: str, published: Optional[datetime]) -> bool:
+        """O item já foi lido antes (ou é mais antigo que tudo que já foi lido)?"""
+        if key in self.seen:
+            return True
+        return published is not None and self.latest is not None and published < self.latest
+
+    def observe(self, key: str, published: Optional[datetime]) -> None:
+        self._observed.append((key, published))
+
+    def commit(self) -> None:
+        """Incorpora os itens da leitura que terminou"""
+        dates = [published for _, published in self._observed if published is not None]
+        if not self.stopped:
+            # A ordem só é conferida com o feed inteiro (ou a janela inteira) lido
+            self.ordered = len(dates) >= 2 and all(a >= b for a, b in zip(dates, dates[1:]))
+        self.complete = not self.stopped
+        if dates:
+            self.latest = max(dates + ([self.latest] if self.latest is not None else []))
+        for key, _ in self._observed:
+            self.seen[key] = None
+            self.seen.move_to_end(key)
+        while len(self.seen) > MAX_SEEN_ITEMS:
+            self.seen.popitem(last=False)
+        self._observed.clear()
+
+
+_high_water: ContextVar[Optional[HighWaterMark]] = ContextVar("rss_high_water", default=None)
+
+
+@contextmanager
+def reading(mark: HighWaterMark) -> Iterator[HighWaterMark]:
+    """
+    ``iter_rss_items`` dentro do bloco lê o feed a partir de ``mark`` e o
+    atualiza no fim; se o bloco falhar, ``mark`` fica como estava.
+    """
+    mark.stopped = False
+    mark._observed.clear()
+    token = _high_water.set(mark)
+    try:
+        yield mark
+    except BaseException:
+        mark._observed.clear()
+        mark.stopped = False
+        raise
+    finally:
+        _high_water.reset(token)
+    mark.commit()
+
+
+def _localname(tag) -> str:
+    """Nome da tag sem namespace ("{ns}date" → "date")"""
+    if not isinstance(tag, str):
+        return ""  # comentários / processing instructions
+    return tag.rsplit("}", 1)[-1]
+
+
+def iter_rss_items(content: bytes, limit: Optional[int] = None) -> Iterator[Dict[str, str]]:
+    """
+    Percorre os ``<item>`` do feed e devolve dicts com ``title``, ``link``,
+    ``description``, ``guid`` e ``pub_date`` (texto bruto, sem espaços nas pontas).
+
+    Feeds malformados são lidos em modo de recuperação; o que der para ler é
+    devolvido. Dentro de ``reading(mark)``, um feed cronológico para no
+    primeiro item já visto.
+    """
+    if limit is not None and limit <= 0:
+        return
+
+    mark = _high_water.get()
+    stop_at_seen = mark is not None and mark.can_stop
+
+    count = 0
+    context = etree.iterparse(
+        BytesIO(content), events=("end",), tag=("item", "{*}item"),
+        recover=True, resolve_entities=False, no_network=True,
+    )
+    try:
+        for _, elem in context:
+            fields: Dict[str, str] = {}
+            for child in elem:
+                name = _localname(child.tag)
+                if (name in _TEXT_TAGS or name in _DATE_TAGS) and name not in fields:
+                    fields[name] = "".join(child.itertext()).strip()
+
+            item = {
+                "title": fields.get("title", ""),
+                "link": fields.get("link", ""),
+                "description": fields.get("description", ""),
+                "guid": fields.get("guid", ""),
+                "pub_date": next((fields[t] for t in _DATE_TAGS if fields.get(t)), ""),
+            }
+            if mark is not None:
+                key = item["guid"] or item["link"] or item["title"]
+                published = parse_published(item["pub_date"])
+                if stop_at_seen and mark.reached(key, published):
+                    mark.stopped = True
+                    return
+                mark.observe(key, published)
+
+            yield item
+
+            # Libera a memória dos itens já processados
+            elem.clear()
+            while elem.getprevious() is not None:
+                del elem.getparent()[0]
+
+            count += 1
+            if limit is not None and count >= limit:
+                return
+    except etree.XMLSyntaxError:
+        return
+
+
+def parse_description_html(raw: str) -> Tuple[str, str, str]:
+    """
+    Parseia a descrição HTML de um item uma única vez.
+
+    Retorna ``(texto_limpo, primeiro_link, texto_do_<font>)``; o texto segue a
+    mesma regra do ``get_text(" ", strip=True)`` do BeautifulSoup.
+    """
+    if not raw:
+        return "", "", ""
+    if "<" not in raw and "&" not in raw:
+        return raw.strip(), "", ""
+
+    try:
+        root = lxml_html.fragment_fromstring(raw, create_parent="div")
+    except (etree.ParserError, ValueError):
+        return _parse_description_soup(raw)
+
+    text = " ".join(s.strip() for s in root.itertext() if s.strip())
+
+    link = ""
+    for a in root.iter("a"):
+        href = a.get("href")
+        if href is not None:
+            link = href.strip()
+            break
+
+    publisher = ""
+    for font in root.iter("font"):
+        publisher = "".join(s.strip() for s in font.itertext())
+        break
+
+    return text, link, publisher
+
+
+def _parse_description_soup(raw: str) -> Tuple[str, str, str]:
+    """Caminho de reserva (BeautifulSoup) para HTML que o lxml recusa"""
+    soup = BeautifulSoup(raw, "html.parser")
+    a_tag = soup.find("a", href=True)
+    font_tag = soup.find("font")
+    return (
+        soup.get_text(" ", strip=True),
+        a_tag["href"].strip() if a_tag else "",
+        font_tag.get_text(strip=True) if font_tag else "",
+    )
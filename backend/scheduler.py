@@ -0,0 +1,178 @@
+"""
+⏰ Coleta periódica em segundo plano
+===================================
+Mantém o armazenamento local aquecido para uma lista de empresas
+monitoradas (watchlist), recoletando cada fonte no seu próprio intervalo:
+o Google News a cada poucos minutos, sites oficiais com bem menos frequência.
+
+- Cada fonte tem um único loop, então duas coletas da mesma fonte nunca se
+  sobrepõem; se uma coleta atrasar, a próxima só é agendada depois dela.
+- Os intervalos recebem jitter para que as fontes não disparem juntas.
+- Um orçamento de requisições por minuto (token bucket) segura as coletas
+  quando a watchlist é grande demais para os intervalos configurados.
+"""
+
+import asyncio
+import logging
+import os
+import random
+import time
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+
+from aggregator import env_seconds_map
+from data_source import source_registry
+from news_store import ingest
+
+logger = logging.getLogger(__name__)
+
+# 🔹 Intervalo padrão (segundos) entre coletas de cada fonte (declarado no registro de fontes)
+DEFAULT_INTERVALS: Dict[str, float] = {source.name: source.interval for source in source_registry}
+
+# Desligada por padrão: só roda com NEWS_SCHEDULER=1 e uma NEWS_WATCHLIST
+ENABLED = os.getenv("NEWS_SCHEDULER", "0") in ("1", "true", "yes")
+WATCHLIST = [c.strip() for c in os.getenv("NEWS_WATCHLIST", "").split(",") if c.strip()]
+JITTER = float(os.getenv("NEWS_SCHEDULER_JITTER", "0.1"))  # ±10% do intervalo
+# Requisições às fontes por minuto que as coletas em segundo plano podem gastar
+BUDGET_PER_MINUTE = float(os.getenv("NEWS_SCHEDULER_BUDGET", "120"))
+MAX_PARALLEL_RUNS = int(os.getenv("NEWS_SCHEDULER_PARALLEL", "2"))
+
+
+class RequestBudget:
+    """Token bucket: ``per_minute`` requisições por minuto, com rajada de até um minuto"""
+
+    def __init__(self, per_minute: float):
+        self.capacity = max(per_minute, 1.0)
+        self.rate = self.capacity / 60.0
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    async def acquire(self, cost: float) -> float:
+        """Espera até haver ``cost`` tokens; retorna quanto tempo esperou"""
+        cost = min(cost, self.capacity)  # uma coleta maior que o balde espera o balde encher
+        waited = 0.0
+        async with self._lock:
+            self._refill()
+            while self.tokens < cost:
+                delay = (cost - self.tokens) / self.rate
+                await asyncio.sleep(delay)
+                waited += delay
+                self._refill()
+            self.tokens -= cost
+        return waited
+
+
+@dataclass
+class SourceJob:
+    source: str
+    interval: float
+    runs: int = 0
+    errors: int = 0
+    last_started: Optional[float] = None
+    last_duration: Optional[float] = None
+    last_new_items: Optional[int] = None
+    last_error: Optional[str] = None
+    budget_wait: float = 0.0
+    next_run: Optional[float] = None
+
+
+class Scheduler:
+    """Recoleta a watchlist fonte a fonte, cada uma no seu intervalo"""
+
+    def __init__(self, companies: List[str] = WATCHLIST, intervals: Optional[Dict[str, float]] = None,
+                 jitter: float = JITTER, budget_per_minute: float = BUDGET_PER_MINUTE,
+                 max_parallel: int = MAX_PARALLEL_RUNS):
+        self.companies = list(companies)
+        intervals = intervals if intervals is not None else env_seconds_map("NEWS_REFRESH_INTERVALS", DEFAULT_INTERVALS)
+        unknown = sorted(set(intervals) - set(DEFAULT_INTERVALS))
+        if unknown:
+            logger.warning("⚠️ Fontes desconhecidas em NEWS_REFRESH_INTERVALS ignoradas: %s", ", ".join(unknown))
+        self.jobs: Dict[str, SourceJob] = {
+            source: SourceJob(source, interval) for source, interval in intervals.items()
+            if interval > 0 and source in DEFAULT_INTERVALS
+        }
+        self.jitter = jitter
+        self.budget = RequestBudget(budget_per_minute)
+        self._parallel = asyncio.Semaphore(max_parallel)
+        self._tasks: List[asyncio.Task] = []
+
+    @property
+    def running(self) -> bool:
+        return bool(self._tasks)
+
+    def _jittered(self, seconds: float) -> float:
+        return seconds * random.uniform(1 - self.jitter, 1 + self.jitter)
+
+    def start(self) -> None:
+        if self._tasks or not self.companies:
+            return
+        logger.info("⏰ Coleta periódica ativa para: %s", ", ".join(self.companies))
+        for job in self.jobs.values():
+            self._tasks.append(asyncio.create_task(self._loop(job), name=f"refresh-{job.source}"))
+
+    async def stop(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    async def _loop(self, job: SourceJob) -> None:
+        # Primeira coleta logo após a subida, escalonada para as fontes não dispararem juntas
+        delay = random.uniform(0, min(job.interval, 10))
+        while True:
+            job.next_run = time.time() + delay
+            await asyncio.sleep(delay)
+            await self.run_once(job)
+            delay = self._jittered(job.interval)
+
+    async def run_once(self, job: SourceJob) -> None:
+        """
+        Uma coleta da fonte para toda a watchlist (erros não derrubam o loop).
+        Só essa fonte é marcada como atualizada no store.
+        """
+        cost = len(source_registry.jobs(self.companies, [job.source]))
+        if not cost:
+            return  # fonte desativada (ex.: sem chave de API)
+
+        job.budget_wait += await self.budget.acquire(cost)
+        async with self._parallel:
+            job.last_started = time.time()
+            start = time.perf_counter()
+            try:
+                job.last_new_items = await ingest(self.companies, sources=[job.source])
+                job.last_error = None
+            except Exception as e:
+                job.errors += 1
+                job.last_error = str(e)
+                logger.warning("⚠️ Erro na coleta periódica de %s: %s", job.source, e, extra={"source": job.source})
+            finally:
+                job.runs += 1
+                job.last_duration = time.perf_counter() - start
+
+    def snapshot(self) -> Dict[str, object]:
+        return {
+            "running": self.running,
+            "watchlist": self.companies,
+            "budget_per_minute": self.budget.capacity,
+            "budget_tokens": round(self.budget.tokens, 1),
+            "jobs": {
+                source: {
+                    "interval": job.interval,
+                    "runs": job.runs,
+                    "errors": job.errors,
+                    "last_started": job.last_started,
+                    "last_duration": round(job.last_duration, 3) if job.last_duration is not None else None,
+                    "last_new_items": job.last_new_items,
+                    "last_error": job.last_error,
+                    "budget_wait": round(job.budget_wait, 1),
+                    "next_run": job.next_run,
+                }
+                for source, job in self.jobs.items()
+            },
+        }
@@ -1,9 +1,18 @@
-from pydantic import BaseModel, HttpUrl
-from typing import Literal
+from datetime import datetime
+from pydantic import BaseModel, HttpUrl, field_serializer
+from typing import List, Literal
 from typing import Optional
 
+from dates import format_published
+
 EventType = Literal["Aquisição", "Certificação", "Lançamento de Produto", "Outro"]
 
+class AlternateSource(BaseModel):
+    """Outra fonte que publicou a mesma notícia"""
+    fonte: str
+    fonte_type: str
+    url: str
+
 class NewsItem(BaseModel):
     company: str
     title: str
@@ -11,4 +20,15 @@ class NewsItem(BaseModel):
     url: str
     fonte: str  # Nome da fonte legível
     fonte_type: str 
-    published_at: Optional[str] = None
\ No newline at end of file
+    published_at: Optional[str] = None  # "dd/mm/aaaa HH:MM", gerado a partir do published_ts
+    published_ts: Optional[datetime] = None  # data da publicação com fuso (usada na ordenação)
+    alternates: List[AlternateSource] = []
+    evento: Optional[EventType] = None
+    resumo: Optional[str] = None
+
+    @field_serializer("published_at")
+    def _display_published_at(self, value: Optional[str]) -> Optional[str]:
+        # Formata só na saída; sem timestamp, mantém o texto original da fonte
+        if self.published_ts is not None:
+            return format_published(self.published_ts)
+        return value
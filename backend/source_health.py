@@ -0,0 +1,251 @@
+"""
+🩺 Saúde das fontes
+===================
+Acompanha cada fonte (por host) para que uma fonte fora do ar não atrase
+todas as buscas:
+
+- Circuit breaker: depois de ``FAILURE_THRESHOLD`` falhas seguidas o
+  circuito abre e as chamadas falham na hora (``CircuitOpen``). Passado o
+  ``COOLDOWN`` uma única chamada de teste (meio-aberto) decide se ele fecha
+  de novo ou volta a abrir, com espera dobrada.
+- Timeout adaptativo: derivado do p95 das latências observadas, limitado
+  pelo timeout pedido pela fonte.
+- Retentativas com backoff e jitter apenas para GETs que falharam antes de
+  qualquer resposta útil (erro de conexão ou 502/503/504), ou 429 com um
+  ``Retry-After`` curto.
+- Limite de requisições por host (``rate_limit``): cada GET espera a vez do
+  host, e 429/``Retry-After`` desaceleram o host para todas as fontes.
+"""
+
+import asyncio
+import logging
+import os
+import random
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Any, Deque, Dict, Optional, Tuple
+
+import httpx
+
+from metrics import FETCH_BYTES, FETCH_REQUESTS, FETCH_SECONDS, RATE_LIMIT_WAIT
+from rate_limit import HostRateLimiter, parse_retry_after, rate_limiter, remaining_budget
+
+logger = logging.getLogger(__name__)
+
+# 🔹 Parâmetros configuráveis via variáveis de ambiente
+FAILURE_THRESHOLD = int(os.getenv("NEWS_BREAKER_FAILURES", "5"))
+COOLDOWN_SECONDS = float(os.getenv("NEWS_BREAKER_COOLDOWN", "30"))
+MAX_COOLDOWN_SECONDS = float(os.getenv("NEWS_BREAKER_MAX_COOLDOWN", "600"))
+RETRIES = int(os.getenv("NEWS_RETRIES", "1"))
+RETRY_BACKOFF = float(os.getenv("NEWS_RETRY_BACKOFF", "0.3"))
+TIMEOUT_MULTIPLIER = float(os.getenv("NEWS_TIMEOUT_MULTIPLIER", "3"))
+MIN_TIMEOUT = float(os.getenv("NEWS_MIN_TIMEOUT", "2"))
+# 429 com Retry-After até este valor (s) é repetido; acima disso a fonte fica sem resultado
+RETRY_AFTER_MAX_WAIT = float(os.getenv("NEWS_RETRY_AFTER_MAX_WAIT", "5"))
+
+# Latências guardadas por fonte e mínimo de amostras para confiar no p95
+LATENCY_WINDOW = 50
+MIN_SAMPLES = 5
+
+CLOSED, OPEN, HALF_OPEN = "closed", "open", "half_open"
+
+# Respostas que indicam problema na fonte (contam como falha)
+_FAILURE_STATUS = frozenset({429, 500, 502, 503, 504})
+# Respostas em que repetir o GET é seguro e costuma resolver
+_RETRY_STATUS = frozenset({502, 503, 504})
+# Erros antes de qualquer resposta: a requisição não chegou a ser processada
+_RETRY_ERRORS = (httpx.ConnectError, httpx.ConnectTimeout, httpx.RemoteProtocolError)
+
+
+class CircuitOpen(Exception):
+    """Fonte com circuito aberto: a chamada nem é feita"""
+
+
+@dataclass
+class SourceHealth:
+    source: str
+    host: str
+    state: str = CLOSED
+    consecutive_failures: int = 0
+    opened_at: Optional[float] = None
+    cooldown: float = COOLDOWN_SECONDS
+    probing: bool = False
+    successes: int = 0
+    failures: int = 0
+    rejected: int = 0
+    retries: int = 0
+    last_error: Optional[str] = None
+    latencies: Deque[float] = field(default_factory=lambda: deque(maxlen=LATENCY_WINDOW))
+
+    def percentile(self, q: float) -> Optional[float]:
+        if not self.latencies:
+            return None
+        ordered = sorted(self.latencies)
+        return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+    def timeout(self, ceiling: float) -> float:
+        """p95 x ``TIMEOUT_MULTIPLIER``, entre ``MIN_TIMEOUT`` e o timeout pedido"""
+        if len(self.latencies) < MIN_SAMPLES:
+            return ceiling
+        return max(MIN_TIMEOUT, min(ceiling, self.percentile(0.95) * TIMEOUT_MULTIPLIER))
+
+
+class SourceHealthRegistry:
+    """Estado de saúde de cada (fonte, host), compartilhado pelo processo"""
+
+    def __init__(self, failure_threshold: int = FAILURE_THRESHOLD, cooldown: float = COOLDOWN_SECONDS,
+                 retries: int = RETRIES, limiter: HostRateLimiter = rate_limiter):
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+        self.retries = retries
+        self.limiter = limiter
+        self._health: Dict[Tuple[str, str], SourceHealth] = {}
+
+    def get(self, source: str, host: str) -> SourceHealth:
+        health = self._health.get((source, host))
+        if health is None:
+            health = self._health[(source, host)] = SourceHealth(source, host, cooldown=self.cooldown)
+        return health
+
+    def reset(self) -> None:
+        self._health.clear()
+        self.limiter.reset()
+
+    # ------------------------------------------------------------
+    # Transições do circuito
+    # ------------------------------------------------------------
+
+    def _admit(self, health: SourceHealth) -> bool:
+        """Libera a chamada; retorna True se ela é a chamada de teste (meio-aberto)"""
+        if health.state == CLOSED:
+            return False
+        if health.state == OPEN and time.monotonic() - health.opened_at >= health.cooldown:
+            health.state = HALF_OPEN
+        if health.state == HALF_OPEN and not health.probing:
+            health.probing = True
+            return True
+        health.rejected += 1
+        wait = max(0.0, health.cooldown - (time.monotonic() - health.opened_at))
+        raise CircuitOpen(f"circuito aberto para {health.source} ({health.host}), nova tentativa em {wait:.0f}s")
+
+    def _success(self, health: SourceHealth, latency: float) -> None:
+        health.successes += 1
+        health.latencies.append(latency)
+        health.consecutive_failures = 0
+        if health.state != CLOSED:
+            logger.info("🔌 Circuito fechado para %s (%s)", health.source, health.host,
+                        extra={"source": health.source, "host": health.host})
+        health.state = CLOSED
+        health.cooldown = self.cooldown
+        health.opened_at = None
+
+    def _failure(self, health: SourceHealth, error: str, probe: bool) -> None:
+        health.failures += 1
+        health.consecutive_failures += 1
+        health.last_error = error
+        if probe:
+            # Teste falhou: volta a abrir, esperando o dobro
+            health.cooldown = min(health.cooldown * 2, MAX_COOLDOWN_SECONDS)
+        elif health.state != CLOSED or health.consecutive_failures < self.failure_threshold:
+            return
+        health.state = OPEN
+        health.opened_at = time.monotonic()
+        logger.warning("🔌 Circuito aberto para %s (%s) após %d falhas: %s (pausa de %.0fs)",
+                       health.source, health.host, health.consecutive_failures, error, health.cooldown,
+                       extra={"source": health.source, "host": health.host})
+
+    # ------------------------------------------------------------
+    # Requisição protegida
+    # ------------------------------------------------------------
+
+    async def get_url(self, client: httpx.AsyncClient, source: str, url: str, *,
+                      timeout: float = 10, **kwargs: Any) -> httpx.Response:
+        """
+        ``client.get`` protegido pelo circuito da fonte, no ritmo permitido
+        para o host, com timeout adaptativo e retentativas. Levanta
+        ``CircuitOpen`` sem fazer a chamada quando o circuito está aberto;
+        respostas de erro são devolvidas ao chamador.
+        """
+        host = httpx.URL(url).host
+        health = self.get(source, host)
+        attempt = 0
+        while True:
+            paused = self.limiter.paused_for(host)
+            if paused > RETRY_AFTER_MAX_WAIT:
+                # Pausa longa pedida pelo host: falha na hora (o cache serve a última versão)
+                FETCH_REQUESTS.inc(source=source, result="rate_limited")
+                raise CircuitOpen(f"{host} pediu pausa (Retry-After), nova tentativa em {paused:.0f}s")
+            remaining = remaining_budget()
+            if remaining is not None and self.limiter.projected_wait(host) + (health.percentile(0.95) or 0) >= remaining:
+                # A resposta só chegaria depois do prazo da coleta: falha já, sem gastá-lo esperando
+                FETCH_REQUESTS.inc(source=source, result="rate_limited")
+                raise CircuitOpen(f"a vez de {host} só chegaria depois do prazo da coleta")
+            try:
+                probe = self._admit(health)
+            except CircuitOpen:
+                FETCH_REQUESTS.inc(source=source, result="circuit_open")
+                raise
+            try:
+                waited = await self.limiter.acquire(host)
+                if waited:
+                    RATE_LIMIT_WAIT.observe(waited, source=source)
+                start = time.monotonic()
+                r = await client.get(url, timeout=health.timeout(timeout), **kwargs)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                FETCH_REQUESTS.inc(source=source, result=type(e).__name__)
+                self._failure(health, f"{type(e).__name__}: {e}", probe)
+                if probe or attempt >= self.retries or not isinstance(e, _RETRY_ERRORS):
+                    raise
+            else:
+                latency = time.monotonic() - start
+                FETCH_SECONDS.observe(latency, source=source)
+                FETCH_REQUESTS.inc(source=source, result=str(r.status_code))
+                FETCH_BYTES.inc(len(r.content), source=source)
+                if r.status_code not in _FAILURE_STATUS:
+                    self._success(health, latency)
+                    self.limiter.succeeded(host)
+                    return r
+                self._failure(health, f"HTTP {r.status_code}", probe)
+                retry_after = parse_retry_after(r.headers.get("retry-after"))
+                if r.status_code == 429 or retry_after is not None:
+                    # O host pediu para desacelerar: vale para todas as fontes que usam o host
+                    self.limiter.throttled(host, retry_after)
+                retryable = r.status_code in _RETRY_STATUS or (
+                    r.status_code == 429 and retry_after is not None and retry_after <= RETRY_AFTER_MAX_WAIT
+                )
+                if probe or attempt >= self.retries or not retryable:
+                    return r
+            finally:
+                if probe:
+                    health.probing = False
+
+            # Backoff exponencial com jitter total (evita rajadas sincronizadas)
+            attempt += 1
+            health.retries += 1
+            await asyncio.sleep(random.uniform(0, RETRY_BACKOFF * 2 ** attempt))
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        sources: Dict[str, Dict[str, Any]] = {}
+        for (source, host), health in sorted(self._health.items()):
+            p50, p95 = health.percentile(0.5), health.percentile(0.95)
+            sources.setdefault(source, {})[host] = {
+                "state": health.state,
+                "consecutive_failures": health.consecutive_failures,
+                "cooldown": health.cooldown,
+                "successes": health.successes,
+                "failures": health.failures,
+                "rejected": health.rejected,
+                "retries": health.retries,
+                "last_error": health.last_error,
+                "latency_p50": round(p50, 3) if p50 is not None else None,
+                "latency_p95": round(p95, 3) if p95 is not None else None,
+                "timeout": round(health.timeout(10), 2),
+            }
+        return sources
+
+
+# Instância compartilhada pelo processo
+source_health = SourceHealthRegistry()
@@ -0,0 +1,290 @@
+"""
+🔌 Registro de fontes
+=====================
+Cada fonte de notícias é declarada uma única vez (``Source``): de onde vem o
+conteúdo, se é uma busca por empresa ou um feed global, qual parser usar,
+quantas buscas simultâneas aceita, de quanto em quanto tempo a coleta
+periódica passa por ela e o seu custo. O ``SourceRegistry`` transforma as
+fontes pedidas em ``FetchJob``s que o ``aggregator`` executa sem saber nada
+de cada fonte em particular.
+
+- Busca por empresa: ``url`` com ``{query}`` (``query`` com ``{company}``),
+  ou ``params`` com ``{company}``; um job por empresa.
+- Feed global: ``feeds`` com as URLs fixas; um job por feed, compartilhado
+  por todas as empresas (o parser devolve ``{empresa: notícias}``).
+- Busca em lote: com ``batch`` e ``batch_parse``, várias empresas vão numa
+  única consulta ``("A" OR "B") ...`` (até ``batch`` empresas, sem passar
+  de ``NEWS_BATCH_MAX_URL`` caracteres na URL); o parser atribui cada item
+  às empresas que ele menciona, com a mesma cota por empresa da busca
+  individual. Itens sem menção reconhecível a nenhuma empresa do lote são
+  descartados.
+- ``fetch`` substitui a busca genérica quando a fonte precisa de lógica
+  própria (ex.: site oficial, que tenta o RSS e depois a página).
+
+``NEWS_DISABLED_SOURCES`` (ex.: ``duckduckgo,linkedin``) desliga fontes sem
+mexer no código.
+"""
+
+import logging
+import os
+import urllib.parse
+from dataclasses import dataclass, field
+from functools import partial
+from typing import Any, Awaitable, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+import httpx
+
+from aggregator import FetchJob, NewsList
+from feed_cache import feed_cache
+from metrics import JOB_ERRORS
+
+logger = logging.getLogger(__name__)
+
+# Rótulo de empresa para feeds globais (uma busca serve todas as empresas)
+FEED_COMPANY = "*"
+
+# Classes de custo: o que cada busca gasta
+FEED = "feed"        # feed RSS global: uma requisição serve todas as empresas
+SEARCH = "search"    # busca gratuita, uma requisição por empresa
+SCRAPE = "scrape"    # scraping de HTML, mais sujeito a bloqueio
+PAID = "paid"        # API com chave e cota
+
+# Tamanho máximo da URL de uma busca em lote
+BATCH_MAX_URL = int(os.getenv("NEWS_BATCH_MAX_URL", "2000"))
+
+DISABLED_SOURCES = frozenset(
+    name.strip() for name in os.getenv("NEWS_DISABLED_SOURCES", "").split(",") if name.strip()
+)
+
+
+def _always() -> bool:
+    return True
+
+
+@dataclass
+class Source:
+    """Declaração de uma fonte de notícias"""
+    name: str
+    parse: Callable[..., Any]
+    url: str = ""
+    query: str = "{company}"
+    feeds: Tuple[str, ...] = ()
+    parse_args: Tuple[Any, ...] = ()
+    params: Dict[str, Any] = field(default_factory=dict)
+    headers: Dict[str, str] = field(default_factory=dict)
+    timeout: float = 10
+    concurrency: Optional[int] = None    # buscas simultâneas (padrão do aggregator se None)
+    interval: float = 300                # segundos entre coletas periódicas
+    cost: str = SEARCH
+    enabled: Callable[[], bool] = _always  # ex.: só com a chave de API configurada
+    fetch: Optional[Callable[[httpx.AsyncClient, str], Awaitable[NewsList]]] = None
+    batch: int = 0                       # empresas por consulta OR (0/1: uma busca por empresa)
+    batch_parse: Optional[Callable[..., Any]] = None  # como ``parse``, mas com a lista de empresas
+
+    @property
+    def per_company(self) -> bool:
+        return not self.feeds
+
+    @property
+    def batched(self) -> bool:
+        return self.batch > 1 and self.batch_parse is not None and self.fetch is None
+
+    def request(self, company: str) -> Tuple[str, Dict[str, Any]]:
+        """URL e argumentos do GET de uma busca por empresa"""
+        url = self.url.replace("{query}", urllib.parse.quote(self.query.replace("{company}", company)))
+        kwargs: Dict[str, Any] = {"timeout": self.timeout, "follow_redirects": True}
+        if self.params:
+            kwargs["params"] = {
+                key: value.replace("{company}", company) if isinstance(value, str) else value
+                for key, value in self.params.items()
+            }
+        if self.headers:
+            kwargs["headers"] = self.headers
+        return url, kwargs
+
+    def batch_request(self, companies: List[str]) -> Tuple[str, Dict[str, Any]]:
+        """URL e argumentos do GET de uma busca em lote (``("A" OR "B") ...``)"""
+        if len(companies) == 1:
+            return self.request(companies[0])
+        terms = " OR ".join(f'"{company}"' for company in companies)
+        return self.request(f"({terms})")
+
+    def batches(self, companies: List[str], max_url: int = BATCH_MAX_URL) -> List[List[str]]:
+        """Agrupa as empresas em lotes de até ``batch``, sem passar de ``max_url`` na URL"""
+        groups: List[List[str]] = []
+        for company in companies:
+            group = groups[-1] if groups else None
+            if (group is not None and len(group) < self.batch
+                    and len(self.batch_request(group + [company])[0]) <= max_url):
+                group.append(company)
+            else:
+                groups.append([company])
+        return groups
+
+
+# ==============================================================
+# 📋 Log das buscas
+# ==============================================================
+
+def _found(source: str, company: str, count: int, **fields) -> None:
+    """Log (DEBUG) do total encontrado por uma busca"""
+    logger.debug("%s: %d resultados para %s", source, count, company,
+                 extra={"source": source, "company": company, "items": count, **fields})
+
+
+def _fetch_failed(source: str, company: str, error: Exception, **fields) -> None:
+    """Registra a falha de uma busca (log + métrica); a busca segue sem resultados"""
+    JOB_ERRORS.inc(source=source)
+    logger.warning("⚠️ Erro ao buscar %s para %s: %s", source, company, error,
+                   extra={"source": source, "company": company, "error": type(error).__name__, **fields})
+
+
+# ==============================================================
+# 🔄 Busca genérica
+# ==============================================================
+
+async def _fetch_company(source: Source, client: httpx.AsyncClient, company: str) -> NewsList:
+    """Uma busca por empresa: baixa (ou reaproveita do cache) e parseia"""
+    url, kwargs = source.request(company)
+    try:
+        results = await feed_cache.fetch_parsed(
+            client, source.name, url, source.parse, company, *source.parse_args, **kwargs,
+        )
+    except Exception as e:
+        _fetch_failed(source.name, company, e)
+        return []
+    _found(source.name, company, len(results))
+    return results
+
+
+async def _fetch_batch(source: Source, client: httpx.AsyncClient, companies: List[str]) -> NewsList:
+    """Uma busca em lote: uma requisição para várias empresas, itens atribuídos pelo parser"""
+    url, kwargs = source.batch_request(companies)
+    try:
+        matches = await feed_cache.fetch_parsed(
+            client, source.name, url, source.batch_parse, companies, *source.parse_args, **kwargs,
+        )
+    except Exception as e:
+        _fetch_failed(source.name, ", ".join(companies), e, batch=len(companies))
+        return []
+
+    results: NewsList = []
+    for company, found in matches.items():
+        _found(source.name, company, len(found), batch=len(companies))
+        results.extend(found)
+    return results
+
+
+async def _fetch_feed(source: Source, feed_url: str, client: httpx.AsyncClient, companies: List[str]) -> NewsList:
+    """Um feed global: baixado uma única vez e filtrado para todas as empresas"""
+    try:
+        matches = await feed_cache.fetch_parsed(
+            client, source.name, feed_url, source.parse, companies, *source.parse_args,
+            timeout=source.timeout, follow_redirects=True,
+        )
+    except Exception as e:
+        _fetch_failed(source.name, FEED_COMPANY, e, feed=feed_url)
+        return []
+
+    results: NewsList = []
+    for company, found in matches.items():
+        _found(source.name, company, len(found), feed=feed_url)
+        results.extend(found)
+    return results
+
+
+# ==============================================================
+# 🗂️ Registro
+# ==============================================================
+
+class SourceRegistry:
+    """Fontes conhecidas, na ordem de prioridade em que os jobs são criados"""
+
+    def __init__(self, disabled: Iterable[str] = DISABLED_SOURCES):
+        self._sources: Dict[str, Source] = {}
+        self.disabled = set(disabled)
+
+    def register(self, source: Source) -> Source:
+        self._sources[source.name] = source
+        return source
+
+    def __iter__(self) -> Iterator[Source]:
+        return iter(self._sources.values())
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._sources
+
+    def get(self, name: str) -> Source:
+        return self._sources[name]
+
+    def names(self) -> List[str]:
+        return list(self._sources)
+
+    def is_active(self, source: Source) -> bool:
+        return source.name not in self.disabled and source.enabled()
+
+    def select(self, names: Optional[Iterable[str]] = None) -> List[Source]:
+        """
+        Fontes ativas (todas, ou só ``names``), na ordem do registro.
+        ``ValueError`` para nomes desconhecidos.
+        """
+        if names is None:
+            return [source for source in self if self.is_active(source)]
+        wanted = set(names)
+        unknown = wanted - set(self._sources)
+        if unknown:
+            raise ValueError(f"fontes desconhecidas: {', '.join(sorted(unknown))} "
+                             f"(disponíveis: {', '.join(self._sources)})")
+        return [source for source in self if source.name in wanted and self.is_active(source)]
+
+    def jobs(self, companies: List[str], names: Optional[Iterable[str]] = None) -> List[FetchJob]:
+        """Um job por (fonte, empresa) nas buscas por empresa e um por feed nos feeds globais"""
+        jobs: List[FetchJob] = []
+        for source in self.select(names):
+            if source.batched and len(companies) > 1:
+                jobs += [
+                    FetchJob(source.name, ", ".join(group),
+                             partial(_fetch_batch, source, companies=group) if len(group) > 1
+                             else partial(_fetch_company, source, company=group[0]),
+                             source.concurrency)
+                    for group in source.batches(companies)
+                ]
+            elif source.per_company:
+                fetch = source.fetch or partial(_fetch_company, source)
+                jobs += [
+                    FetchJob(source.name, company, partial(fetch, company=company), source.concurrency)
+                    for company in companies
+                ]
+            else:
+                jobs += [
+                    FetchJob(source.name, ", ".join(companies),
+                             partial(_fetch_feed, source, feed_url, companies=companies), source.concurrency)
+                    for feed_url in source.feeds
+                ]
+        return jobs
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        return {
+            source.name: {
+                "active": self.is_active(source),
+                "kind": "company" if source.per_company else "feed",
+                "cost": source.cost,
+                "concurrency": source.concurrency,
+                "batch": source.batch if source.batched else 0,
+                "interval": source.interval,
+                "feeds": len(source.feeds),
+            }
+            for source in self
+        }
+
+
+def parse_sources(values: Optional[List[str]]) -> Optional[List[str]]:
+    """``?sources=google,g1`` ou ``?sources=google&sources=g1`` → ``["google", "g1"]``"""
+    if not values:
+        return None
+    names = [name.strip() for value in values for name in value.split(",") if name.strip()]
+    return list(dict.fromkeys(names)) or None
+
+
+# Instância compartilhada pelo processo (as fontes são registradas pelo ``data_source``)
+source_registry = SourceRegistry()
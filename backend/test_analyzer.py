@@ -0,0 +1,29 @@
+# -*- coding: utf-8 -*-
+"""
+🧪 Testes da classificação por palavras-chave (analyzer)
+========================================================
+Execute com ``python -m pytest test_analyzer.py`` ou ``python test_analyzer.py``.
+"""
+
+from analyzer import EVENT_LANCAMENTO, EVENT_OUTRO, _heuristic_event, classify_many
+
+
+def test_classify_many_matches_classify_across_item_boundaries():
+    """Uma palavra-chave de várias palavras não pode casar com o fim de um item e o começo do próximo"""
+    items = [
+        {"title": "Empresa anuncia algo novo", "description": ""},
+        {"title": "produto", "description": "segue em análise"},
+        {"title": "Banco divulga", "description": "resultado novo"},
+        {"title": "Produto digital", "description": ""},
+        {"title": "Fintech apresenta novo produto", "description": ""},
+        {"title": "", "description": "ISO"},
+    ]
+    expected = [_heuristic_event(item["title"], item["description"]) for item in items]
+    assert classify_many(items) == expected
+    assert expected[:4] == [EVENT_OUTRO, EVENT_OUTRO, EVENT_OUTRO, EVENT_OUTRO]
+    assert expected[4] == EVENT_LANCAMENTO
+
+
+if __name__ == "__main__":
+    test_classify_many_matches_classify_across_item_boundaries()
+    print("✅ analyzer ok")
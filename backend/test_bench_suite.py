@@ -0,0 +1,39 @@
+# -*- coding: utf-8 -*-
+"""
+🧪 Testes do benchmark offline (bench_suite)
+============================================
+Execute com ``python -m pytest test_bench_suite.py`` ou ``python test_bench_suite.py``.
+"""
+
+from bench_suite import KNOWN_COMPANIES, bench_companies, compare
+
+
+def _result(companies: int, e2e: float, memory: float = 2.0):
+    stages = {name: {"wall_s": 0.01, "cpu_s": 0.01} for name in ("collect", "dedup", "classify")}
+    stages["parse"] = {"thread_s": 0.02}
+    return {"companies": companies, "e2e_wall_s": {"median": e2e}, "stages": stages, "peak_memory_mb": memory}
+
+
+def test_bench_companies_is_deterministic():
+    """A mesma escala sempre mede as mesmas empresas, começando pelas que têm site oficial"""
+    companies = bench_companies(len(KNOWN_COMPANIES) + 2)
+    assert companies == bench_companies(len(KNOWN_COMPANIES) + 2)
+    assert companies[:len(KNOWN_COMPANIES)] == KNOWN_COMPANIES
+    assert companies[-2:] == ["Empresa 0", "Empresa 1"]
+    assert len(set(companies)) == len(companies)
+
+
+def test_compare_flags_only_regressions_above_threshold():
+    """Só pioras acima do limite viram regressão; melhoras e escalas sem base são ignoradas"""
+    baseline = {"results": [_result(1, 1.0), _result(10, 2.0, memory=4.0)]}
+    report = {"results": [_result(1, 1.1), _result(10, 1.5, memory=6.0), _result(100, 9.0)]}
+
+    regressions = compare(report, baseline, threshold=0.2)
+    assert regressions == ["10 empresas: peak_memory +50%"]
+    assert compare(report, baseline, threshold=0.05) == ["1 empresas: e2e +10%", "10 empresas: peak_memory +50%"]
+
+
+if __name__ == "__main__":
+    test_bench_companies_is_deterministic()
+    test_compare_flags_only_regressions_above_threshold()
+    print("✅ bench_suite ok")
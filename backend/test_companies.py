@@ -0,0 +1,54 @@
+# -*- coding: utf-8 -*-
+"""
+🧪 Testes do reconhecimento de empresas no texto (companies)
+============================================================
+Execute com ``python -m pytest test_companies.py`` ou ``python test_companies.py``.
+"""
+
+from companies import CompanyMatcher, canonical_company, company_matcher
+
+
+def test_aliases_and_tickers_map_to_the_requested_name():
+    """Apelidos e tickers contam como menção da empresa, no nome em que ela foi pedida"""
+    matcher = CompanyMatcher(["Magazine Luiza", "Mercado Livre", "Petrobras"])
+    assert matcher.find("Magalu sobe 5% na B3") == ["Magazine Luiza"]
+    assert matcher.find("Ações de MGLU3 e PETR4 lideram o pregão") == ["Magazine Luiza", "Petrobras"]
+    assert matcher.find("MELI divulga balanço") == ["Mercado Livre"]
+    assert CompanyMatcher(["Magalu"]).find("Magazine Luiza abre lojas") == ["Magalu"]
+
+
+def test_matching_ignores_case_accents_and_punctuation():
+    """Maiúsculas, acentos e pontuação não atrapalham"""
+    matcher = CompanyMatcher(["Itaú Unibanco", "Nubank"])
+    assert matcher.find("ITAU anuncia dividendos") == ["Itaú Unibanco"]
+    assert matcher.find("(nubank) lança conta PJ.") == ["Nubank"]
+
+
+def test_terms_match_whole_words_only():
+    """"Stone" não casa com "milestone", e termos de várias palavras exigem a sequência inteira"""
+    matcher = CompanyMatcher(["Stone", "Banco do Brasil"])
+    assert matcher.find("Startup atinge milestone importante") == []
+    assert matcher.find("Banco anuncia parceria com o Brasil") == []
+    assert matcher.find("Stone e Banco do Brasil fecham acordo") == ["Stone", "Banco do Brasil"]
+
+
+def test_find_checks_every_text_and_reports_each_company_once():
+    """Título e descrição são verificados; cada empresa aparece uma vez, na ordem de menção"""
+    matcher = CompanyMatcher(["Nubank", "Totvs"])
+    assert matcher.find("TOTVS3 em alta", None, "Nubank e Totvs fecham parceria") == ["Totvs", "Nubank"]
+
+
+def test_canonical_company_and_cached_matcher():
+    """Nomes do mesmo grupo têm o mesmo nome canônico; o matcher é reaproveitado por lista"""
+    assert canonical_company("Magalu") == canonical_company("Magazine Luiza") == "magazine luiza"
+    assert canonical_company("Empresa Nova") == "empresa nova"
+    assert company_matcher(["Nubank", "Stone"]) is company_matcher(["Nubank", "Stone"])
+
+
+if __name__ == "__main__":
+    test_aliases_and_tickers_map_to_the_requested_name()
+    test_matching_ignores_case_accents_and_punctuation()
+    test_terms_match_whole_words_only()
+    test_find_checks_every_text_and_reports_each_company_once()
+    test_canonical_company_and_cached_matcher()
+    print("✅ companies ok")
@@ -0,0 +1,69 @@
+# -*- coding: utf-8 -*-
+"""
+🧪 Testes da deduplicação entre fontes (dedup)
+==============================================
+Execute com ``python -m pytest test_dedup.py`` ou ``python test_dedup.py``.
+"""
+
+from dedup import canonical_url, cluster_news, dedup_news
+
+
+def _news(title: str, url: str, fonte_type: str, company: str = "Nubank", published_ts=None):
+    return {
+        "company": company, "title": title, "url": url, "fonte": fonte_type.upper(),
+        "fonte_type": fonte_type, "published_ts": published_ts,
+    }
+
+
+def test_canonical_url_unwraps_redirects_and_drops_tracking():
+    """Redirecionadores e parâmetros de rastreamento não separam a mesma matéria"""
+    url = "https://g1.globo.com/economia/nubank-lucro.ghtml"
+    assert canonical_url(url + "?utm_source=x&utm_medium=y") == canonical_url(url)
+    assert canonical_url("https://www.google.com/url?q=" + url) == canonical_url(url)
+
+
+def test_near_duplicate_titles_are_clustered_per_company():
+    """Títulos quase iguais de fontes diferentes formam um grupo; outra empresa ou outro número, não"""
+    items = [
+        _news("Nubank registra lucro recorde de US$ 1 bilhão no trimestre", "https://a.com/1", "google"),
+        _news("Nubank registra lucro recorde de US$ 1 bilhão no trimestre - G1", "https://g1.com/1", "g1"),
+        _news("Nubank registra lucro recorde de US$ 2 bilhões no trimestre", "https://b.com/2", "uol"),
+        _news("Nubank registra lucro recorde de US$ 1 bilhão no trimestre", "https://c.com/1", "google",
+              company="Stone"),
+        _news("Banco Central anuncia nova regra para o Pix", "https://d.com/pix", "yahoo"),
+    ]
+    groups = sorted(sorted(group) for group in cluster_news(items))
+    assert groups == [[0, 1], [2], [3], [4]]
+
+
+def test_representative_prefers_trusted_source_and_keeps_alternates():
+    """O representante é a fonte mais confiável; as outras ficam em ``alternates`` sem repetir URL"""
+    title = "Nubank anuncia compra de fintech no México"
+    items = [
+        _news(title, "https://news.google.com/1", "google"),
+        _news(title, "https://news.google.com/1?utm_source=rss", "google"),
+        _news(title, "https://g1.globo.com/nubank.ghtml", "g1"),
+        _news(title, "https://br.yahoo.com/nubank", "yahoo"),
+    ]
+    [news] = dedup_news(items)
+    assert news["fonte_type"] == "g1"
+    assert [alt["fonte_type"] for alt in news["alternates"]] == ["google", "yahoo"]
+
+
+def test_representative_prefers_dated_item_within_same_source():
+    """Na mesma fonte, uma notícia com data ganha de uma sem data"""
+    title = "Nubank lança cartão para pequenas empresas"
+    items = [
+        _news(title, "https://a.com/1", "google"),
+        _news(title, "https://b.com/1", "google", published_ts="2025-10-16T12:00:00+00:00"),
+    ]
+    [cluster] = cluster_news(items)
+    assert cluster == [1, 0]
+
+
+if __name__ == "__main__":
+    test_canonical_url_unwraps_redirects_and_drops_tracking()
+    test_near_duplicate_titles_are_clustered_per_company()
+    test_representative_prefers_trusted_source_and_keeps_alternates()
+    test_representative_prefers_dated_item_within_same_source()
+    print("✅ dedup ok")
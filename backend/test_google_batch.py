@@ -0,0 +1,80 @@
+# -*- coding: utf-8 -*-
+"""
+🧪 Testes da busca em lote do Google News (consultas OR)
+========================================================
+Execute com ``python -m pytest test_google_batch.py`` ou ``python test_google_batch.py``.
+"""
+
+from xml.sax.saxutils import escape
+
+from data_source import GOOGLE_LIMIT, _parse_google_news_batch
+from sources import source_registry
+
+
+def _feed(*titles: str) -> bytes:
+    items = []
+    for n, title in enumerate(titles):
+        description = escape(f'<a href="https://example.com/{n}">{title}</a>&nbsp;<font>Exemplo</font>')
+        items.append(
+            f"<item><title>{escape(title)} - Exemplo</title><link>https://news.google.com/rss/articles/{n}</link>"
+            f"<pubDate>Thu, 16 Oct 2025 12:00:00 GMT</pubDate><description>{description}</description></item>"
+        )
+    return f'<?xml version="1.0"?><rss><channel>{"".join(items)}</channel></rss>'.encode("utf-8")
+
+
+def test_items_go_to_every_company_they_mention():
+    """Cada notícia vai para as empresas que cita (nome ou apelido); as que não citam ninguém ficam de fora"""
+    content = _feed(
+        "Nubank lança conta PJ",
+        "Magalu e Nubank fecham parceria",
+        "Dólar fecha em queda",
+        "MGLU3 sobe na bolsa",
+    )
+    found = _parse_google_news_batch(content, ["Nubank", "Magazine Luiza"])
+
+    assert [news["title"] for news in found["Nubank"]] == [
+        "Nubank lança conta PJ - Exemplo", "Magalu e Nubank fecham parceria - Exemplo",
+    ]
+    assert [news["title"] for news in found["Magazine Luiza"]] == [
+        "Magalu e Nubank fecham parceria - Exemplo", "MGLU3 sobe na bolsa - Exemplo",
+    ]
+    assert {news["company"] for news in found["Magazine Luiza"]} == {"Magazine Luiza"}
+    assert found["Nubank"][0]["url"] == "https://example.com/0"
+
+
+def test_each_company_gets_its_own_quota():
+    """Uma empresa muito citada não tira o espaço das outras: cota de ``GOOGLE_LIMIT`` por empresa"""
+    titles = [f"Nubank notícia {n}" for n in range(GOOGLE_LIMIT + 5)] + ["Stone divulga resultado"]
+    found = _parse_google_news_batch(_feed(*titles), ["Nubank", "Stone"])
+
+    assert len(found["Nubank"]) == GOOGLE_LIMIT
+    assert [news["title"] for news in found["Stone"]] == ["Stone divulga resultado - Exemplo"]
+
+
+def test_companies_without_mentions_get_an_empty_list():
+    """Toda empresa do lote aparece no resultado, mesmo sem notícias"""
+    found = _parse_google_news_batch(_feed("Nubank lança conta PJ"), ["Nubank", "Totvs"])
+    assert found["Totvs"] == []
+
+
+def test_batches_respect_size_and_url_length():
+    """Os lotes têm até ``batch`` empresas e a URL da busca não passa de ``max_url``"""
+    google = source_registry.get("google")
+    companies = [f"Empresa {n}" for n in range(google.batch * 2 + 1)]
+
+    groups = google.batches(companies)
+    assert [company for group in groups for company in group] == companies
+    assert max(len(group) for group in groups) == google.batch
+
+    max_url = len(google.batch_request(companies[:2])[0])
+    groups = google.batches(companies, max_url=max_url)
+    assert all(len(group) <= 2 for group in groups)
+    assert all(len(google.batch_request(group)[0]) <= max_url for group in groups if len(group) > 1)
+
+
+if __name__ == "__main__":
+    test_items_go_to_every_company_they_mention()
+    test_each_company_gets_its_own_quota()
+    test_companies_without_mentions_get_an_empty_list()
+    test_batches_respect_size_and_url_length()
+    print("✅ google batch ok")
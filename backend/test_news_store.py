@@ -0,0 +1,54 @@
+# -*- coding: utf-8 -*-
+"""
+🧪 Testes do armazenamento local (news_store)
+=============================================
+Execute com ``python -m pytest test_news_store.py`` ou ``python test_news_store.py``.
+"""
+
+import os
+import tempfile
+from datetime import datetime, timedelta, timezone
+
+from news_store import NewsStore, decode_since, encode_since
+
+
+def _store() -> NewsStore:
+    fd, path = tempfile.mkstemp(suffix=".db")
+    os.close(fd)
+    return NewsStore(path)
+
+
+def _news(n: int, published_ts=None):
+    return {
+        "company": "Nubank", "title": f"Notícia {n}", "url": f"https://example.com/{n}",
+        "fonte": "Exemplo", "fonte_type": "google", "published_ts": published_ts,
+    }
+
+
+def test_since_returns_rows_inserted_after_cursor():
+    """``since`` segue a ordem de gravação: notícias sem data ou com data antiga também chegam"""
+    store = _store()
+    now = datetime.now(timezone.utc)
+    store.upsert_many([_news(1, now), _news(2, now - timedelta(hours=1))])
+    since = decode_since(encode_since(store.latest_id()))
+
+    store.upsert_many([_news(3), _news(4, now - timedelta(days=3))])
+    fresh = store.query(["Nubank"], since=since)
+
+    assert sorted(news["title"] for news in fresh) == ["Notícia 3", "Notícia 4"]
+    assert store.query(["Nubank"], since=store.latest_id()) == []
+
+
+def test_since_ignores_updates_of_known_rows():
+    """Uma notícia já gravada que volta numa coleta não conta como novidade"""
+    store = _store()
+    store.upsert_many([_news(1)])
+    since = store.latest_id()
+    store.upsert_many([_news(1, datetime.now(timezone.utc))])
+    assert store.query(["Nubank"], since=since) == []
+
+
+if __name__ == "__main__":
+    test_since_returns_rows_inserted_after_cursor()
+    test_since_ignores_updates_of_known_rows()
+    print("✅ news_store ok")
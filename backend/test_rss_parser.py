@@ -0,0 +1,83 @@
+# -*- coding: utf-8 -*-
+"""
+🧪 Testes da leitura incremental de feeds (rss_parser)
+======================================================
+Execute com ``python -m pytest test_rss_parser.py`` ou ``python test_rss_parser.py``.
+"""
+
+from rss_parser import HighWaterMark, iter_rss_items, reading
+
+A = ("A", "Thu, 16 Oct 2025 12:00:00 GMT")
+B = ("B", "Thu, 16 Oct 2025 11:00:00 GMT")
+C = ("C", "Thu, 16 Oct 2025 11:30:00 GMT")
+D = ("D", "Thu, 16 Oct 2025 13:00:00 GMT")
+
+
+def _feed(*items) -> bytes:
+    body = "".join(f"<item><title>{key}</title><guid>{key}</guid><pubDate>{date}</pubDate></item>"
+                   for key, date in items)
+    return f"<rss><channel>{body}</channel></rss>".encode("utf-8")
+
+
+def _read(mark: HighWaterMark, content: bytes):
+    with reading(mark):
+        return [item["title"] for item in iter_rss_items(content)]
+
+
+def test_ordered_feed_stops_at_first_seen_item():
+    """Depois de uma leitura completa e cronológica, a próxima para no primeiro item já visto"""
+    mark = HighWaterMark()
+    assert _read(mark, _feed(A, B)) == ["A", "B"]
+    assert mark.ordered and mark.complete
+
+    assert _read(mark, _feed(D, A, B)) == ["D"]
+    assert mark.stopped
+
+
+def test_unordered_feed_is_always_read_to_the_end():
+    """Um feed fora da ordem cronológica nunca é cortado"""
+    mark = HighWaterMark()
+    assert _read(mark, _feed(B, A)) == ["B", "A"]
+    assert not mark.ordered
+    assert _read(mark, _feed(B, A)) == ["B", "A"]
+
+
+def test_interrupted_read_is_followed_by_a_full_read():
+    """Um item antigo que aparece atrás de um já visto não se perde: a leitura seguinte vai até o fim"""
+    mark = HighWaterMark()
+    _read(mark, _feed(A, B))
+    assert _read(mark, _feed(B, C, A)) == []
+    assert not mark.complete
+
+    assert "C" in _read(mark, _feed(B, C, A))
+    assert not mark.ordered
+
+
+def test_failed_read_leaves_mark_untouched():
+    """Se o bloco de ``reading`` falha, os itens lidos não contam como vistos"""
+    mark = HighWaterMark()
+    _read(mark, _feed(A, B))
+    try:
+        with reading(mark):
+            for _ in iter_rss_items(_feed(D, A, B)):
+                raise RuntimeError("falhou ao gravar")
+    except RuntimeError:
+        pass
+    assert "D" not in mark.seen
+    assert _read(mark, _feed(D, A, B)) == ["D"]
+
+
+def test_without_mark_reads_everything():
+    """Fora de ``reading`` o parser não lembra de nada"""
+    content = _feed(A, B)
+    assert [item["title"] for item in iter_rss_items(content)] == ["A", "B"]
+    assert [item["title"] for item in iter_rss_items(content, limit=1)] == ["A"]
+
+
+if __name__ == "__main__":
+    test_ordered_feed_stops_at_first_seen_item()
+    test_unordered_feed_is_always_read_to_the_end()
+    test_interrupted_read_is_followed_by_a_full_read()
+    test_failed_read_leaves_mark_untouched()
+    test_without_mark_reads_everything()
+    print("✅ rss_parser ok")
@@ -0,0 +1,93 @@
+# -*- coding: utf-8 -*-
+"""
+🧪 Testes da junção de chamadas idênticas (aggregator.SingleFlight)
+===================================================================
+Execute com ``python -m pytest test_single_flight.py`` ou ``python test_single_flight.py``.
+"""
+
+import asyncio
+
+from aggregator import SingleFlight
+
+
+def test_concurrent_calls_with_same_key_share_one_execution():
+    """Chamadas simultâneas com a mesma chave executam a função uma vez só"""
+    flight = SingleFlight()
+    runs = []
+
+    async def fetch():
+        runs.append(1)
+        await asyncio.sleep(0.01)
+        return ["notícia"]
+
+    async def main():
+        return await asyncio.gather(*(flight.do("google:nubank", fetch) for _ in range(5)))
+
+    results = asyncio.run(main())
+    assert results == [["notícia"]] * 5
+    assert len(runs) == 1
+    assert (flight.calls, flight.shared, flight.inflight) == (1, 4, 0)
+
+
+def test_different_keys_and_later_calls_run_again():
+    """Chaves diferentes não se misturam, e uma chamada depois do fim executa de novo"""
+    flight = SingleFlight()
+    runs = []
+
+    async def fetch(key):
+        runs.append(key)
+        await asyncio.sleep(0)
+        return key
+
+    async def main():
+        first = await asyncio.gather(flight.do("a", lambda: fetch("a")), flight.do("b", lambda: fetch("b")))
+        second = await flight.do("a", lambda: fetch("a"))
+        return first, second
+
+    assert asyncio.run(main()) == (["a", "b"], "a")
+    assert runs == ["a", "b", "a"]
+
+
+def test_exception_is_shared_and_not_cached():
+    """Todos os que esperavam recebem a mesma exceção; a próxima chamada tenta de novo"""
+    flight = SingleFlight()
+
+    async def failing():
+        await asyncio.sleep(0)
+        raise RuntimeError("fonte fora do ar")
+
+    async def main():
+        results = await asyncio.gather(flight.do("k", failing), flight.do("k", failing), return_exceptions=True)
+        again = await flight.do("k", lambda: asyncio.sleep(0, result="ok"))
+        return results, again
+
+    results, again = asyncio.run(main())
+    assert [type(e) for e in results] == [RuntimeError, RuntimeError]
+    assert again == "ok"
+
+
+def test_cancelled_caller_does_not_cancel_shared_call():
+    """Um chamador cancelado não derruba a chamada de quem continua esperando"""
+    flight = SingleFlight()
+
+    async def slow():
+        await asyncio.sleep(0.02)
+        return "ok"
+
+    async def main():
+        first = asyncio.create_task(flight.do("k", slow))
+        second = asyncio.create_task(flight.do("k", slow))
+        await asyncio.sleep(0)
+        first.cancel()
+        return await second, first.cancelled()
+
+    assert asyncio.run(main()) == ("ok", True)
+    assert flight.calls == 1
+
+
+if __name__ == "__main__":
+    test_concurrent_calls_with_same_key_share_one_execution()
+    test_different_keys_and_later_calls_run_again()
+    test_exception_is_shared_and_not_cached()
+    test_cancelled_caller_does_not_cancel_shared_call()
+    print("✅ single flight ok")
@@ -0,0 +1,144 @@
+# -*- coding: utf-8 -*-
+"""
+🧪 Testes do circuit breaker por fonte (source_health)
+======================================================
+Execute com ``python -m pytest test_source_health.py`` ou ``python test_source_health.py``.
+"""
+
+import asyncio
+
+import httpx
+
+from rate_limit import HostRateLimiter
+from source_health import CLOSED, HALF_OPEN, OPEN, CircuitOpen, SourceHealthRegistry
+
+URL = "https://feeds.example.com/rss"
+
+
+class FakeClient:
+    """Responde com os status da fila (uma exceção na fila é levantada)"""
+
+    def __init__(self, *responses):
+        self.responses = list(responses)
+        self.calls = 0
+
+    async def get(self, url, **kwargs):
+        self.calls += 1
+        response = self.responses.pop(0)
+        if isinstance(response, Exception):
+            raise response
+        return httpx.Response(response, content=b"ok", request=httpx.Request("GET", url))
+
+
+def _registry(threshold: int = 2, cooldown: float = 30) -> SourceHealthRegistry:
+    return SourceHealthRegistry(failure_threshold=threshold, cooldown=cooldown, retries=0,
+                                limiter=HostRateLimiter(rates={}, default_rate=0))
+
+
+def _get(registry: SourceHealthRegistry, client: FakeClient):
+    return asyncio.run(registry.get_url(client, "exemplo", URL))
+
+
+def _expire_cooldown(registry: SourceHealthRegistry) -> None:
+    health = registry.get("exemplo", "feeds.example.com")
+    health.opened_at -= health.cooldown
+
+
+def test_opens_after_consecutive_failures_and_rejects_without_calling():
+    """Depois de ``failure_threshold`` falhas seguidas o circuito abre e nem chama a fonte"""
+    registry = _registry(threshold=2)
+    client = FakeClient(503, 503, 200)
+    assert _get(registry, client).status_code == 503
+    assert registry.get("exemplo", "feeds.example.com").state == CLOSED
+    assert _get(registry, client).status_code == 503
+    assert registry.get("exemplo", "feeds.example.com").state == OPEN
+
+    try:
+        _get(registry, client)
+    except CircuitOpen:
+        pass
+    else:
+        raise AssertionError("circuito aberto deveria falhar na hora")
+    assert client.calls == 2
+    assert registry.get("exemplo", "feeds.example.com").rejected == 1
+
+
+def test_success_resets_failure_count():
+    """Uma resposta boa zera a sequência: falhas intercaladas não abrem o circuito"""
+    registry = _registry(threshold=2)
+    client = FakeClient(503, 200, 503, 200)
+    for _ in range(4):
+        _get(registry, client)
+    assert registry.get("exemplo", "feeds.example.com").state == CLOSED
+
+
+def test_half_open_probe_closes_on_success():
+    """Passado o cooldown, uma chamada de teste bem-sucedida fecha o circuito"""
+    registry = _registry(threshold=1, cooldown=30)
+    client = FakeClient(httpx.ConnectError("recusada"), 200)
+    try:
+        _get(registry, client)
+    except httpx.ConnectError:
+        pass
+    health = registry.get("exemplo", "feeds.example.com")
+    assert health.state == OPEN
+
+    _expire_cooldown(registry)
+    assert _get(registry, client).status_code == 200
+    assert health.state == CLOSED
+    assert health.cooldown == 30
+    assert not health.probing
+
+
+def test_half_open_probe_failure_reopens_with_doubled_cooldown():
+    """Se a chamada de teste falha, o circuito volta a abrir esperando o dobro"""
+    registry = _registry(threshold=1, cooldown=30)
+    client = FakeClient(503, 503)
+    _get(registry, client)
+    health = registry.get("exemplo", "feeds.example.com")
+
+    _expire_cooldown(registry)
+    assert _get(registry, client).status_code == 503
+    assert health.state == OPEN
+    assert health.cooldown == 60
+    assert not health.probing
+
+
+def test_only_one_probe_while_half_open():
+    """No meio-aberto só uma chamada passa; as outras são rejeitadas até o teste terminar"""
+    registry = _registry(threshold=1, cooldown=30)
+    _get(registry, FakeClient(503))
+    _expire_cooldown(registry)
+
+    async def both():
+        release = asyncio.Event()
+
+        class SlowClient(FakeClient):
+            async def get(self, url, **kwargs):
+                await release.wait()
+                return await super().get(url, **kwargs)
+
+        client = SlowClient(200)
+        probe = asyncio.create_task(registry.get_url(client, "exemplo", URL))
+        await asyncio.sleep(0)
+        assert registry.get("exemplo", "feeds.example.com").state == HALF_OPEN
+        try:
+            await registry.get_url(client, "exemplo", URL)
+        except CircuitOpen:
+            rejected = True
+        else:
+            rejected = False
+        release.set()
+        return rejected, (await probe).status_code
+
+    assert asyncio.run(both()) == (True, 200)
+    assert registry.get("exemplo", "feeds.example.com").state == CLOSED
+
+
+if __name__ == "__main__":
+    test_opens_after_consecutive_failures_and_rejects_without_calling()
+    test_success_resets_failure_count()
+    test_half_open_probe_closes_on_success()
+    test_half_open_probe_failure_reopens_with_doubled_cooldown()
+    test_only_one_probe_while_half_open()
+    print("✅ source_health ok")
@@ -0,0 +1,351 @@
+"""
+🔗 Resolução de links de redirecionamento
+=========================================
+Itens do Google News sem ``<a>`` na descrição ficam só com o link
+``news.google.com/rss/articles/...``: a deduplicação não reconhece a mesma
+matéria vinda de outra fonte e o frontend paga um redirecionamento por
+clique. Esta etapa troca esses links pelo endereço final da matéria:
+
+- requisições ``HEAD`` (``GET`` sem ler o corpo quando o servidor recusa
+  ``HEAD``) seguindo os redirecionamentos, em paralelo, com teto de
+  simultâneas, de links por coleta e um prazo total: o que não couber fica
+  com o link original e é tentado na próxima coleta;
+- o resultado fica num cache em disco (SQLite), então cada link é
+  resolvido uma única vez, mesmo depois de reiniciar o servidor; destinos
+  que ainda são um redirecionador ou uma tela de consentimento não entram;
+- as falhas também ficam registradas: o link só é tentado de novo depois
+  de ``RETRY_AFTER``, em vez de a cada coleta;
+- todas as URLs (resolvidas ou não) passam pelo ``dedup.clean_url``: sem
+  parâmetros de rastreamento (``utm_*``, ``gclid``...) e com o host normalizado.
+"""
+
+import asyncio
+import logging
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Set
+
+import httpx
+
+import aggregator
+from aggregator import run_blocking, shared_client
+from dedup import clean_url
+from metrics import URL_RESOLVE
+from rate_limit import rate_limiter
+
+logger = logging.getLogger(__name__)
+
+# 🔹 Parâmetros configuráveis via variáveis de ambiente
+ENABLED = os.getenv("NEWS_RESOLVE_REDIRECTS", "1") not in ("0", "false", "no")
+CONCURRENCY = int(os.getenv("NEWS_RESOLVE_CONCURRENCY", "8"))
+# Links resolvidos por coleta; o restante fica para a próxima
+MAX_PER_CALL = int(os.getenv("NEWS_RESOLVE_MAX", "50"))
+TIMEOUT = float(os.getenv("NEWS_RESOLVE_TIMEOUT", "5"))
+# Prazo total da etapa numa coleta (segundos)
+DEADLINE = float(os.getenv("NEWS_RESOLVE_DEADLINE", "3"))
+# Links que não resolveram só são tentados de novo depois disso (segundos)
+RETRY_AFTER = float(os.getenv("NEWS_RESOLVE_RETRY_AFTER", "21600"))
+CACHE_PATH = os.getenv("NEWS_URL_CACHE_PATH",
+                       os.path.join(os.path.dirname(os.path.abspath(__file__)), "url_cache.db"))
+# Hosts cujos links são só redirecionamentos para a matéria
+REDIRECT_HOSTS = frozenset(
+    host.strip().lower() for host in os.getenv("NEWS_RESOLVE_HOSTS", "news.google.com").split(",") if host.strip()
+)
+# Telas de consentimento no meio do caminho: o destino não é a matéria
+CONSENT_HOSTS = frozenset({"consent.google.com", "consent.youtube.com"})
+# Entradas do cache mantidas em memória, na frente do SQLite
+MEMORY_ENTRIES = 10000
+
+# Servidores que não aceitam HEAD respondem com um destes
+_HEAD_REFUSED = {403, 405, 501}
+
+
+def needs_resolution(url: str) -> bool:
+    """O link é de um redirecionador (``REDIRECT_HOSTS``)?"""
+    try:
+        return httpx.URL(url).host in REDIRECT_HOSTS
+    except httpx.InvalidURL:
+        return False
+
+
+class UrlCache:
+    """Cache em disco: link de redirecionamento → URL final (já limpa), e os links que falharam"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._db: Optional[sqlite3.Connection] = None
+
+    def _conn(self) -> sqlite3.Connection:
+        if self._db is None:
+            self._db = sqlite3.connect(self.path, check_same_thread=False, timeout=10)
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS urls (url TEXT PRIMARY KEY, canonical TEXT NOT NULL, "
+                "resolved_at REAL NOT NULL)"
+            )
+            self._db.execute("CREATE TABLE IF NOT EXISTS failures (url TEXT PRIMARY KEY, failed_at REAL NOT NULL)")
+        return self._db
+
+    def get_many(self, urls: Sequence[str]) -> Dict[str, str]:
+        found: Dict[str, str] = {}
+        with self._lock:
+            conn = self._conn()
+            # Em blocos, por causa do limite de parâmetros do SQLite
+            for start in range(0, len(urls), 500):
+                chunk = urls[start:start + 500]
+                rows = conn.execute(
+                    f"SELECT url, canonical FROM urls WHERE url IN ({', '.join('?' * len(chunk))})", chunk
+                )
+                found.update(rows)
+        return found
+
+    def put_many(self, resolved: Dict[str, str]) -> None:
+        if not resolved:
+            return
+        now = time.time()
+        with self._lock:
+            conn = self._conn()
+            with conn:
+                conn.executemany(
+                    "INSERT OR REPLACE INTO urls (url, canonical, resolved_at) VALUES (?, ?, ?)",
+                    [(url, canonical, now) for url, canonical in resolved.items()],
+                )
+                conn.executemany("DELETE FROM failures WHERE url = ?", [(url,) for url in resolved])
+
+    def failed_since(self, urls: Sequence[str], since: float) -> Dict[str, float]:
+        """Link → quando falhou, para os links de ``urls`` que falharam depois de ``since``"""
+        found: Dict[str, float] = {}
+        with self._lock:
+            conn = self._conn()
+            for start in range(0, len(urls), 500):
+                chunk = urls[start:start + 500]
+                rows = conn.execute(
+                    f"SELECT url, failed_at FROM failures WHERE failed_at > ? "
+                    f"AND url IN ({', '.join('?' * len(chunk))})", [since, *chunk]
+                )
+                found.update(rows)
+        return found
+
+    def put_failure(self, url: str, failed_at: float) -> None:
+        with self._lock:
+            conn = self._conn()
+            with conn:
+                conn.execute("INSERT OR REPLACE INTO failures (url, failed_at) VALUES (?, ?)", (url, failed_at))
+
+    def close(self) -> None:
+        with self._lock:
+            if self._db is not None:
+                self._db.close()
+                self._db = None
+
+
+class UrlResolver:
+    """Resolve links de redirecionamento em lote, com cache em memória e em disco"""
+
+    def __init__(self, cache_path: str = CACHE_PATH, concurrency: int = CONCURRENCY,
+                 max_per_call: int = MAX_PER_CALL, timeout: float = TIMEOUT, deadline: float = DEADLINE,
+                 retry_after: float = RETRY_AFTER):
+        self.cache = UrlCache(cache_path)
+        self.concurrency = concurrency
+        self.max_per_call = max_per_call
+        self.timeout = timeout
+        self.deadline = deadline
+        self.retry_after = retry_after
+        self._memory: "OrderedDict[str, str]" = OrderedDict()
+        # Link → quando falhou (time.time()), na frente da tabela ``failures``
+        self._failed: "OrderedDict[str, float]" = OrderedDict()
+        self._inflight: Dict[str, asyncio.Task] = {}
+        # Criado no event loop que o usa (cada ``asyncio.run`` tem o seu)
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._semaphore_loop: Optional[asyncio.AbstractEventLoop] = None
+        self.stats = {"cache_hits": 0, "resolved": 0, "failed": 0, "deferred": 0, "skipped": 0}
+
+    def _remember(self, url: str, canonical: str) -> None:
+        self._memory[url] = canonical
+        self._memory.move_to_end(url)
+        while len(self._memory) > MEMORY_ENTRIES:
+            self._memory.popitem(last=False)
+
+    def _remember_failure(self, url: str, failed_at: float) -> None:
+        self._failed[url] = failed_at
+        self._failed.move_to_end(url)
+        while len(self._failed) > MEMORY_ENTRIES:
+            self._failed.popitem(last=False)
+
+    async def _recently_failed(self, urls: List[str]) -> Set[str]:
+        """Links de ``urls`` que falharam há menos de ``retry_after``"""
+        since = time.time() - self.retry_after
+        failed = {url for url in urls if self._failed.get(url, 0) > since}
+        rest = [url for url in urls if url not in failed]
+        if rest:
+            stored = await run_blocking(self.cache.failed_since, rest, since)
+            for url, failed_at in stored.items():
+                self._remember_failure(url, failed_at)
+            failed.update(stored)
+        return failed
+
+    def _count(self, result: str, n: int = 1) -> None:
+        if n:
+            self.stats[result] += n
+            URL_RESOLVE.inc(n, result=result)
+
+    def _limit(self) -> asyncio.Semaphore:
+        """Teto de resoluções simultâneas do event loop atual"""
+        loop = asyncio.get_running_loop()
+        if self._semaphore_loop is not loop:
+            self._semaphore = asyncio.Semaphore(self.concurrency)
+            self._semaphore_loop = loop
+        return self._semaphore
+
+    async def _head(self, client: httpx.AsyncClient, url: str) -> Optional[str]:
+        """
+        URL final de ``url`` (``None`` se o servidor não respondeu com sucesso ou
+        se o destino ainda é um redirecionador ou uma tela de consentimento)
+        """
+        waited = await rate_limiter.acquire(httpx.URL(url).host)
+        if waited:
+            logger.debug("🔗 Esperou %.2fs pelo limite do host para resolver %s", waited, url)
+        r = await client.head(url, timeout=self.timeout, follow_redirects=True)
+        if r.status_code in _HEAD_REFUSED:
+            # Sem HEAD: GET em streaming, fechado sem ler o corpo
+            async with client.stream("GET", url, timeout=self.timeout, follow_redirects=True) as r:
+                pass
+        if r.status_code >= 400 or r.url.host in REDIRECT_HOSTS or r.url.host in CONSENT_HOSTS:
+            return None
+        return str(r.url)
+
+    async def _resolve_one(self, client: httpx.AsyncClient, url: str) -> Optional[str]:
+        async with self._limit():
+            try:
+                final = await self._head(client, url)
+            except (httpx.HTTPError, httpx.InvalidURL) as e:
+                logger.debug("🔗 Falha ao resolver %s: %s", url, e, extra={"url": url, "error": type(e).__name__})
+                final = None
+        if final is None:
+            self._count("failed")
+            failed_at = time.time()
+            self._remember_failure(url, failed_at)
+            await run_blocking(self.cache.put_failure, url, failed_at)
+            return None
+        self._count("resolved")
+        self._failed.pop(url, None)
+        canonical = clean_url(final)
+        self._remember(url, canonical)
+        await run_blocking(self.cache.put_many, {url: canonical})
+        return canonical
+
+    def _task(self, client: httpx.AsyncClient, url: str) -> asyncio.Task:
+        """Resolução de ``url``; chamadas simultâneas para o mesmo link viram uma só"""
+        task = self._inflight.get(url)
+        if task is None or task.get_loop() is not asyncio.get_running_loop():
+            task = self._inflight[url] = asyncio.ensure_future(self._resolve_one(client, url))
+            task.add_done_callback(lambda done: self._inflight.pop(url) if self._inflight.get(url) is done else None)
+        return task
+
+    async def resolve_many(self, urls: Iterable[str], client: Optional[httpx.AsyncClient] = None,
+                           wait: bool = True) -> Dict[str, str]:
+        """
+        Link → URL final para os links de redirecionamento em ``urls``.
+        Links que falharam, passaram do teto ou do prazo ficam de fora.
+
+        Com ``wait=False`` só o cache responde: os links que faltam são
+        resolvidos em segundo plano (no cliente compartilhado) para a próxima vez.
+        """
+        wanted = [url for url in dict.fromkeys(urls) if needs_resolution(url)]
+        if not wanted:
+            return {}
+
+        resolved = {url: self._memory[url] for url in wanted if url in self._memory}
+        missing = [url for url in wanted if url not in resolved]
+        if missing:
+            stored = await run_blocking(self.cache.get_many, missing)
+            for url, canonical in stored.items():
+                self._remember(url, canonical)
+            resolved.update(stored)
+        self._count("cache_hits", len(resolved))
+
+        missing = [url for url in wanted if url not in resolved]
+        if not missing or not ENABLED:
+            return resolved
+        failed = await self._recently_failed(missing)
+        if failed:
+            self._count("skipped", len(failed))
+            missing = [url for url in missing if url not in failed]
+            if not missing:
+                return resolved
+        self._count("deferred", max(0, len(missing) - self.max_per_call))
+        missing = missing[:self.max_per_call]
+
+        client = client or shared_client()
+        if client is None and not wait:
+            return resolved
+        own_client = client is None
+        if own_client:
+            # Pela fábrica do agregador (substituída no bench e no teste de carga)
+            client = aggregator.new_client(max_connections=self.concurrency)
+        try:
+            tasks = {url: self._task(client, url) for url in missing}
+            done, pending = await asyncio.wait(tasks.values(), timeout=self.deadline if wait else 0)
+            self._count("deferred", len(pending))
+            if own_client:
+                # Com o cliente compartilhado, as que passaram do prazo terminam em segundo plano e vão para o cache
+                for task in pending:
+                    task.cancel()
+        finally:
+            if own_client:
+                await client.aclose()
+
+        for url, task in tasks.items():
+            if task not in done:
+                continue
+            if task.cancelled() or task.exception() is not None:
+                # Falha inesperada numa resolução: o link original fica, a coleta segue
+                error = "cancelada" if task.cancelled() else task.exception()
+                logger.warning("⚠️ Falha ao resolver %s: %s", url, error, extra={"url": url})
+                self._count("failed")
+            elif task.result() is not None:
+                resolved[url] = task.result()
+        return resolved
+
+    async def known(self, urls: Iterable[str]) -> Dict[str, str]:
+        """Link → URL final só para os links que já estão no cache (sem requisições)"""
+        wanted = [url for url in dict.fromkeys(urls) if needs_resolution(url)]
+        found = {url: self._memory[url] for url in wanted if url in self._memory}
+        missing = [url for url in wanted if url not in found]
+        if missing:
+            found.update(await run_blocking(self.cache.get_many, missing))
+        return found
+
+    async def resolve_news(self, news_list: List[Dict[str, Any]], client: Optional[httpx.AsyncClient] = None,
+                           wait: bool = True) -> List[Dict[str, Any]]:
+        """
+        Troca os links de redirecionamento pela URL final e limpa todas as URLs
+        (no próprio item); ``wait`` como em ``resolve_many``.
+        """
+        resolved = await self.resolve_many((item.get("url") or "" for item in news_list), client, wait)
+        for item in news_list:
+            url = item.get("url")
+            if url:
+                item["url"] = resolved.get(url) or clean_url(url)
+        return news_list
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "enabled": ENABLED,
+            "hosts": sorted(REDIRECT_HOSTS),
+            "memory_entries": len(self._memory),
+            "recent_failures": len(self._failed),
+            "inflight": len(self._inflight),
+            **self.stats,
+        }
+
+    def close(self) -> None:
+        self.cache.close()
+
+
+# Instância compartilhada pelo processo
+url_resolver = UrlResolver()
@@ -1,5 +1,5 @@
-import { useEffect, useMemo, useState } from 'react'
-import { fetchNews } from './api'
+import { useEffect, useMemo, useRef, useState } from 'react'
+import { fetchNewsSince, fetchNewsStream } from './api'
 import FilterBar from './components/FilterBar'
 import NewsCard from './components/NewsCard'
 import './index.css'
@@ -10,13 +10,21 @@ export default function App() {
   const [eventFilter, setEventFilter] = useState('Todos')
   const [loading, setLoading] = useState(false)
   const [error, setError] = useState('')
+  // Cursor da notícia mais nova e ETag da última consulta de novidades
+  const poll = useRef({ cursor: null, etag: null })
 
   async function load() {
     try {
       setLoading(true)
       setError('')
-      const data = await fetchNews(companies)
-      setItems(data)
+      setItems([])
+      // Mostra as notícias assim que cada fonte responde; no fim aplica a ordem por data
+      const data = await fetchNewsStream(companies, batch => {
+        setItems(prev => [...prev, ...batch])
+        setLoading(false)
+      }, eventFilter)
+      setItems(data.items)
+      poll.current = { cursor: data.latestCursor, etag: null }
     } catch (e) {
       setError(e.message)
     } finally {
@@ -24,7 +32,29 @@ export default function App() {
     }
   }
 
-  useEffect(() => { load() }, [])
+  // O filtro de evento é aplicado no servidor: trocar o filtro refaz a busca
+  useEffect(() => { load() }, [eventFilter])
+
+  // A cada minuto busca só o que chegou depois da última notícia recebida
+  useEffect(() => {
+    const timer = setInterval(async () => {
+      if (!poll.current.cursor) return
+      try {
+        const fresh = await fetchNewsSince(companies, poll.current.cursor, poll.current.etag, eventFilter)
+        if (!fresh) return
+        poll.current = { cursor: fresh.latestCursor, etag: fresh.etag }
+        if (fresh.items.length) {
+          setItems(prev => {
+            const urls = new Set(fresh.items.map(i => i.url))
+            return [...fresh.items, ...prev.filter(i => !urls.has(i.url))]
+          })
+        }
+      } catch (e) {
+        console.error("Erro ao buscar novidades:", e)
+      }
+    }, 60000)
+    return () => clearInterval(timer)
+  }, [companies, eventFilter])
 
   const filtered = useMemo(() => {
     if (eventFilter === 'Todos') return items
@@ -16,4 +16,76 @@ export async function fetchNews(companies) {
     console.error("Erro na requisição:", error);
     throw new Error(`Falha na conexão: ${error.message}`);
   }
-}
\ No newline at end of file
+}
+
+// Versão em streaming: chama onItems(lote) a cada fonte concluída e
+// devolve a lista final já ordenada (frame "done" do /news/stream) e o
+// cursor da notícia mais nova, usado depois em fetchNewsSince.
+// Com evento, o servidor envia só as notícias daquele tipo.
+export async function fetchNewsStream(companies, onItems, evento) {
+  const API_BASE_URL = import.meta.env.VITE_API_URL || "http://localhost:8000";
+  const params = new URLSearchParams();
+  companies.forEach(c => params.append("companies", c));
+  if (evento && evento !== "Todos") params.append("evento", evento);
+
+  const response = await fetch(`${API_BASE_URL}/news/stream?${params.toString()}`);
+  if (!response.ok || !response.body) {
+    throw new Error(`Erro ao buscar dados da API: ${response.status}`);
+  }
+
+  const reader = response.body.getReader();
+  const decoder = new TextDecoder();
+  const received = [];
+  let buffer = "";
+
+  while (true) {
+    const { value, done } = await reader.read();
+    if (done) break;
+    buffer += decoder.decode(value, { stream: true });
+
+    let newline;
+    while ((newline = buffer.indexOf("\n")) >= 0) {
+      const line = buffer.slice(0, newline).trim();
+      buffer = buffer.slice(newline + 1);
+      if (!line) continue;
+
+      const frame = JSON.parse(line);
+      if (frame.type === "items") {
+        frame.items.forEach(item => { received[item.seq] = item });
+        onItems?.(frame.items);
+      } else if (frame.type === "done") {
+        // Ordem final por data, sem duplicatas; as outras fontes vão em alternates
+        return {
+          items: frame.order.map(seq => ({ ...received[seq], alternates: frame.alternates[seq] || [] })),
+          latestCursor: frame.latest_cursor,
+        };
+      } else if (frame.type === "error") {
+        throw new Error(frame.detail);
+      }
+    }
+  }
+  return { items: received.filter(Boolean), latestCursor: null };
+}
+
+// Só as notícias que chegaram depois do cursor `since`. Devolve null quando
+// nada mudou (304 para o mesmo ETag); senão { items, latestCursor, etag }.
+export async function fetchNewsSince(companies, since, etag, evento) {
+  const API_BASE_URL = import.meta.env.VITE_API_URL || "http://localhost:8000";
+  const params = new URLSearchParams();
+  companies.forEach(c => params.append("companies", c));
+  if (evento && evento !== "Todos") params.append("evento", evento);
+  if (since) params.append("since", since);
+
+  const response = await fetch(`${API_BASE_URL}/news?${params.toString()}`, {
+    headers: etag ? { "If-None-Match": etag } : {},
+  });
+  if (response.status === 304) return null;
+  if (!response.ok) {
+    throw new Error(`Erro ao buscar dados da API: ${response.status}`);
+  }
+  return {
+    items: await response.json(),
+    latestCursor: response.headers.get("X-Latest-Cursor") || since,
+    etag: response.headers.get("ETag"),
+  };
+}
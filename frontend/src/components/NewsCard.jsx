@@ -30,15 +30,20 @@ function badgeColor(type) {
 }
 
 // 🔹 Formata "Publicado há X tempo"
-function timeAgo(publishedAt) {
-    if (!publishedAt) return "";
+function timeAgo(publishedAt, publishedTs) {
+    if (!publishedAt && !publishedTs) return "";
     try {
-        // publishedAt vem no formato "dd/mm/yyyy HH:MM"
-        const [date, time] = publishedAt.split(" ");
-        const [day, month, year] = date.split("/").map(Number);
-        const [hour, minute] = time.split(":").map(Number);
-
-        const pubDate = new Date(year, month - 1, day, hour, minute);
+        let pubDate;
+        if (publishedTs) {
+            // publishedTs vem em ISO 8601 com fuso (ex.: "2025-10-16T13:14:00Z")
+            pubDate = new Date(publishedTs);
+        } else {
+            // publishedAt vem no formato "dd/mm/yyyy HH:MM"
+            const [date, time] = publishedAt.split(" ");
+            const [day, month, year] = date.split("/").map(Number);
+            const [hour, minute] = time.split(":").map(Number);
+            pubDate = new Date(year, month - 1, day, hour, minute);
+        }
         const now = new Date();
         const diffMs = now - pubDate;
 
@@ -86,9 +91,16 @@ export default function NewsCard({ item }) {
 
                 {/* 🔹 Rodapé: data + origem */}
                 <div className="mt-3 flex items-center justify-between text-xs text-slate-500">
-                    <span>{item.published_at ? `🕒 ${timeAgo(item.published_at)}` : ""}</span>
+                    <span>{item.published_at || item.published_ts ? `🕒 ${timeAgo(item.published_at, item.published_ts)}` : ""}</span>
                     <span className="font-medium">📎 {item.fonte}</span>
                 </div>
+
+                {/* 🔹 Outras fontes que publicaram a mesma notícia */}
+                {item.alternates?.length > 0 && (
+                    <div className="mt-2 text-xs text-slate-500">
+                        Também em: {item.alternates.map(alt => alt.fonte).join(", ")}
+                    </div>
+                )}
             </div>
         </a>
     );